@@ -5,6 +5,12 @@ Agent that generates targeted practice questions using difficulty tools.
 
 from google.adk.agents import LlmAgent
 
+from src.core.banked_exercises import (
+    exercise_bank_after_model_callback,
+    exercise_bank_before_model_callback,
+)
+from src.core.degraded_mode import exercise_degraded_callback
+from src.core.exercise_table import record_exercises_callback
 from src.core.llm import build_gemini_model
 from src.core.tools import get_next_exercise_difficulty_tool
 
@@ -13,9 +19,9 @@ def build_exercise_generator_agent() -> LlmAgent:
     """Create the exercise generator agent."""
     return LlmAgent(
         name="exercise_generator_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("exercise_generator_agent"),
         description="Creates practice questions with adaptive difficulty.",
-        instruction=(
+        static_instruction=(
             "You are the Exercise Generator for an AI tutor.\n"
             "\n"
             "Your job:\n"
@@ -49,4 +55,9 @@ def build_exercise_generator_agent() -> LlmAgent:
             "- Keep the questions concise and directly tied to the given topic.\n"
         ),
         tools=[get_next_exercise_difficulty_tool],
+        # The bank is tried first; it keeps serving even while the backend is down.
+        before_model_callback=[exercise_bank_before_model_callback, exercise_degraded_callback],
+        after_model_callback=exercise_bank_after_model_callback,
+        # Banked, live or degraded: the questions set are recorded for grading.
+        after_agent_callback=record_exercises_callback,
     )
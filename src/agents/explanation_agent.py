@@ -7,6 +7,12 @@ from google.adk.agents import LlmAgent
 from google.adk.tools import load_memory
 
 from src.agents.search_agent import google_search_tool
+from src.core.cached_responses import (
+    explanation_after_agent_callback,
+    explanation_after_model_callback,
+    explanation_before_model_callback,
+)
+from src.core.degraded_mode import explanation_degraded_callback
 from src.core.llm import build_gemini_model
 
 
@@ -14,9 +20,9 @@ def build_explanation_agent() -> LlmAgent:
     """Create the explanation agent."""
     return LlmAgent(
         name="explanation_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("explanation_agent"),
         description="Explains concepts with adaptive depth and style.",
-        instruction=(
+        static_instruction=(
             "You are the Explanation Agent for an AI tutor.\n"
             "\n"
             "Context and input:\n"
@@ -40,6 +46,8 @@ def build_explanation_agent() -> LlmAgent:
             "- Use 'google_search_tool' when:\n"
             "  • The concept clearly benefits from external, up-to-date information (e.g., real-world examples), or\n"
             "  • You are uncertain about a factual detail and need to verify it.\n"
+            "  If several facets need searching, pass them together as 'queries' in ONE call instead of "
+            "searching one after another.\n"
             "- Use 'load_memory' when the learner refers to previous sessions or past topics, such as:\n"
             "  • 'What did we do last time?'\n"
             "  • 'Continue from where we left off.'\n"
@@ -61,4 +69,10 @@ def build_explanation_agent() -> LlmAgent:
             "but avoid long meta-conversations.\n"
         ),
         tools=[google_search_tool, load_memory],
+        before_model_callback=[
+            explanation_degraded_callback,
+            explanation_before_model_callback,
+        ],
+        after_model_callback=explanation_after_model_callback,
+        after_agent_callback=explanation_after_agent_callback,
     )
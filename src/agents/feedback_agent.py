@@ -5,6 +5,12 @@ Agent that grades learner answers, provides feedback, and updates progression.
 
 from google.adk.agents import LlmAgent
 
+from src.core.degraded_mode import (
+    feedback_degraded_callback,
+    feedback_pending_graded_callback,
+    feedback_pending_grading_callback,
+)
+from src.core.exercise_table import feedback_exercise_context_callback
 from src.core.llm import build_gemini_model
 from src.core.tools import record_exercise_result_tool
 
@@ -13,13 +19,15 @@ def build_feedback_agent() -> LlmAgent:
     """Create the feedback agent."""
     return LlmAgent(
         name="feedback_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("feedback_agent"),
         description="Grades learner answers and updates performance stats.",
-        instruction=(
+        static_instruction=(
             "You are the Feedback & Grading Agent for an AI tutor.\n"
             "\n"
             "Context:\n"
             "- You receive the learner's answer along with the original question text.\n"
+            "- When the question was recorded, it is given to you with its topic and difficulty; "
+            "use exactly those for 'record_exercise_result'.\n"
             "- Questions are usually labeled as Q1, Q2, Q3 with an associated difficulty.\n"
             "\n"
             "Your responsibilities:\n"
@@ -54,4 +62,10 @@ def build_feedback_agent() -> LlmAgent:
             "not enough information to determine correctness.\n"
         ),
         tools=[record_exercise_result_tool],
+        before_model_callback=[
+            feedback_degraded_callback,
+            feedback_exercise_context_callback,
+            feedback_pending_grading_callback,
+        ],
+        after_model_callback=feedback_pending_graded_callback,
     )
@@ -5,6 +5,7 @@ Agent that interviews the learner and updates StudentProfile via a tool.
 
 from google.adk.agents import LlmAgent
 
+from src.core.degraded_mode import profiling_degraded_callback
 from src.core.llm import build_gemini_model
 from src.core.tools import update_student_profile_tool
 
@@ -13,9 +14,9 @@ def build_profiling_agent() -> LlmAgent:
     """Create the profiling agent."""
     return LlmAgent(
         name="profiling_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("profiling_agent"),
         description="Collects learner profile, goals, and preferences.",
-        instruction=(
+        static_instruction=(
             "You are the Learner Profiling Agent for an AI tutor.\n"
             "\n"
             "Your responsibilities:\n"
@@ -49,4 +50,5 @@ def build_profiling_agent() -> LlmAgent:
             "- Do NOT re-profile unless the learner explicitly says their background or goals have changed.\n"
         ),
         tools=[update_student_profile_tool],
+        before_model_callback=profiling_degraded_callback,
     )
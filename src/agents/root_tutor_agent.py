@@ -7,8 +7,10 @@ from google.adk.agents import LlmAgent
 from google.adk.tools import load_memory
 from google.adk.tools.preload_memory_tool import PreloadMemoryTool
 
+from src.core.degraded_mode import root_degraded_callback
 from src.core.llm import build_gemini_model
 from src.core.observability import tutor_after_agent_callback
+from src.core.tools import suggest_review_topic_tool
 from src.agents.explanation_agent import build_explanation_agent
 from src.agents.exercise_agent import build_exercise_generator_agent
 from src.agents.feedback_agent import build_feedback_agent
@@ -37,14 +39,14 @@ def build_root_tutor_agent() -> LlmAgent:
 
     return LlmAgent(
         name="root_tutor_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("root_tutor_agent"),
         description=(
             "Orchestrates a team of tutoring agents that profile the learner, explain concepts, "
             "Adaptive AI tutor that profiles the learner, explains concepts, "
             "generates practice questions, and gives feedback with intelligent "
             "difficulty progression."
         ),
-        instruction=(
+        static_instruction=(
             "You are the Orchestrator for an AI tutoring system.\n"
             "\n"
             "Important: You do NOT answer the user directly and you do NOT generate explanations or exercises "
@@ -66,6 +68,9 @@ def build_root_tutor_agent() -> LlmAgent:
             "  and update progress.\n"
             "- Use 'google_search_tool' when the concept clearly benefits from external information or examples.\n"
             "- Use 'load_memory' or 'PreloadMemoryTool' to bring in relevant past context when available.\n"
+            "- When the learner asks what to study or review next, or finishes a lesson without choosing a new "
+            "  topic, call 'suggest_review_topic'. If it returns a topic that is due, offer a short review of it "
+            "  via 'lesson_pipeline_agent'.\n"
             "\n"
             "Transition rules:\n"
             "- Do NOT ask the user to say 'yes', 'okay', or 'let's go' just to proceed. After profiling is done, "
@@ -81,7 +86,8 @@ def build_root_tutor_agent() -> LlmAgent:
             "- Always make the next step obvious: either ask a clear follow-up question or move into a lesson "
             "  or feedback without extra friction.\n"
         ),
-        tools=[google_search_tool, load_memory, PreloadMemoryTool()],
+        tools=[google_search_tool, load_memory, PreloadMemoryTool(), suggest_review_topic_tool],
         sub_agents=[profiling_agent, lesson_pipeline_agent, feedback_agent],
+        before_model_callback=root_degraded_callback,
         after_agent_callback=tutor_after_agent_callback,
     )
@@ -4,18 +4,105 @@ with other functions tools!!!
 """
 
 
+from typing import Any, Dict
+
+from google.genai import types as genai_types
 from google.adk.agents import LlmAgent
 from google.adk.tools import google_search
 from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
 
+from src.config import config
+from src.core.cached_responses import search_cache, search_cache_key, search_flights
 from src.core.llm import build_gemini_model
+from src.core.search_fanout import (
+    AgentSearchBackend,
+    get_search_backend,
+    search_fanout,
+    split_queries,
+)
+
+
+_TOOL_DESCRIPTION = (
+    "Searches the web using Google Search. Pass one question as 'request', or "
+    "several facets of a question as 'queries' to search them in parallel and get "
+    "one merged digest."
+)
+_QUERIES_DESCRIPTION = "Independent sub-queries, e.g. one per facet of the question."
+
+
+class CachedAgentTool(AgentTool):
+    """
+    AgentTool that reuses answers for repeated queries and shares one nested
+    agent run between concurrent identical queries.
+
+    Besides a single `request`, it accepts several `queries`: these run
+    concurrently (see src/core/search_fanout.py) and come back as one merged,
+    de-duplicated digest instead of one nested conversation per facet.
+    """
+
+    def _get_declaration(self) -> genai_types.FunctionDeclaration:
+        declaration = super()._get_declaration()
+        declaration.description = _TOOL_DESCRIPTION
+        queries = {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": _QUERIES_DESCRIPTION,
+        }
+        if declaration.parameters_json_schema is not None:
+            schema = declaration.parameters_json_schema
+            schema["properties"]["queries"] = queries
+            schema.pop("required", None)
+        elif declaration.parameters is not None:
+            declaration.parameters.properties["queries"] = genai_types.Schema(
+                type=genai_types.Type.ARRAY,
+                items=genai_types.Schema(type=genai_types.Type.STRING),
+                description=_QUERIES_DESCRIPTION,
+            )
+            declaration.parameters.required = None
+        return declaration
+
+    async def _search_one(self, query: str, tool_context: ToolContext) -> Any:
+        key = search_cache_key(query)
+        cached = search_cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def _search() -> Any:
+            result = await super(CachedAgentTool, self).run_async(
+                args={"request": query}, tool_context=tool_context
+            )
+            if isinstance(result, str) and result:
+                search_cache.put(key, result)
+            return result
+
+        return await search_flights.do(key, _search)
+
+    async def run_async(
+        self,
+        *,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+    ) -> Any:
+        queries = split_queries(args, config.search_max_queries)
+        if not queries:
+            if "request" in args or "queries" in args:
+                return "No search query was given."
+            return await super().run_async(args=args, tool_context=tool_context)
+
+        backend = get_search_backend()
+        if backend is None:
+            if len(queries) == 1:
+                return await self._search_one(queries[0], tool_context)
+            backend = AgentSearchBackend(self._search_one)
+        return await search_fanout.search(queries, backend, tool_context)
 
 
 def build_search_agent() -> LlmAgent:
     """Agent that ONLY uses the Google Search built-in tool."""
     return LlmAgent(
         name="google_search_agent",
-        model=build_gemini_model(),
+        model=build_gemini_model("google_search_agent"),
         description="Searches the web using Google Search.",
         instruction=(
             "You are a specialist in using Google Search. "
@@ -26,4 +113,4 @@ def build_search_agent() -> LlmAgent:
     )
 
 search_agent = build_search_agent()
-google_search_tool = AgentTool(search_agent)
+google_search_tool = CachedAgentTool(search_agent)
@@ -1,16 +1,36 @@
 """
-Creates the ADK App, wiring together the root agent, memory, and
-context compaction (summarization).
+Creates the ADK App, wiring together the root agent, memory, context
+compaction (summarization), per-session size instrumentation, release of
+shared explanation calls on failure, per-learner usage budgets, per-turn
+profiling, the startup warm-up turn and ordered learner-state writes from
+the async tools.
 """
 
 
+import tempfile
 import warnings
+from pathlib import Path
+from typing import Optional
 
 from google.adk.apps.app import App, EventsCompactionConfig
-from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import InMemoryRunner, Runner
 
 from src.config import config
+from src.core.cached_responses import ExplanationFlightPlugin
+from src.core.degraded_mode import ResilientEventSummarizer
 from src.core.llm import build_gemini_model
+from src.core.prewarm import PrewarmPlugin
+from src.core.session_metrics import (
+    SessionMetricsPlugin,
+    allocation_profiler,
+    session_monitor,
+)
+from src.core.session_store import PersistentSessionService
+from src.core.turn_profiler import TurnProfilerPlugin, turn_profiler
+from src.core.usage_budget import UsageBudgetPlugin, usage_budget, usage_meter
+from src.core.user_state import UserStatePlugin, user_state
 from src.agents.root_tutor_agent import build_root_tutor_agent
 
 
@@ -18,8 +38,8 @@ def build_app() -> App:
     """Build the ADK App for the AI Tutor."""
     root_agent = build_root_tutor_agent()
 
-    summarizer_llm = build_gemini_model()
-    summarizer = LlmEventSummarizer(llm=summarizer_llm)
+    summarizer_llm = build_gemini_model("event_summarizer")
+    summarizer = ResilientEventSummarizer(llm=summarizer_llm)
 
     # Hide the experimental warning for EventsCompactionConfig
     warnings.filterwarnings(
@@ -34,11 +54,53 @@ def build_app() -> App:
         overlap_size=2,
     )
 
+    # First, so the warm-up turn's model calls are answered before any other plugin.
+    plugins = [PrewarmPlugin()]
+    if config.session_metrics:
+        plugins.append(SessionMetricsPlugin(session_monitor, allocation_profiler))
+    if config.usage_metering:
+        plugins.append(UsageBudgetPlugin(usage_meter, usage_budget))
+    # Frees waiting duplicate explanations when the leading one fails.
+    plugins.append(ExplanationFlightPlugin())
+    # Inert until a turn is profiled (TUTOR_PROFILE_*, or the CLI's --profile).
+    plugins.append(TurnProfilerPlugin(turn_profiler))
+    # Last, right before events are appended: stale learner-state writes are upgraded.
+    if config.async_tools:
+        plugins.append(UserStatePlugin(user_state))
+
     return App(
         name=config.app_name,
         root_agent=root_agent,
+        plugins=plugins,
         events_compaction_config=compaction_config,
     )
 
+
+def build_runner(app: App, session_dir: Optional[str] = None) -> Runner:
+    """
+    Runner for the app. Sessions are durable (event log + snapshots) when
+    TUTOR_SESSION_DIR (or `session_dir`) is set, and in-memory otherwise.
+    With a residency limit (TUTOR_SESSION_MAX_RESIDENT / _BYTES) idle
+    sessions are spilled to disk, to a temporary directory if no session
+    directory is set.
+    """
+    session_dir = session_dir or config.session_dir
+    bounded = config.session_max_resident or config.session_max_resident_bytes
+    if not session_dir and not bounded:
+        return InMemoryRunner(app=app)
+
+    session_dir = session_dir or tempfile.mkdtemp(prefix="tutor-sessions-")
+    return Runner(
+        app=app,
+        session_service=PersistentSessionService(
+            Path(session_dir),
+            snapshot_every=config.session_snapshot_every,
+            max_resident=config.session_max_resident,
+            max_resident_bytes=config.session_max_resident_bytes,
+        ),
+        memory_service=InMemoryMemoryService(),
+        artifact_service=InMemoryArtifactService(),
+    )
+
 # Global instances that other modules (CLI, evaluation, etc.) can reuse
 app: App = build_app()
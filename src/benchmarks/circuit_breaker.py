@@ -0,0 +1,97 @@
+"""
+Fault-injection run for the model circuit breaker.
+
+A stub backend goes through three phases: healthy, a full outage in which
+every call hangs (as it would while retrying) and then fails, and recovery.
+For each phase we report how many calls reached the backend, how many were
+short-circuited, and the mean caller latency, followed by the breaker's state
+transitions.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.circuit_breaker
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.core.llm import CircuitBreakerLlm
+from src.core.stub_llm import StubLlm
+
+
+async def _phase(
+    name: str,
+    model: CircuitBreakerLlm,
+    backend: StubLlm,
+    breaker: CircuitBreaker,
+    calls: int,
+    concurrency: int,
+) -> None:
+    request = LlmRequest(
+        contents=[genai_types.Content(role="user", parts=[genai_types.Part(text="hi")])]
+    )
+    latencies: List[float] = []
+    outcomes = {"ok": 0, "failed": 0, "short_circuited": 0}
+    backend_before = backend.call_count
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async for _ in model.generate_content_async(request):
+                    pass
+                outcomes["ok"] += 1
+            except CircuitOpenError:
+                outcomes["short_circuited"] += 1
+            except Exception:
+                outcomes["failed"] += 1
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    print(
+        f"{name:<10} backend_calls={backend.call_count - backend_before:<4} "
+        f"{outcomes} mean_latency={statistics.mean(latencies) * 1000:.1f}ms "
+        f"state={breaker.state.value}"
+    )
+
+
+async def run_benchmark(calls: int, concurrency: int) -> None:
+    breaker = CircuitBreaker(window_s=5.0, min_requests=5, open_duration_s=0.5)
+    backend = StubLlm(model="gemini-stub", latency_s=0.01)
+    model = CircuitBreakerLlm(model=backend.model, inner=backend, breaker=breaker)
+
+    print("=== Circuit breaker fault injection (offline stub) ===")
+    await _phase("healthy", model, backend, breaker, calls, concurrency)
+
+    backend.failure_rate = 1.0
+    backend.latency_s = 0.2  # a failing backend is also a slow one
+    await _phase("outage", model, backend, breaker, calls, concurrency)
+
+    backend.failure_rate = 0.0
+    backend.latency_s = 0.01
+    await asyncio.sleep(breaker.open_duration_s)
+    await _phase("recovery", model, backend, breaker, calls, concurrency)
+
+    print(f"\nmetrics={breaker.metrics()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
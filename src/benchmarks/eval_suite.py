@@ -0,0 +1,162 @@
+"""
+Throughput of the evaluation suite engine on large synthetic suites.
+
+For each keyword-list size, generates a suite of cases plus one recorded
+response per case, writes both to JSONL and compares, in cases/sec:
+
+  - per-keyword scan: the old heuristic (lowercase the response, then one
+                      `in` scan per keyword)
+  - suite engine:     `src/evaluation/suite.py` (substring scans for short
+                      keyword lists, one Aho-Corasick pass for long ones
+                      when pyahocorasick is installed, else one regex pass)
+
+Long keyword lists are compiled when the cases are loaded, so `load`
+includes that cost (an automaton is cheap to build; a regex over thousands
+of keywords takes tens of milliseconds, as long as dozens of scans). The
+engine then scores the suite three times, as for repeated runs or replays.
+Both scorers must agree on every case. `--without-automaton` measures the
+regex fallback with pyahocorasick installed.
+
+    uv run python -m src.benchmarks.eval_suite
+    uv run python -m src.benchmarks.eval_suite --cases 10000 --keywords 50,500 --length 4000
+    uv run python -m src.benchmarks.eval_suite --keywords 200,2000 --without-automaton
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from src.evaluation import suite as eval_suite
+from src.evaluation.suite import EvalCase, Response, load_cases, load_responses, score
+
+
+def _vocabulary(rng: random.Random, size: int) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)
+    ]
+
+
+def _write_suite(
+    directory: Path, cases: int, keywords: int, length: int, seed: int
+) -> Sequence[Path]:
+    rng = random.Random(seed)
+    # Responses are written from one word pool and keywords drawn from
+    # another, with a few keywords planted in each response.
+    vocabulary = _vocabulary(rng, max(10000, 4 * keywords))
+    half = len(vocabulary) // 2
+    text_words, keyword_pool = vocabulary[:half], vocabulary[half:]
+    cases_path = directory / "cases.jsonl"
+    responses_path = directory / "responses.jsonl"
+    with open(cases_path, "w", encoding="utf-8") as cases_file, open(
+        responses_path, "w", encoding="utf-8"
+    ) as responses_file:
+        for index in range(cases):
+            planted = rng.sample(keyword_pool, 5)
+            words: List[str] = list(planted[:4])
+            if rng.random() < 0.1:
+                words.append(planted[4])
+            while sum(len(word) + 1 for word in words) < length:
+                words.append(rng.choice(text_words))
+            rng.shuffle(words)
+            text = " ".join(words)
+            case = {
+                "name": f"case_{index}",
+                "query": f"question {index}",
+                "must_contain_any": rng.sample(keyword_pool, keywords) + planted[:1],
+                "must_contain_all": [word.upper() for word in planted[1:4]]
+                + ([rng.choice(keyword_pool)] if rng.random() < 0.1 else []),
+                "must_not_contain": rng.sample(keyword_pool, max(1, keywords // 5))
+                + planted[4:],
+                "min_length": length // 2,
+            }
+            cases_file.write(json.dumps(case) + "\n")
+            responses_file.write(json.dumps({"name": case["name"], "text": text}) + "\n")
+    return cases_path, responses_path
+
+
+def _per_keyword_scan(case: EvalCase, response: Response) -> bool:
+    text = response.text
+    text_lower = text.lower()
+    if case.min_length and len(text.strip()) < case.min_length:
+        return False
+    if case.must_contain_any and not any(k.lower() in text_lower for k in case.must_contain_any):
+        return False
+    if case.must_contain_all and not all(k.lower() in text_lower for k in case.must_contain_all):
+        return False
+    if any(k.lower() in text_lower for k in case.must_not_contain):
+        return False
+    return True
+
+
+def _run_size(cases: int, keywords: int, length: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cases_path, responses_path = _write_suite(Path(tmp), cases, keywords, length, seed)
+        start = time.perf_counter()
+        suite = load_cases([cases_path])
+        load_s = time.perf_counter() - start
+        responses: Dict[str, Response] = load_responses(responses_path, suite)
+
+    start = time.perf_counter()
+    baseline = [_per_keyword_scan(case, responses[case.name]) for case in suite]
+    baseline_s = time.perf_counter() - start
+
+    passes = [score(suite, responses) for _ in range(3)]
+    warm = passes[-1]
+    engine = [case_result.passed for case_result in warm.results]
+    if engine != baseline:
+        disagreements = sum(a != b for a, b in zip(engine, baseline))
+        raise SystemExit(f"Scorers disagree on {disagreements} cases")
+
+    print(f"--- ~{keywords} keywords per case ---")
+    print(f"load:             {load_s:.2f}s ({cases / load_s:,.0f} cases/s)")
+    print(f"per-keyword scan: {baseline_s:.2f}s ({cases / baseline_s:,.0f} cases/s)")
+    for name, result in zip(("engine, pass 1", "engine, pass 2", "engine, pass 3"), passes):
+        print(
+            f"{name + ':':<17} {result.seconds:.2f}s ({cases / result.seconds:,.0f} cases/s) "
+            f"x{baseline_s / result.seconds:.1f}"
+        )
+    print(f"summary: {warm.summary()}")
+
+
+def run_benchmark(
+    cases: int, keyword_counts: List[int], length: int, seed: int, automaton: bool = True
+) -> None:
+    if not automaton:
+        eval_suite.ahocorasick = None
+    backend = "pyahocorasick" if eval_suite.ahocorasick is not None else "not used (regex)"
+    print(
+        f"=== Evaluation suite: {cases} cases, {length}-char responses, "
+        f"Aho-Corasick automaton: {backend} ==="
+    )
+    for keywords in keyword_counts:
+        _run_size(cases, keywords, length, seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--keywords", default="20,200,2000")
+    parser.add_argument("--length", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--without-automaton", action="store_true", help="Use the regex fallback."
+    )
+    args = parser.parse_args()
+    keyword_counts = [int(count) for count in args.keywords.split(",") if count.strip()]
+    run_benchmark(
+        args.cases, keyword_counts, args.length, args.seed, not args.without_automaton
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark for serving lesson exercises from the pre-generated bank.
+
+Learners take lessons on topics drawn from a Zipf distribution. Live
+generation costs one call to the offline stub model; the bank serves unseen
+questions at the learner's difficulty, harvests live output, and refills low
+stock in the background. We compare:
+
+  - live:      every lesson generates its questions
+  - bank:      cold bank, filled by harvesting and background refills
+  - prefilled: the popular topics were generated offline beforehand
+
+    uv run python -m src.benchmarks.exercise_bank
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import re
+import statistics
+import time
+from typing import Dict, List, Optional, Set
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.core.exercise_bank import (
+    DIFFICULTIES,
+    ExerciseBank,
+    ExerciseRefiller,
+    exercise_id,
+    format_exercises,
+    generate_exercises,
+    parse_exercises,
+)
+from src.core.stub_llm import StubLlm, last_user_text, text_response
+
+
+_TOPICS = [f"topic {i}" for i in range(100)]
+_BATCH_PROMPT = re.compile(r"Write (\d+) distinct (\w+) practice questions about (.+?) for")
+_counter = itertools.count()
+
+
+def _question_writer(llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+    """Stub responder that writes fresh questions in the exercise agent's format."""
+    prompt = last_user_text(llm_request)
+    match = _BATCH_PROMPT.search(prompt)
+    if match:
+        count, difficulties, topic = int(match.group(1)), [match.group(2)], match.group(3)
+    else:
+        count, difficulties, topic = 3, ["easy", "medium", "hard"], prompt
+    exercises = [
+        (difficulties[i % len(difficulties)], f"Question {next(_counter)} on {topic}?", "Explain.")
+        for i in range(count)
+    ]
+    return text_response(format_exercises(exercises), llm_request)
+
+
+async def _run(
+    label: str,
+    lessons: List[tuple],
+    use_bank: bool,
+    prefill_topics: int,
+    latency_s: float,
+) -> None:
+    model = StubLlm(model="gemini-stub", latency_s=latency_s, responder=_question_writer)
+    bank = ExerciseBank()
+    refiller = ExerciseRefiller(bank, model_factory=lambda: model, min_stock=6)
+    seen: Dict[str, Set[str]] = {}
+
+    for topic in _TOPICS[:prefill_topics]:
+        for difficulty in DIFFICULTIES:
+            bank.add(topic, await generate_exercises(model, topic, difficulty, 9))
+    model.call_count = 0
+
+    latencies: List[float] = []
+    for learner, topic, difficulty in lessons:
+        start = time.perf_counter()
+        learner_seen = seen.setdefault(learner, set())
+        drawn: Optional[list] = None
+        if use_bank:
+            drawn = bank.draw(topic, difficulty, 3, exclude=learner_seen)
+            refiller.maybe_refill(topic, difficulty)
+
+        if drawn is not None:
+            learner_seen.update(drawn_id for drawn_id, _ in drawn)
+        else:
+            request = LlmRequest(
+                contents=[
+                    genai_types.Content(role="user", parts=[genai_types.Part(text=topic)])
+                ]
+            )
+            text = ""
+            async for response in model.generate_content_async(request):
+                text = response.content.parts[0].text
+            exercises = parse_exercises(text)
+            if use_bank:
+                bank.add(topic, exercises)
+            learner_seen.update(exercise_id(topic, question) for _, question, _ in exercises)
+        latencies.append(time.perf_counter() - start)
+        # Learners think between lessons; background refills run meanwhile.
+        await asyncio.sleep(0.005)
+
+    await refiller.drain()
+    latencies.sort()
+    print(
+        f"{label:<10} hit_rate={bank.hit_rate:6.1%} "
+        f"mean={statistics.mean(latencies) * 1000:6.1f}ms "
+        f"p95={latencies[int(0.95 * len(latencies))] * 1000:6.1f}ms "
+        f"model_calls={model.call_count} (lessons={len(lessons)}, refills={refiller.refills})"
+    )
+
+
+def _lessons(count: int, learners: int, skew: float, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** skew for rank in range(len(_TOPICS))]
+    return [
+        (
+            f"learner-{rng.randrange(learners)}",
+            rng.choices(_TOPICS, weights=weights)[0],
+            rng.choice(DIFFICULTIES),
+        )
+        for _ in range(count)
+    ]
+
+
+async def run_benchmark(
+    lessons: int, learners: int, skew: float, latency_ms: float, seed: int
+) -> None:
+    mix = _lessons(lessons, learners, skew, seed)
+    print(
+        f"=== Exercise bank: {lessons} lessons, {learners} learners, "
+        f"{len(_TOPICS)} topics (zipf s={skew}) ==="
+    )
+    latency_s = latency_ms / 1000.0
+    await _run("live", mix, use_bank=False, prefill_topics=0, latency_s=latency_s)
+    await _run("bank", mix, use_bank=True, prefill_topics=0, latency_s=latency_s)
+    await _run("prefilled", mix, use_bank=True, prefill_topics=20, latency_s=latency_s)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lessons", type=int, default=1000)
+    parser.add_argument("--learners", type=int, default=200)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(args.lessons, args.learners, args.skew, args.latency_ms, args.seed)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Prompt tokens per grading turn: full history vs the exercise table.
+
+Synthetic learners from `load_simulator` take lessons and answer every
+question (Q1..Q3) on the offline stub, through the full App (with its event
+compaction). Compared:
+
+  - full history:    the feedback agent finds the question by reading back
+                     through the conversation
+  - exercise table:  the referenced question's record is injected and only
+                     the current turn's contents are sent
+
+For each we report the feedback agent's prompt tokens per grading turn
+(estimated, ~4 characters per token), overall and for the first and last
+lessons, whether the graded question was in the prompt, and the attempts
+recorded. Each configuration runs in a fresh process.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.grading_context
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.grading_context --lessons 12
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import re
+import statistics
+import warnings
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.benchmarks.load_simulator import LearnerBehavior, ScriptedTutor, make_learners
+from src.core.exercise_bank import parse_exercises
+from src.core.stub_llm import estimate_tokens, request_text, set_default_responder
+
+
+_LABEL = re.compile(r"^For Q(\d+) my answer")
+
+
+class _GradingMeter:
+    """Wraps ScriptedTutor and measures every feedback-agent request."""
+
+    def __init__(self, tutor: ScriptedTutor) -> None:
+        self.tutor = tutor
+        self.turn_tokens = 0
+        # Text of the question being answered, as the lesson set it.
+        self.question = ""
+        self.question_seen = False
+
+    def __call__(self, llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+        if agent_name == "feedback_agent":
+            text = request_text(llm_request)
+            self.turn_tokens += estimate_tokens(text)
+            self.question_seen |= bool(self.question) and self.question in text
+        return self.tutor(llm_request, agent_name)
+
+
+def _run_configuration(
+    table_size: int, learners: int, lessons: int, seed: int
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.app_factory import build_app
+    from src.core.exercise_table import exercise_context
+    from google.adk.runners import InMemoryRunner
+
+    exercise_context.max_records = table_size
+    meter = _GradingMeter(ScriptedTutor())
+    set_default_responder(meter)
+    runner = InMemoryRunner(app=build_app())
+    behavior = LearnerBehavior(answers_per_lesson=3)
+
+    async def drive() -> Dict[str, Any]:
+        by_lesson: Dict[int, List[int]] = defaultdict(list)
+        seen = 0
+        attempts = 0
+        for learner in make_learners(learners, lessons, behavior, seed):
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=learner.user_id
+            )
+            lesson = 0
+            questions: List[str] = []
+            for text in learner.turns():
+                lesson += text.startswith("Teach me ")
+                answer = _LABEL.search(text)
+                meter.turn_tokens, meter.question_seen = 0, False
+                meter.question = (
+                    questions[int(answer.group(1)) - 1]
+                    if answer and int(answer.group(1)) <= len(questions)
+                    else ""
+                )
+                async for event in runner.run_async(
+                    user_id=learner.user_id,
+                    session_id=session.id,
+                    new_message=genai_types.Content(
+                        role="user", parts=[genai_types.Part(text=text)]
+                    ),
+                ):
+                    if event.author == "exercise_generator_agent" and event.content:
+                        exercises = parse_exercises(
+                            "".join(part.text or "" for part in event.content.parts or [])
+                        )
+                        if exercises:
+                            questions = [question for _, question, _ in exercises]
+                if answer:
+                    by_lesson[lesson].append(meter.turn_tokens)
+                    seen += meter.question_seen
+            session = await runner.session_service.get_session(
+                app_name=runner.app_name, user_id=learner.user_id, session_id=session.id
+            )
+            attempts += session.state.get("user:student_progress", {}).get("total_attempts", 0)
+        return {
+            "by_lesson": dict(by_lesson),
+            "question_seen": seen,
+            "attempts": attempts,
+            "metrics": exercise_context.metrics(),
+        }
+
+    return asyncio.run(drive())
+
+
+def run_benchmark(learners: int, lessons: int, table_size: int, seed: int) -> None:
+    print(
+        f"=== Grading context: {learners} learners x {lessons} lessons x 3 answers ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    baseline = None
+    for name, size in (("full history", 0), ("exercise table", table_size)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(_run_configuration, size, learners, lessons, seed).result()
+        by_lesson = result["by_lesson"]
+        turns = [tokens for lesson in sorted(by_lesson) for tokens in by_lesson[lesson]]
+        mean = statistics.mean(turns)
+        baseline = baseline or mean
+        first, last = min(by_lesson), max(by_lesson)
+        print(f"--- {name} ---")
+        print(
+            f"grading turns={len(turns)} prompt tokens/turn: mean={mean:,.0f} "
+            f"({(mean / baseline - 1) * 100:+.1f}%) max={max(turns):,} "
+            f"lesson {first}={statistics.mean(by_lesson[first]):,.0f} "
+            f"lesson {last}={statistics.mean(by_lesson[last]):,.0f}"
+        )
+        print(
+            f"    graded question in prompt: {result['question_seen']}/{len(turns)}  "
+            f"attempts recorded={result['attempts']}"
+        )
+        if size:
+            print(f"    table: {result['metrics']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--learners", type=int, default=4)
+    parser.add_argument("--lessons", type=int, default=8)
+    parser.add_argument("--table-size", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.learners, args.lessons, args.table_size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
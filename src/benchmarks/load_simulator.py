@@ -0,0 +1,449 @@
+"""
+Synthetic-learner load simulator for end-to-end throughput testing.
+
+Spawns N synthetic learners that drive the real `App` concurrently through an
+InMemoryRunner against the offline stub model. Each learner introduces
+themselves (profiling), then takes lessons: asks for a topic drawn from a
+Zipf distribution and answers the questions, correct with a per-learner
+probability drawn from a Beta distribution. A scripted stub responder plays
+every agent, including its tool calls, so the real tools, callbacks, state
+handling and compaction all run.
+
+For each (concurrency, session length) scenario we report turns/sec, model
+calls per agent, state and event growth per session, event-loop lag and
+memory. Each scenario runs in a fresh process, so its peak RSS is its own:
+`peak_rss` is the process's peak and `peak_rss/session` its growth over the
+peak after setup (imports, App, prewarm), divided by the sessions.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.load_simulator
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.load_simulator \\
+        --concurrency 1,16,64 --lessons 2,8 --latency-ms 50
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import re
+import resource
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.apps.app import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+
+from src.core.stub_llm import StubLlm, set_default_responder, text_response
+
+
+_LEVELS = ["beginner", "intermediate", "advanced"]
+_STYLES = ["intuitive examples", "formal math", "code-first"]
+_TOPICS = [f"topic {i}" for i in range(50)]
+
+_ANSWER = re.compile(r"my answer is .*\(topic: (.+?), (easy|medium|hard)\) \[(correct|wrong)\]")
+_LESSON = re.compile(r"^Teach me (.+)$")
+_PROFILE = re.compile(r"I'm an? (\w+) learner")
+_BANK_BATCH = re.compile(r"Write (\d+) distinct (\w+) practice questions about (.+?) for")
+
+
+@dataclass
+class LearnerBehavior:
+    """Distributions the synthetic learners are drawn from."""
+
+    topic_skew: float = 1.1
+    # Per-learner answer accuracy ~ Beta(alpha, beta).
+    accuracy_alpha: float = 4.0
+    accuracy_beta: float = 2.0
+    answers_per_lesson: int = 1
+
+
+@dataclass
+class SyntheticLearner:
+    user_id: str
+    level: str
+    style: str
+    accuracy: float
+    topics: List[str]
+    behavior: LearnerBehavior
+    rng: random.Random = field(repr=False, default_factory=random.Random)
+
+    def turns(self) -> Iterator[str]:
+        yield (
+            f"Hi, I'm a {self.level} learner. I prefer {self.style} and want to "
+            "get better at machine learning."
+        )
+        for topic in self.topics:
+            yield f"Teach me {topic}"
+            for number in range(1, self.behavior.answers_per_lesson + 1):
+                correct = self.rng.random() < self.accuracy
+                difficulty = self.rng.choice(["easy", "medium", "hard"])
+                yield (
+                    f"For Q{number} my answer is a short explanation "
+                    f"(topic: {topic}, {difficulty}) [{'correct' if correct else 'wrong'}]"
+                )
+
+
+def make_learners(
+    count: int, lessons: int, behavior: LearnerBehavior, seed: int
+) -> List[SyntheticLearner]:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** behavior.topic_skew for rank in range(len(_TOPICS))]
+    return [
+        SyntheticLearner(
+            user_id=f"learner-{seed}-{index}",
+            level=rng.choice(_LEVELS),
+            style=rng.choice(_STYLES),
+            accuracy=rng.betavariate(behavior.accuracy_alpha, behavior.accuracy_beta),
+            topics=rng.choices(_TOPICS, weights=weights, k=lessons),
+            behavior=behavior,
+            rng=random.Random(rng.random()),
+        )
+        for index in range(count)
+    ]
+
+
+# --- scripted agents -------------------------------------------------------
+
+
+def _learner_message(llm_request: LlmRequest) -> str:
+    """The latest message a learner actually typed (not agent context)."""
+    for content in reversed(llm_request.contents):
+        if content.role != "user":
+            continue
+        texts = [part.text for part in content.parts or [] if part.text]
+        # Other agents' turns are replayed as user content quoted "For context:".
+        if texts and not texts[0].startswith("For context:"):
+            return "\n".join(texts)
+    return ""
+
+
+def _function_call(name: str, args: Dict[str, object]) -> LlmResponse:
+    return LlmResponse(
+        content=genai_types.Content(
+            role="model",
+            parts=[genai_types.Part(function_call=genai_types.FunctionCall(name=name, args=args))],
+        )
+    )
+
+
+_ROUTING_AGENTS = frozenset({"root_tutor_agent", "profiling_agent", "feedback_agent"})
+
+
+def _route(message: str) -> str:
+    if _ANSWER.search(message):
+        return "feedback_agent"
+    if _LESSON.match(message):
+        return "lesson_pipeline_agent"
+    return "profiling_agent"
+
+
+class ScriptedTutor:
+    """Stub responder that plays every agent and counts calls per agent."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self.bank_questions = 0
+
+    def __call__(self, llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+        self.calls[agent_name or "unknown"] += 1
+        message = _learner_message(llm_request)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        after_tool = last is not None and any(
+            part.function_response for part in last.parts or []
+        )
+
+        # A learner's next turn goes to whichever agent answered last, so the
+        # conversational agents route as well as the root does.
+        if agent_name in _ROUTING_AGENTS and not after_tool:
+            target = _route(message)
+            if target != agent_name:
+                return _function_call("transfer_to_agent", {"agent_name": target})
+
+        if agent_name == "profiling_agent" and not after_tool:
+            match = _PROFILE.search(message)
+            return _function_call(
+                "update_student_profile",
+                {"profile_json": {"level": match.group(1) if match else "beginner"}},
+            )
+
+        if agent_name == "exercise_generator_agent":
+            lesson = _LESSON.match(message)
+            topic = lesson.group(1) if lesson else "the topic"
+            if not after_tool:
+                return _function_call("get_next_exercise_difficulty", {"topic": topic})
+            text = "\n\n".join(
+                f"Q{n} (easy): Question {n} about {topic}?\nHint/clarification: Be brief."
+                for n in range(1, 4)
+            )
+            return text_response(text, llm_request)
+
+        if agent_name == "exercise_bank_generator":
+            batch = _BANK_BATCH.search(message)
+            if batch:
+                count, difficulty, topic = int(batch.group(1)), batch.group(2), batch.group(3)
+                self.bank_questions += count
+                text = "\n\n".join(
+                    f"Q{n} ({difficulty}): Banked question {self.bank_questions + n} about "
+                    f"{topic}?\nHint/clarification: Be brief."
+                    for n in range(1, count + 1)
+                )
+                return text_response(text, llm_request)
+
+        if agent_name == "feedback_agent" and not after_tool:
+            answer = _ANSWER.search(message)
+            if answer:
+                return _function_call(
+                    "record_exercise_result",
+                    {
+                        "topic": answer.group(1),
+                        "difficulty": answer.group(2),
+                        "was_correct": answer.group(3) == "correct",
+                    },
+                )
+
+        if agent_name == "explanation_agent":
+            lesson = _LESSON.match(message)
+            topic = lesson.group(1) if lesson else "this"
+            return text_response(f"{topic} explained. " * 40, llm_request)
+
+        return text_response(f"[{agent_name}] ok.", llm_request)
+
+
+# --- instrumentation -------------------------------------------------------
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires: a proxy for event-loop blocking."""
+
+    def __init__(self, interval_s: float = 0.01) -> None:
+        self.interval_s = interval_s
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval_s)
+            self.samples.append(max(0.0, loop.time() - start - self.interval_s))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _stub_models(app: App) -> Iterator[StubLlm]:
+    """Every StubLlm backend in the app, found by unwrapping model policies."""
+
+    def unwrap(model: object) -> Iterator[StubLlm]:
+        if isinstance(model, StubLlm):
+            yield model
+        elif isinstance(model, BaseLlm):
+            # Tiered models also hold a strong-tier `fallback`.
+            for attr in ("inner", "fallback"):
+                yield from unwrap(getattr(model, attr, None))
+
+    def walk(agent: BaseAgent) -> Iterator[StubLlm]:
+        yield from unwrap(getattr(agent, "model", None))
+        for tool in getattr(agent, "tools", None) or []:
+            if hasattr(tool, "agent"):
+                yield from walk(tool.agent)
+        for sub_agent in agent.sub_agents:
+            yield from walk(sub_agent)
+
+    yield from walk(app.root_agent)
+    compaction = app.events_compaction_config
+    if compaction is not None and compaction.summarizer is not None:
+        yield from unwrap(getattr(compaction.summarizer, "_llm", None))
+
+
+def install_scripted_tutor(latency_ms: float) -> Tuple[ScriptedTutor, int]:
+    """Make every stub model in this process answer as ScriptedTutor."""
+    from src.app_factory import app  # needs TUTOR_USE_STUB_MODEL
+
+    tutor = ScriptedTutor()
+    set_default_responder(tutor)
+    models = list(_stub_models(app))
+    for model in models:
+        model.latency_s = latency_ms / 1000.0
+    return tutor, len(models)
+
+
+def _peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# --- scenarios ---------------------------------------------------------------
+
+
+async def _run_learner(
+    runner: InMemoryRunner, learner: SyntheticLearner, turn_latencies: List[float]
+) -> Dict[str, int]:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=learner.user_id
+    )
+    for text in learner.turns():
+        start = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id=learner.user_id,
+            session_id=session.id,
+            new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+        ):
+            pass
+        turn_latencies.append(time.perf_counter() - start)
+
+    final = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=learner.user_id, session_id=session.id
+    )
+    return {
+        "state_bytes": len(json.dumps(final.state, default=str)),
+        "events": len(final.events),
+    }
+
+
+async def run_scenario(
+    app: App,
+    tutor: ScriptedTutor,
+    concurrency: int,
+    lessons: int,
+    behavior: LearnerBehavior,
+    seed: int,
+) -> Dict[str, Any]:
+    runner = InMemoryRunner(app=app)
+    learners = make_learners(concurrency, lessons, behavior, seed)
+    tutor.calls.clear()
+    turn_latencies: List[float] = []
+    monitor = LoopLagMonitor()
+
+    # Prewarm, so lazy imports on the first turn are not counted per session.
+    from src.core.prewarm import prepare
+
+    await prepare(app, runner)
+    rss_before = _peak_rss_kb()
+    monitor.start()
+    start = time.perf_counter()
+    sessions = await asyncio.gather(
+        *(_run_learner(runner, learner, turn_latencies) for learner in learners)
+    )
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+    peak_rss_kb = _peak_rss_kb()
+    return {
+        "elapsed": elapsed,
+        "turn_latencies": sorted(turn_latencies),
+        "sessions": sessions,
+        "lag_p99": monitor.percentile(0.99),
+        "lag_max": max(monitor.samples, default=0.0),
+        "peak_rss_kb": peak_rss_kb,
+        "rss_growth_kb": max(0, peak_rss_kb - rss_before),
+        "model_calls": dict(sorted(tutor.calls.items())),
+    }
+
+
+def _run_configuration(
+    concurrency: int, lessons: int, latency_ms: float, behavior: LearnerBehavior, seed: int
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    from src.app_factory import app  # needs TUTOR_USE_STUB_MODEL
+
+    tutor, _ = install_scripted_tutor(latency_ms)
+    return asyncio.run(run_scenario(app, tutor, concurrency, lessons, behavior, seed))
+
+
+def _print_scenario(concurrency: int, lessons: int, result: Dict[str, Any]) -> None:
+    turn_latencies = result["turn_latencies"]
+    sessions = result["sessions"]
+    turns = len(turn_latencies)
+    print(
+        f"concurrency={concurrency:<4} lessons={lessons:<3} turns={turns:<5} "
+        f"turns/s={turns / result['elapsed']:7.1f} "
+        f"turn_p50={turn_latencies[turns // 2] * 1000:6.1f}ms "
+        f"turn_p99={turn_latencies[min(turns - 1, int(0.99 * turns))] * 1000:6.1f}ms"
+    )
+    print(
+        f"    state/session={statistics.mean(s['state_bytes'] for s in sessions):,.0f}B "
+        f"events/session={statistics.mean(s['events'] for s in sessions):.0f} "
+        f"loop_lag_p99={result['lag_p99'] * 1000:.1f}ms "
+        f"loop_lag_max={result['lag_max'] * 1000:.1f}ms "
+        f"peak_rss={result['peak_rss_kb'] / 1024:,.0f}MB "
+        f"peak_rss/session={result['rss_growth_kb'] / len(sessions):,.0f}KB"
+    )
+    print(f"    model_calls={result['model_calls']}")
+
+
+def run_benchmark(
+    concurrency_levels: List[int],
+    session_lengths: List[int],
+    latency_ms: float,
+    behavior: LearnerBehavior,
+    seed: int,
+) -> None:
+    print(
+        f"=== Synthetic learners: {latency_ms:.0f}ms stub latency, "
+        f"accuracy~Beta({behavior.accuracy_alpha}, {behavior.accuracy_beta}) ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    for lessons in session_lengths:
+        for concurrency in concurrency_levels:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                result = pool.submit(
+                    _run_configuration, concurrency, lessons, latency_ms, behavior, seed
+                ).result()
+            _print_scenario(concurrency, lessons, result)
+            seed += 1
+
+
+def _int_list(raw: str) -> List[int]:
+    return [int(value) for value in raw.split(",") if value.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--lessons", type=_int_list, default=[2, 8])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--topic-skew", type=float, default=1.1)
+    parser.add_argument("--accuracy-alpha", type=float, default=4.0)
+    parser.add_argument("--accuracy-beta", type=float, default=2.0)
+    parser.add_argument("--answers-per-lesson", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    behavior = LearnerBehavior(
+        topic_skew=args.topic_skew,
+        accuracy_alpha=args.accuracy_alpha,
+        accuracy_beta=args.accuracy_beta,
+        answers_per_lesson=args.answers_per_lesson,
+    )
+    run_benchmark(args.concurrency, args.lessons, args.latency_ms, behavior, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Cost and latency of per-agent model tiers.
+
+Drives the full App with the synthetic learners from `load_simulator` under
+several tier configurations and reports calls, latency, tokens, estimated
+cost and escalations per agent and model:
+
+  - single tier:   every agent on the strong model
+  - tiered:        routing, summarization and grading on the fast model
+  - + malformed:   the fast model returns a broken tool call (unknown tool
+                   or missing arguments) at a given rate
+  - no escalation: the same, without retrying broken calls on the strong tier
+
+Stub latency is set per tier (background exercise-bank refills are not
+delayed). Each configuration runs in a fresh process, so caches and the
+exercise bank start cold every time.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.model_tiering
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.model_tiering \\
+        --learners 16 --malformed-rate 0.2 --strong-latency-ms 120
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import random
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+
+from src.benchmarks.load_simulator import (
+    LearnerBehavior,
+    ScriptedTutor,
+    SyntheticLearner,
+    _stub_models,
+    make_learners,
+)
+from src.core.model_tiers import TierPolicy
+from src.core.state import STATE_KEY_PROGRESS
+from src.core.stub_llm import StubResponder, set_default_responder
+
+
+STRONG_MODEL = "gemini-2.5-flash"
+FAST_MODEL = "gemini-2.5-flash-lite"
+
+
+class MalformedToolCalls:
+    """Wraps a responder and breaks a fraction of its tool calls."""
+
+    def __init__(self, responder: StubResponder, rate: float, seed: int) -> None:
+        self.responder = responder
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.injected = 0
+
+    def __call__(self, llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+        response = self.responder(llm_request, agent_name)
+        parts = response.content.parts if response.content else None
+        calls = [part.function_call for part in parts or [] if part.function_call]
+        if calls and self.rng.random() < self.rate:
+            self.injected += 1
+            if self.rng.random() < 0.5:
+                calls[0].name = f"{calls[0].name}_v2"
+            else:
+                calls[0].args = {}
+        return response
+
+
+async def _play(
+    runner: InMemoryRunner, learner: SyntheticLearner, latencies: List[float]
+) -> Tuple[int, int]:
+    """Play one learner; returns (failed turns, answers recorded in state)."""
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=learner.user_id
+    )
+    errors = 0
+    for text in learner.turns():
+        start = time.perf_counter()
+        try:
+            async for _ in runner.run_async(
+                user_id=learner.user_id,
+                session_id=session.id,
+                new_message=genai_types.Content(
+                    role="user", parts=[genai_types.Part(text=text)]
+                ),
+            ):
+                pass
+        except Exception:  # noqa: BLE001 - counted as a failed turn
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    final = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=learner.user_id, session_id=session.id
+    )
+    return errors, final.state.get(STATE_KEY_PROGRESS, {}).get("total_attempts", 0)
+
+
+def _run_configuration(
+    policy: TierPolicy,
+    malformed_rate: float,
+    learners: int,
+    lessons: int,
+    latency_ms: Dict[str, float],
+    seed: int,
+) -> Dict[str, Any]:
+    """Runs in a fresh process: builds the App under `policy` and drives it."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.core import llm
+
+    llm.tier_policy = policy
+    from src.app_factory import build_app
+
+    app = build_app()
+    tutor = ScriptedTutor()
+    set_default_responder(tutor)
+    corrupter = MalformedToolCalls(tutor, malformed_rate, seed)
+    for model in _stub_models(app):
+        model.latency_s = latency_ms.get(model.model, 0.0) / 1000.0
+        if malformed_rate and model.model == policy.fast_model:
+            model.responder = corrupter
+
+    async def drive() -> Tuple[List[Tuple[int, int]], List[float], float]:
+        runner = InMemoryRunner(app=app)
+        latencies: List[float] = []
+        population = make_learners(learners, lessons, LearnerBehavior(), seed)
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(_play(runner, learner, latencies) for learner in population)
+        )
+        return results, latencies, time.perf_counter() - start
+
+    llm.model_usage.reset()
+    results, latencies, elapsed = asyncio.run(drive())
+    latencies.sort()
+    return {
+        "turns": len(latencies),
+        "errors": sum(errors for errors, _ in results),
+        "answers": sum(answers for _, answers in results),
+        "elapsed_s": elapsed,
+        "turn_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "turn_p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+        "injected": corrupter.injected,
+        "usage": llm.model_usage.metrics(),
+    }
+
+
+def _report(name: str, result: Dict[str, Any], expected_answers: int) -> None:
+    usage = result["usage"]
+    cost = sum(entry["cost_usd"] for models in usage.values() for entry in models.values())
+    calls = sum(entry["calls"] for models in usage.values() for entry in models.values())
+    print(f"--- {name} ---")
+    print(
+        f"turns={result['turns']} failed_turns={result['errors']} "
+        f"answers_graded={result['answers']}/{expected_answers} "
+        f"malformed_injected={result['injected']} model_calls={calls}"
+    )
+    print(
+        f"turn_p50={result['turn_p50_ms']:.1f}ms turn_p95={result['turn_p95_ms']:.1f}ms "
+        f"cost=${cost:.5f} cost/turn=${cost / max(1, result['turns']):.7f}"
+    )
+    for agent_name, models in usage.items():
+        for model, entry in models.items():
+            print(
+                f"    {agent_name:<26} {model:<22} calls={entry['calls']:<5} "
+                f"mean={entry['latency_mean_ms']:6.1f}ms p95={entry['latency_p95_ms']:6.1f}ms "
+                f"tokens={entry['prompt_tokens'] + entry['output_tokens']:<8} "
+                f"cost=${entry['cost_usd']:.5f} escalations={entry['escalations']}"
+            )
+
+
+def run_benchmark(
+    learners: int,
+    lessons: int,
+    malformed_rate: float,
+    fast_latency_ms: float,
+    strong_latency_ms: float,
+    seed: int,
+) -> None:
+    configurations = [
+        ("single tier (strong)", TierPolicy(STRONG_MODEL, STRONG_MODEL), 0.0),
+        ("tiered", TierPolicy(STRONG_MODEL, FAST_MODEL), 0.0),
+        (
+            f"tiered, {malformed_rate:.0%} malformed fast tool calls",
+            TierPolicy(STRONG_MODEL, FAST_MODEL),
+            malformed_rate,
+        ),
+        (
+            f"tiered, {malformed_rate:.0%} malformed, no escalation",
+            TierPolicy(STRONG_MODEL, FAST_MODEL, escalate=False),
+            malformed_rate,
+        ),
+    ]
+    latency_ms = {STRONG_MODEL: strong_latency_ms, FAST_MODEL: fast_latency_ms}
+    expected_answers = learners * lessons * LearnerBehavior().answers_per_lesson
+    print(
+        f"=== Model tiers: {learners} learners x {lessons} lessons, "
+        f"{FAST_MODEL}={fast_latency_ms:.0f}ms, {STRONG_MODEL}={strong_latency_ms:.0f}ms ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    for name, policy, rate in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration, policy, rate, learners, lessons, latency_ms, seed
+            ).result()
+        _report(name, result, expected_answers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--learners", type=int, default=8)
+    parser.add_argument("--lessons", type=int, default=4)
+    parser.add_argument("--malformed-rate", type=float, default=0.1)
+    parser.add_argument("--fast-latency-ms", type=float, default=20.0)
+    parser.add_argument("--strong-latency-ms", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(
+        args.learners,
+        args.lessons,
+        args.malformed_rate,
+        args.fast_latency_ms,
+        args.strong_latency_ms,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
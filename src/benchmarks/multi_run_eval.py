@@ -0,0 +1,153 @@
+"""
+Wall time of repeated ADK evaluation runs, sequential vs parallel.
+
+Generates a synthetic evalset, then runs every case `--runs` times through
+`src/evaluation/multi_run.py` against the offline stub model with a fixed
+per-call latency:
+
+  - sequential:  concurrency 1 (one case run at a time, as `num_runs` loops)
+  - parallel:    each `--concurrency` level, recording inference results
+  - replay:      scoring the recorded results again without inference
+
+Each configuration runs in a fresh process. All configurations must report
+the same per-case pass rates.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.multi_run_eval
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.multi_run_eval \\
+        --cases 20 --runs 10 --concurrency 4,16 --latency-ms 100
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def _write_evalset(path: Path, cases: int) -> None:
+    from google.genai import types as genai_types
+    from google.adk.evaluation.eval_case import EvalCase, Invocation
+    from google.adk.evaluation.eval_set import EvalSet
+
+    def invocation(query: str, answer: str) -> Invocation:
+        return Invocation(
+            user_content=genai_types.Content(role="user", parts=[genai_types.Part(text=query)]),
+            final_response=genai_types.Content(
+                role="model", parts=[genai_types.Part(text=answer)]
+            ),
+        )
+
+    eval_set = EvalSet(
+        eval_set_id=path.name.split(".")[0],
+        eval_cases=[
+            EvalCase(
+                eval_id=f"case_{index}",
+                conversation=[
+                    invocation(
+                        f"Explain topic {index} to me.",
+                        f"Here is an explanation of topic {index}.",
+                    )
+                ],
+            )
+            for index in range(cases)
+        ],
+    )
+    path.write_text(eval_set.model_dump_json(exclude_none=True), encoding="utf-8")
+
+
+def _run_configuration(
+    evalset: str,
+    runs: int,
+    concurrency: int,
+    latency_ms: float,
+    record_dir: Optional[str],
+    replay_dir: Optional[str],
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.app_factory import app
+    from src.benchmarks.load_simulator import _stub_models
+    from src.evaluation.multi_run import run_multi_eval
+
+    for model in _stub_models(app):
+        model.latency_s = latency_ms / 1000.0
+    return asyncio.run(
+        run_multi_eval(
+            [Path(evalset)],
+            runs,
+            concurrency,
+            Path(record_dir) if record_dir else None,
+            Path(replay_dir) if replay_dir else None,
+        )
+    )
+
+
+def _pass_rates(report: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        f"{eval_set_id}/{eval_id}": case["pass_rate"]
+        for eval_set_id, entry in report["evalsets"].items()
+        for eval_id, case in entry["cases"].items()
+    }
+
+
+def run_benchmark(cases: int, runs: int, levels: List[int], latency_ms: float) -> None:
+    print(
+        f"=== Multi-run evaluation: {cases} cases x {runs} runs, "
+        f"stub latency {latency_ms:.0f}ms ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        evalset = Path(tmp) / "bench.evalset.json"
+        _write_evalset(evalset, cases)
+        record_dir = str(Path(tmp) / "recorded")
+        configurations = [("sequential", 1, None, None)]
+        configurations += [
+            (f"parallel x{level}", level, record_dir if index == 0 else None, None)
+            for index, level in enumerate(levels)
+        ]
+        configurations.append((f"replay x{levels[0]}", levels[0], None, record_dir))
+
+        baseline_s = 0.0
+        expected: Optional[Dict[str, float]] = None
+        for name, concurrency, record, replay in configurations:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                report = pool.submit(
+                    _run_configuration, str(evalset), runs, concurrency, latency_ms, record, replay
+                ).result()
+            pass_rates = _pass_rates(report)
+            if expected is None:
+                expected = pass_rates
+            elif pass_rates != expected:
+                raise SystemExit(f"{name}: pass rates differ from the sequential run")
+            seconds = report["seconds"]
+            baseline_s = baseline_s or seconds
+            print(
+                f"{name + ':':<16} {seconds:6.2f}s "
+                f"({report['case_runs'] / max(seconds, 1e-9):,.1f} case runs/s) "
+                f"x{baseline_s / max(seconds, 1e-9):.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", default="4,16")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    run_benchmark(args.cases, args.runs, levels, args.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
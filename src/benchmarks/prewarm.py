@@ -0,0 +1,151 @@
+"""
+First-turn latency after a start, with and without prewarming.
+
+Each configuration starts a fresh process, imports the App and serves a
+burst of synthetic learners from `load_simulator` arriving together, on the
+offline stub with model tiering on (two distinct models) and a simulated
+connection setup cost per model (`TUTOR_STUB_CONNECT_MS`: client creation
+plus TCP/TLS handshakes):
+
+  - cold:            traffic is accepted right after the App is built
+  - prewarm:         agent tree, tool declarations, summarizer and the ADK
+                     run path are warmed first (a throwaway turn answered
+                     without model calls)
+  - prewarm + ping:  as above, plus one no-op request per distinct model so
+                     its connection pool is open
+
+For each we report the time to ready (import, prewarm), latency of the
+burst's first turns, of the first lesson turns (agents not used before) and
+of later turns once everything is warm.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.prewarm
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.prewarm --connect-ms 300 --learners 8
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from google.genai import types as genai_types
+
+
+def _run_configuration(
+    mode: str, learners: int, lessons: int, latency_ms: float, connect_ms: float, seed: int
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    os.environ.update(
+        TUTOR_STUB_CONNECT_MS=str(connect_ms),
+        GEMINI_MODEL_TIERING="true",
+        GEMINI_MODEL_NAME="gemini-2.5-flash",
+        GEMINI_FAST_MODEL_NAME="gemini-2.5-flash-lite",
+        TUTOR_PREWARM="false" if mode == "cold" else "true",
+        TUTOR_PREWARM_PING="true" if mode == "prewarm + ping" else "false",
+    )
+    started = time.perf_counter()
+    from src.app_factory import app, build_runner
+    from src.benchmarks.load_simulator import (
+        LearnerBehavior,
+        install_scripted_tutor,
+        make_learners,
+    )
+    from src.core.prewarm import prepare
+
+    imported_s = time.perf_counter() - started
+    install_scripted_tutor(latency_ms)
+
+    async def drive() -> Dict[str, Any]:
+        runner = build_runner(app)
+        start = time.perf_counter()
+        health = await prepare(app, runner)
+        prewarm_s = time.perf_counter() - start
+
+        # Turn index -> latencies across the burst.
+        by_turn: Dict[int, List[float]] = {}
+
+        async def play(learner) -> None:
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=learner.user_id
+            )
+            for index, text in enumerate(learner.turns()):
+                start = time.perf_counter()
+                async for _ in runner.run_async(
+                    user_id=learner.user_id,
+                    session_id=session.id,
+                    new_message=genai_types.Content(
+                        role="user", parts=[genai_types.Part(text=text)]
+                    ),
+                ):
+                    pass
+                by_turn.setdefault(index, []).append(time.perf_counter() - start)
+
+        burst = make_learners(learners, lessons, LearnerBehavior(), seed)
+        await asyncio.gather(*(play(learner) for learner in burst))
+        return {"prewarm_s": prewarm_s, "health": health, "by_turn": by_turn}
+
+    result = asyncio.run(drive())
+    result["import_s"] = imported_s
+    return result
+
+
+def run_benchmark(
+    learners: int, lessons: int, latency_ms: float, connect_ms: float, seed: int
+) -> None:
+    print(
+        f"=== First-turn latency after start: burst of {learners} learners, "
+        f"stub latency {latency_ms:.0f}ms, connection setup {connect_ms:.0f}ms ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    for mode in ("cold", "prewarm", "prewarm + ping"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration, mode, learners, lessons, latency_ms, connect_ms, seed
+            ).result()
+        by_turn = result["by_turn"]
+        first, lesson = by_turn[0], by_turn[1]
+        later = [
+            latency for index, latencies in by_turn.items() if index >= 3 for latency in latencies
+        ]
+        print(f"--- {mode} ---")
+        print(
+            f"ready after: import={result['import_s'] * 1000:,.0f}ms "
+            f"prewarm={result['prewarm_s'] * 1000:,.0f}ms {result['health']['prewarm_ms']} "
+            f"models={len(result['health']['models'])}"
+        )
+        print(
+            f"    first turn: mean={statistics.mean(first) * 1000:6.1f}ms "
+            f"max={max(first) * 1000:6.1f}ms   "
+            f"first lesson: mean={statistics.mean(lesson) * 1000:6.1f}ms "
+            f"max={max(lesson) * 1000:6.1f}ms   "
+            f"later turns: mean={statistics.mean(later) * 1000:6.1f}ms"
+        )
+        if result["health"]["errors"]:
+            print(f"    errors: {result['health']['errors']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--learners", type=int, default=4)
+    parser.add_argument("--lessons", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--connect-ms", type=float, default=150.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.learners, args.lessons, args.latency_ms, args.connect_ms, args.seed)
+
+
+if __name__ == "__main__":
+    main()
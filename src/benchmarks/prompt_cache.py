@@ -0,0 +1,211 @@
+"""
+Billed prompt tokens and time to first response with static prefix caching.
+
+Drives the full App with the synthetic learners from `load_simulator` against
+the stub model, whose latency grows with the uncached prompt size, and
+compares per agent:
+
+  - full prompt:   instruction + tool declarations re-sent on every call
+  - prefix cache:  the prefix is registered once as (simulated) cached content
+  - gemini floor:  the same, with Gemini's minimum cacheable size enforced
+
+Learners arrive in two waves separated by an idle gap longer than the cache
+TTL, so prefixes are refreshed while in use, expire while idle and are
+registered again. Each configuration runs in a fresh process.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.prompt_cache
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.prompt_cache \\
+        --learners 16 --prefill-ms-per-1k 60 --ttl-s 5
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from google.genai import types as genai_types
+from google.adk.runners import InMemoryRunner
+
+from src.benchmarks.load_simulator import (
+    LearnerBehavior,
+    ScriptedTutor,
+    SyntheticLearner,
+    _stub_models,
+    make_learners,
+)
+from src.core.model_tiers import CACHED_INPUT_PRICE_RATIO
+from src.core.prompt_cache import min_cache_tokens
+from src.core.stub_llm import set_default_responder
+
+
+async def _play(runner: InMemoryRunner, learner: SyntheticLearner) -> None:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=learner.user_id
+    )
+    for text in learner.turns():
+        async for _ in runner.run_async(
+            user_id=learner.user_id,
+            session_id=session.id,
+            new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+        ):
+            pass
+
+
+def _run_configuration(
+    cache_min_tokens: Optional[int],
+    learners: int,
+    lessons: int,
+    latency_ms: float,
+    prefill_ms_per_1k: float,
+    ttl_s: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Runs in a fresh process. `cache_min_tokens` is None for no prefix cache,
+    -1 for the model's own minimum, or an explicit minimum.
+    """
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.core import llm
+    from src.core.prompt_cache import PrefixCache
+
+    if cache_min_tokens is not None:
+        llm.prefix_cache = PrefixCache(
+            llm.stub_cached_contents,
+            ttl_s=ttl_s,
+            min_tokens=None if cache_min_tokens < 0 else cache_min_tokens,
+        )
+    from src.app_factory import build_app
+
+    app = build_app()
+    set_default_responder(ScriptedTutor())
+    for model in _stub_models(app):
+        model.latency_s = latency_ms / 1000.0
+        model.prefill_s_per_1k_tokens = prefill_ms_per_1k / 1000.0
+
+    async def drive() -> float:
+        runner = InMemoryRunner(app=app)
+        population = make_learners(learners, lessons, LearnerBehavior(), seed)
+        half = len(population) // 2
+        start = time.perf_counter()
+        await asyncio.gather(*(_play(runner, learner) for learner in population[:half]))
+        # Idle long enough for every cached prefix to expire.
+        await asyncio.sleep(ttl_s + 0.5)
+        await asyncio.gather(*(_play(runner, learner) for learner in population[half:]))
+        return time.perf_counter() - start - ttl_s - 0.5
+
+    llm.model_usage.reset()
+    elapsed = asyncio.run(drive())
+    cache = llm.prefix_cache
+    return {
+        "elapsed_s": elapsed,
+        "usage": llm.model_usage.metrics(),
+        "cache": cache.metrics() if cache is not None else {},
+    }
+
+
+def _billed_prompt_tokens(entry: Dict[str, float]) -> float:
+    cached = entry["cached_tokens"]
+    return entry["prompt_tokens"] - cached + cached * CACHED_INPUT_PRICE_RATIO
+
+
+def _report(name: str, result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    usage = result["usage"]
+    entries = [entry for models in usage.values() for entry in models.values()]
+    billed = sum(_billed_prompt_tokens(entry) for entry in entries)
+    cost = sum(entry["cost_usd"] for entry in entries)
+    print(f"--- {name} ---")
+    print(
+        f"model_calls={sum(entry['calls'] for entry in entries)} "
+        f"billed_prompt_tokens={billed:,.0f} cost=${cost:.5f} busy_time={result['elapsed_s']:.2f}s"
+    )
+    if result["cache"]:
+        print(f"prefix_cache={result['cache']}")
+
+    base_usage = baseline["usage"] if baseline else {}
+    for agent_name, models in usage.items():
+        for model, entry in models.items():
+            base = base_usage.get(agent_name, {}).get(model)
+            delta = ""
+            if base:
+                delta = (
+                    f" billed={_billed_prompt_tokens(entry) / _billed_prompt_tokens(base):5.0%}"
+                    f" ttft={entry['ttft_mean_ms'] / base['ttft_mean_ms']:5.0%} of full"
+                )
+            print(
+                f"    {agent_name:<26} calls={entry['calls']:<5} "
+                f"prompt={entry['prompt_tokens']:<8} cached={entry['cached_tokens']:<8} "
+                f"billed={_billed_prompt_tokens(entry):<10,.0f} "
+                f"ttft={entry['ttft_mean_ms']:6.1f}ms{delta}"
+            )
+
+
+def run_benchmark(
+    learners: int,
+    lessons: int,
+    latency_ms: float,
+    prefill_ms_per_1k: float,
+    ttl_s: float,
+    seed: int,
+) -> None:
+    from src.config import config
+
+    floor = min_cache_tokens(config.model_name)
+    print(
+        f"=== Prompt prefix cache: {learners} learners x {lessons} lessons in 2 waves, "
+        f"stub latency {latency_ms:.0f}ms + {prefill_ms_per_1k:.0f}ms per 1k uncached "
+        f"prompt tokens, TTL {ttl_s:g}s, {config.model_name} minimum cache size {floor} ==="
+    )
+    configurations = [
+        ("full prompt", None),
+        ("prefix cache", 0),
+        (f"prefix cache, {config.model_name} minimum ({floor} tokens)", -1),
+    ]
+    spawn = multiprocessing.get_context("spawn")
+    baseline = None
+    for name, cache_min_tokens in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration,
+                cache_min_tokens,
+                learners,
+                lessons,
+                latency_ms,
+                prefill_ms_per_1k,
+                ttl_s,
+                seed,
+            ).result()
+        _report(name, result, baseline)
+        baseline = baseline or result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--learners", type=int, default=8)
+    parser.add_argument("--lessons", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=40.0)
+    parser.add_argument("--ttl-s", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(
+        args.learners,
+        args.lessons,
+        args.latency_ms,
+        args.prefill_ms_per_1k,
+        args.ttl_s,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
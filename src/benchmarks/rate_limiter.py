@@ -0,0 +1,131 @@
+"""
+Benchmark for the shared model rate limiter under simulated quota.
+
+Many concurrent sessions call the offline stub model, whose backend enforces a
+requests/min quota and answers 429 once it is exhausted. We compare:
+  - blind per-request retry with exponential backoff (what HttpRetryOptions does)
+  - the shared RateLimiter with priority classes
+
+    uv run python -m src.benchmarks.rate_limiter
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+
+from src.core.llm import RateLimitedLlm
+from src.core.rate_limiter import Priority, RateLimiter
+from src.core.stub_llm import SimulatedQuota, StubLlm
+
+
+_MIX = [Priority.INTERACTIVE] * 6 + [Priority.SEARCH] * 3 + [Priority.BACKGROUND]
+
+
+async def _call_with_retry(model: BaseLlm, attempts: int = 5) -> int:
+    """Mimic HttpRetryOptions(exp_base=2, initial_delay) scaled down 10x."""
+    delay = 0.1
+    request = LlmRequest(
+        contents=[genai_types.Content(role="user", parts=[genai_types.Part(text="hi")])]
+    )
+    for attempt in range(attempts):
+        try:
+            async for _ in model.generate_content_async(request):
+                pass
+            return attempt
+        except genai_errors.ClientError as exc:
+            if exc.code != 429 or attempt == attempts - 1:
+                raise
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay *= 2
+    return attempts
+
+
+async def _run_scenario(
+    limiter: Optional[RateLimiter],
+    quota_rpm: int,
+    sessions: int,
+    calls_per_session: int,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    quota = SimulatedQuota(requests_per_minute=quota_rpm, burst=quota_rpm / 60.0)
+    backend = StubLlm(model="gemini-stub", latency_s=0.02, quota=quota)
+
+    models: Dict[Priority, BaseLlm] = {}
+    for priority in Priority:
+        models[priority] = (
+            RateLimitedLlm(model=backend.model, inner=backend, priority=priority, limiter=limiter)
+            if limiter is not None
+            else backend
+        )
+
+    latencies: Dict[Priority, List[float]] = {p: [] for p in Priority}
+    failures = 0
+
+    async def session() -> None:
+        nonlocal failures
+        for _ in range(calls_per_session):
+            priority = rng.choice(_MIX)
+            start = time.perf_counter()
+            try:
+                await _call_with_retry(models[priority])
+                latencies[priority].append(time.perf_counter() - start)
+            except genai_errors.ClientError:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    title = "shared rate limiter" if limiter is not None else "blind retry only"
+    completed = sum(len(v) for v in latencies.values())
+    print(f"--- {title} ---")
+    print(
+        f"completed={completed} failed={failures} 429s={quota.rejected} "
+        f"elapsed={elapsed:.2f}s throughput={completed / elapsed:.1f} req/s"
+    )
+    for priority, values in latencies.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        print(
+            f"  {priority.name.lower():<12} n={len(values):<5} "
+            f"mean={statistics.mean(values):.3f}s p95={p95:.3f}s"
+        )
+    if limiter is not None:
+        for name, stats in limiter.metrics().items():
+            print(f"  metrics[{name}] = {stats}")
+    print()
+
+
+async def run_benchmark(quota_rpm: int, sessions: int, calls: int) -> None:
+    print("=== Rate limiter benchmark (offline stub, simulated quota) ===")
+    print(f"quota={quota_rpm} rpm sessions={sessions} calls/session={calls}\n")
+    await _run_scenario(None, quota_rpm, sessions, calls, seed=1)
+    limiter = RateLimiter(requests_per_minute=quota_rpm * 0.95)
+    await _run_scenario(limiter, quota_rpm, sessions, calls, seed=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quota-rpm", type=int, default=1200)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.quota_rpm, args.sessions, args.calls))
+
+
+if __name__ == "__main__":
+    main()
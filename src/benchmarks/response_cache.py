@@ -0,0 +1,123 @@
+"""
+Benchmark for the explanation/search response cache with single-flight.
+
+Learners arrive in concurrent waves and ask for topics drawn from a Zipf
+distribution (a few popular concepts, a long tail). Each miss costs one call
+to the offline stub model. We compare no caching against ResponseCache +
+SingleFlight, keyed the same way the explanation callbacks key requests.
+
+    uv run python -m src.benchmarks.response_cache
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+
+from src.core.response_cache import ResponseCache, SingleFlight
+from src.core.stub_llm import StubLlm
+from src.core.topic_index import canonical_topic_form, topic_from_request
+
+
+_TOPICS = [f"topic {i}" for i in range(200)]
+_PHRASINGS = ["Explain {} simply", "Teach me {}", "What is {}?", "explain {} to me"]
+_LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def _request_mix(count: int, skew: float, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** skew for rank in range(len(_TOPICS))]
+    topics = rng.choices(_TOPICS, weights=weights, k=count)
+    return [
+        (rng.choice(_PHRASINGS).format(topic), rng.choice(_LEVELS)) for topic in topics
+    ]
+
+
+async def _run(
+    requests: List[Tuple[str, str]],
+    wave_size: int,
+    cache: Optional[ResponseCache],
+    flights: Optional[SingleFlight],
+) -> None:
+    model = StubLlm(model="gemini-stub", latency_s=0.25)
+    latencies: List[float] = []
+
+    async def explain(message: str, level: str) -> str:
+        request = LlmRequest(
+            contents=[
+                genai_types.Content(role="user", parts=[genai_types.Part(text=message)])
+            ]
+        )
+        text = ""
+        async for response in model.generate_content_async(request):
+            text = response.content.parts[0].text
+        return text
+
+    async def handle(message: str, level: str) -> None:
+        start = time.perf_counter()
+        topic = topic_from_request(message)
+        if cache is None or topic is None:
+            await explain(message, level)
+        else:
+            key = f"{canonical_topic_form(topic)}|{level}"
+            if cache.get(key) is None:
+
+                async def _miss() -> str:
+                    text = await explain(message, level)
+                    cache.put(key, text)
+                    return text
+
+                await flights.do(key, _miss)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(requests), wave_size):
+        wave = requests[i : i + wave_size]
+        await asyncio.gather(*(handle(message, level) for message, level in wave))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    title = "cache + single-flight" if cache is not None else "no cache"
+    print(f"--- {title} ---")
+    print(
+        f"requests={len(requests)} model_calls={model.call_count} "
+        f"elapsed={elapsed:.2f}s mean={statistics.mean(latencies) * 1000:.1f}ms "
+        f"p95={ordered[int(0.95 * (len(ordered) - 1))] * 1000:.1f}ms"
+    )
+    if cache is not None:
+        print(f"  cache={cache.metrics()} shared_in_flight={flights.shared}")
+    print()
+
+
+async def run_benchmark(count: int, wave_size: int, skew: float) -> None:
+    requests = _request_mix(count, skew, seed=3)
+    print("=== Response cache benchmark (offline stub, Zipf request mix) ===")
+    print(f"requests={count} wave={wave_size} zipf_s={skew}\n")
+    await _run(requests, wave_size, cache=None, flights=None)
+    await _run(
+        requests,
+        wave_size,
+        cache=ResponseCache(name="bench", max_entries=256, ttl_s=3600),
+        flights=SingleFlight(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--wave", type=int, default=50)
+    parser.add_argument("--skew", type=float, default=1.1)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.requests, args.wave, args.skew))
+
+
+if __name__ == "__main__":
+    main()
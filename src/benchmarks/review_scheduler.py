@@ -0,0 +1,168 @@
+"""
+Review scheduler throughput with millions of scheduled (learner, topic) items.
+
+Fills `ReviewIndex` with `--users` x `--topics` items whose due times are
+spread over the next 30 days, then reports:
+
+  - schedule:     items/sec to load every learner's schedule into the index
+  - rebuild:      replacing the index with every stored schedule, as a
+                  server does at startup
+  - reschedule:   latency of moving one item (a recorded exercise result)
+  - next due:     latency of the soonest item across all learners
+  - due now:      bulk "who has what due" at several points in time, against
+                  a scan of every topic of every learner (the on-the-fly
+                  alternative); both must return the same items. Each query
+                  pops only the entries that fell due since the previous one
+                  (O(log n) each, with a cache miss per heap level) and
+                  re-reads those already popped, so the index wins while a
+                  small share falls due between queries; a scan wins when a
+                  large share of all items falls due at once. `again` repeats
+                  the query (nothing left to pop)
+  - due now, top: the `--top` most overdue items only
+  - per learner:  record + next-due latency on one learner's schedule and
+                  its state round trip
+
+    uv run python -m src.benchmarks.review_scheduler
+    uv run python -m src.benchmarks.review_scheduler --users 200000 --topics 20
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from src.core.review_scheduler import DAY_S, ReviewIndex, ReviewItem, ReviewSchedule
+
+
+def _scan(due_times: Dict[Tuple[str, str], float], now: float) -> Dict[str, List[str]]:
+    due = sorted(
+        (when, user_id, topic) for (user_id, topic), when in due_times.items() if when <= now
+    )
+    found: Dict[str, List[str]] = {}
+    for _, user_id, topic in due:
+        found.setdefault(user_id, []).append(topic)
+    return found
+
+
+def _per_learner(topics: List[str], rng: random.Random) -> None:
+    schedule = ReviewSchedule()
+    now = 0.0
+    records = 5000
+    start = time.perf_counter()
+    for _ in range(records):
+        now += rng.uniform(60, 3600)
+        schedule.record(
+            rng.choice(topics), rng.choice(("easy", "medium", "hard")), rng.random() < 0.7, now
+        )
+        schedule.next_due()
+    record_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(1000):
+        ReviewSchedule.from_state(json.loads(json.dumps(schedule.to_state())))
+    round_trip_s = (time.perf_counter() - start) / 1000
+    print(
+        f"per learner ({len(topics)} topics): record + next due "
+        f"{record_s / records * 1e6:.1f}us, state round trip {round_trip_s * 1e6:.0f}us "
+        f"({len(json.dumps(schedule.to_state())):,} bytes)"
+    )
+
+
+def run_benchmark(users: int, topics: int, reschedules: int, top: int, seed: int) -> None:
+    print(f"=== Review scheduler: {users:,} learners x {topics} topics ===")
+    rng = random.Random(seed)
+    topic_names = [f"topic {index}" for index in range(topics)]
+    user_ids = [f"user_{index}" for index in range(users)]
+
+    index = ReviewIndex()
+    due_times: Dict[Tuple[str, str], float] = {}
+    start = time.perf_counter()
+    for user_id in user_ids:
+        for topic in topic_names:
+            due = rng.uniform(0, 30 * DAY_S)
+            index.update(user_id, topic, due)
+            due_times[(user_id, topic)] = due
+    schedule_s = time.perf_counter() - start
+    print(
+        f"schedule:   {len(index):,} items in {schedule_s:.1f}s "
+        f"({len(index) / schedule_s:,.0f}/s)"
+    )
+    schedules: Dict[str, ReviewSchedule] = {}
+    for (user_id, topic), due in due_times.items():
+        schedules.setdefault(user_id, ReviewSchedule()).items[topic] = ReviewItem(due=due)
+    start = time.perf_counter()
+    index.rebuild(schedules.items())
+    rebuild_s = time.perf_counter() - start
+    assert len(index) == len(due_times)
+    del schedules
+    print(f"rebuild:    {len(index):,} items in {rebuild_s:.1f}s")
+    # Keep collections of the millions of long-lived entries out of the timings.
+    gc.freeze()
+
+    moves = [
+        (rng.choice(user_ids), rng.choice(topic_names), rng.uniform(0, 30 * DAY_S))
+        for _ in range(reschedules)
+    ]
+    start = time.perf_counter()
+    for user_id, topic, due in moves:
+        index.update(user_id, topic, due)
+    reschedule_s = time.perf_counter() - start
+    for user_id, topic, due in moves:
+        due_times[(user_id, topic)] = due
+    print(f"reschedule: {reschedule_s / reschedules * 1e6:.2f}us per item ({reschedules:,} items)")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        soonest = index.next_due()
+    next_s = (time.perf_counter() - start) / 1000
+    assert soonest is not None and soonest[0] == min(due_times.values())
+    print(f"next due:   {next_s * 1e6:.2f}us")
+
+    for hours in (1, 24, 7 * 24):
+        now = hours * 3600.0
+        start = time.perf_counter()
+        bulk = index.due_now(now)
+        bulk_s = time.perf_counter() - start
+        start = time.perf_counter()
+        scanned = _scan(due_times, now)
+        scan_s = time.perf_counter() - start
+        if bulk != scanned:
+            raise SystemExit(f"due now after {hours}h: index and scan disagree")
+        start = time.perf_counter()
+        again = index.due_now(now)
+        again_s = time.perf_counter() - start
+        assert again == bulk
+        items = sum(len(found) for found in bulk.values())
+        print(
+            f"due now +{hours}h: {items:,} items for {len(bulk):,} learners: "
+            f"index {bulk_s * 1000:.1f}ms (again {again_s * 1000:.1f}ms), "
+            f"full scan {scan_s * 1000:.1f}ms x{scan_s / max(bulk_s, 1e-9):.1f}"
+        )
+        start = time.perf_counter()
+        top_items = index.due_now(now, limit=top)
+        top_s = time.perf_counter() - start
+        assert sum(len(found) for found in top_items.values()) == min(top, items)
+        print(f"    top {top:,}: index {top_s * 1000:.1f}ms")
+
+    _per_learner(topic_names, rng)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--reschedules", type=int, default=200000)
+    parser.add_argument("--top", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.users, args.topics, args.reschedules, args.top, args.seed)
+
+
+if __name__ == "__main__":
+    main()
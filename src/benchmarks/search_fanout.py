@@ -0,0 +1,264 @@
+"""
+Latency of multi-query search fan-out against sequential searches.
+
+Two parts, both offline:
+
+  - backend:  questions split into K sub-queries against a local corpus
+              backend with simulated search latency. Sequential runs the
+              sub-queries one after the other and concatenates the results;
+              fan-out runs them concurrently at several caps and merges them
+              into one digest. The corpus has mirrored pages (www./tracking
+              URLs, reworded whitespace) so de-duplication has work to do.
+  - agent:    a calling agent on the stub model that needs K facets searched,
+              either with K google_search_agent calls in a row (each a nested
+              conversation plus a round trip of the caller) or with one call
+              passing all K as `queries`.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.search_fanout
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.search_fanout \\
+        --facets 6 --search-latency-ms 400 --levels 1,2,4,8
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+import warnings
+from typing import Dict, List
+
+from google.genai import types as genai_types
+from google.adk.agents import LlmAgent
+from google.adk.apps.app import App
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+
+from src.benchmarks.load_simulator import _function_call, _learner_message, _stub_models
+from src.core.search_fanout import LocalCorpusBackend, SearchFanOut
+from src.core.stub_llm import StubLlm, set_default_responder, text_response
+
+
+_SUBJECTS = ["q-learning", "gradients", "bayes rule", "transformers", "entropy", "markov chains"]
+_FACETS = ["definition", "intuition", "worked example", "common mistakes", "history", "applications"]
+
+
+def _corpus(docs_per_pair: int, mirrors: int, seed: int) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    documents: List[Dict[str, str]] = []
+    for subject in _SUBJECTS:
+        for facet in _FACETS:
+            for n in range(docs_per_pair):
+                slug = f"{subject}-{facet}-{n}".replace(" ", "-")
+                text = f"{subject} {facet}: " + " ".join(
+                    rng.choice(["state", "value", "update", "step", "model", "signal"])
+                    for _ in range(60)
+                )
+                documents.append(
+                    {"url": f"https://example.org/{slug}", "title": f"{subject} {facet}", "text": text}
+                )
+                for m in range(mirrors):
+                    # Same page behind another URL form, or copied with different spacing.
+                    url = (
+                        f"https://www.example.org/{slug}/?utm_source=feed{m}"
+                        if m % 2 == 0
+                        else f"https://mirror{m}.example.net/{slug}"
+                    )
+                    documents.append(
+                        {"url": url, "title": f"{subject} {facet}", "text": text.replace(" ", "  ")}
+                    )
+    rng.shuffle(documents)
+    return documents
+
+
+def _questions(count: int, facets: int) -> List[List[str]]:
+    return [
+        [f"{_SUBJECTS[i % len(_SUBJECTS)]} {facet}" for facet in _FACETS[:facets]]
+        for i in range(count)
+    ]
+
+
+async def _sequential(backend: LocalCorpusBackend, queries: List[str], per_query: int) -> int:
+    chunks = []
+    for query in queries:
+        hits = await backend.search(query)
+        chunks.extend(f"{hit.title}: {hit.snippet} ({hit.url})" for hit in hits[:per_query])
+    return len("\n".join(chunks))
+
+
+async def _backend_part(
+    questions: List[List[str]], levels: List[int], latency_s: float, digest_chars: int
+) -> None:
+    backend = LocalCorpusBackend(_corpus(2, 2, seed=5), latency_s=latency_s)
+    per_query = 4
+    print(
+        f"--- backend: {len(questions)} questions x {len(questions[0])} sub-queries, "
+        f"{len(backend.documents)} docs, {latency_s * 1000:.0f}ms per search ---"
+    )
+
+    latencies: List[float] = []
+    sizes: List[int] = []
+    for queries in questions:
+        start = time.perf_counter()
+        sizes.append(await _sequential(backend, queries, per_query))
+        latencies.append(time.perf_counter() - start)
+    baseline = statistics.mean(latencies)
+    print(
+        f"{'sequential':>14}: mean={baseline * 1000:7.1f}ms "
+        f"output={statistics.mean(sizes):7.0f} chars (concatenated, {per_query} per query)"
+    )
+
+    for level in levels:
+        fanout = SearchFanOut(
+            concurrency=level, results_per_query=per_query, digest_chars=digest_chars
+        )
+        latencies = []
+        sizes = []
+        for queries in questions:
+            start = time.perf_counter()
+            digest = await fanout.search(queries, backend)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(digest))
+        mean = statistics.mean(latencies)
+        metrics = fanout.metrics()
+        print(
+            f"{f'fan-out x{level}':>14}: mean={mean * 1000:7.1f}ms x{baseline / mean:4.1f} "
+            f"digest={statistics.mean(sizes):5.0f} chars (max {max(sizes)}) "
+            f"hits={metrics['hits']} duplicates merged={metrics['duplicates_merged']}"
+        )
+    print()
+
+
+class _Caller:
+    """Plays the calling agent and the search agent on the stub model."""
+
+    def __init__(self, fan_out: bool) -> None:
+        self.fan_out = fan_out
+
+    def __call__(self, llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+        if agent_name == "google_search_agent":
+            query = _learner_message(llm_request)
+            subject = query.split(" ")[0]
+            # Every facet's summary cites the subject's overview page as well.
+            return text_response(
+                f"- {query} summarized in a few sentences. (https://example.org/{subject}/"
+                f"{query.replace(' ', '-')})\n"
+                f"- Overview of {subject}. (https://www.example.org/{subject}/overview/)",
+                llm_request,
+            )
+
+        facets = _learner_message(llm_request).split(" | ")
+        done = sum(
+            1
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.function_response
+        )
+        if self.fan_out and done == 0:
+            return _function_call("google_search_agent", {"queries": facets})
+        if not self.fan_out and done < len(facets):
+            return _function_call("google_search_agent", {"request": facets[done]})
+        return text_response("Here is what I found.", llm_request)
+
+
+async def _agent_part(
+    questions: List[List[str]], caller_latency_s: float, search_latency_s: float
+) -> None:
+    from src.agents.search_agent import google_search_tool
+
+    print(
+        f"--- agent: {len(questions)} questions x {len(questions[0])} facets, "
+        f"caller {caller_latency_s * 1000:.0f}ms / search agent "
+        f"{search_latency_s * 1000:.0f}ms per model call ---"
+    )
+    baseline = None
+    for fan_out in (False, True):
+        caller = _Caller(fan_out)
+        set_default_responder(caller)
+        agent = LlmAgent(
+            name="asker",
+            model=StubLlm(model="gemini-stub", latency_s=caller_latency_s),
+            instruction="Answer using google_search_agent.",
+            tools=[google_search_tool],
+        )
+        app = App(name="search_fanout_bench", root_agent=agent)
+        for model in _stub_models(app):
+            model.latency_s = (
+                caller_latency_s if model.model == "gemini-stub" else search_latency_s
+            )
+        runner = InMemoryRunner(app=app)
+        calls_before = sum(model.call_count for model in _stub_models(app))
+        latencies: List[float] = []
+        for index, facets in enumerate(questions):
+            # A different learner wording per run, so the search cache stays cold.
+            facets = [f"{facet} {'fanout' if fan_out else 'sequential'}-{index}" for facet in facets]
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=f"learner-{index}"
+            )
+            start = time.perf_counter()
+            async for _ in runner.run_async(
+                user_id=session.user_id,
+                session_id=session.id,
+                new_message=genai_types.Content(
+                    role="user", parts=[genai_types.Part(text=" | ".join(facets))]
+                ),
+            ):
+                pass
+            latencies.append(time.perf_counter() - start)
+        calls = sum(model.call_count for model in _stub_models(app)) - calls_before
+        mean = statistics.mean(latencies)
+        baseline = baseline or mean
+        name = "one call, fan-out" if fan_out else "calls in a row"
+        print(
+            f"{name:>18}: turn mean={mean * 1000:7.1f}ms x{baseline / mean:4.1f} "
+            f"model calls/turn={calls / len(questions):.1f}"
+        )
+    set_default_responder(None)
+    print()
+
+
+async def run_benchmark(
+    questions: int,
+    facets: int,
+    levels: List[int],
+    search_latency_ms: float,
+    caller_latency_ms: float,
+    digest_chars: int,
+) -> None:
+    print(f"=== Search fan-out vs sequential searches ({facets} facets per question) ===\n")
+    asked = _questions(questions, facets)
+    await _backend_part(asked, levels, search_latency_ms / 1000.0, digest_chars)
+    await _agent_part(asked, caller_latency_ms / 1000.0, search_latency_ms / 1000.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--facets", type=int, default=4)
+    parser.add_argument("--levels", default="1,2,4")
+    parser.add_argument("--search-latency-ms", type=float, default=300.0)
+    parser.add_argument("--caller-latency-ms", type=float, default=200.0)
+    parser.add_argument("--digest-chars", type=int, default=3000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    asyncio.run(
+        run_benchmark(
+            args.questions,
+            min(args.facets, len(_FACETS)),
+            [int(level) for level in args.levels.split(",") if level.strip()],
+            args.search_latency_ms,
+            args.caller_latency_ms,
+            args.digest_chars,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Resident memory of many mostly idle sessions, unbounded vs bounded.
+
+Creates N sessions with a few events each (a short first conversation),
+then replays a skewed stream of turns: most go to a small hot set, the rest
+wake up random idle sessions. Compared:
+
+  - in-memory:        InMemorySessionService, what InMemoryRunner uses;
+                      every session stays in RAM
+  - bounded (count):  PersistentSessionService keeping the hot N sessions
+  - bounded (bytes):  PersistentSessionService under a byte budget
+
+For each we report resident memory after creating the sessions and after
+the turns, turn latency, and the residency metrics (hits, reloads,
+evictions, reload latency). Each configuration runs in a fresh process.
+
+    uv run python -m src.benchmarks.session_residency
+    uv run python -m src.benchmarks.session_residency --sessions 20000 --max-resident 500
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+from src.benchmarks.session_store import _event
+from src.core.session_store import PersistentSessionService
+
+
+_APP = "tutor_benchmark"
+
+
+def _rss_kb() -> int:
+    """Current (not peak) resident set size."""
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _disk_bytes(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def _run_configuration(
+    kind: str,
+    sessions: int,
+    events: int,
+    turns: int,
+    hot: int,
+    hot_share: float,
+    max_resident: int,
+    max_resident_bytes: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    root = Path(tempfile.mkdtemp(prefix="tutor-residency-"))
+    if kind == "in-memory":
+        service = InMemorySessionService()
+    else:
+        service = PersistentSessionService(
+            root, max_resident=max_resident, max_resident_bytes=max_resident_bytes
+        )
+
+    async def drive() -> Dict[str, Any]:
+        gc.collect()
+        rss_start = _rss_kb()
+        started = time.perf_counter()
+        ids: List[str] = []
+        clock = 1_700_000_000.0
+        for index in range(sessions):
+            session = await service.create_session(
+                app_name=_APP,
+                user_id=f"learner-{index}",
+                state={"user:student_profile": {"level": "beginner", "goal": f"goal {index}"}},
+            )
+            for n in range(events):
+                clock += 1
+                await service.append_event(session, _event(n, clock))
+            ids.append(session.id)
+        create_s = time.perf_counter() - started
+        gc.collect()
+        rss_created = _rss_kb()
+
+        rng = random.Random(seed)
+        latencies: List[float] = []
+        for _ in range(turns):
+            if rng.random() < hot_share:
+                index = rng.randrange(hot)
+            else:
+                index = rng.randrange(sessions)
+            start = time.perf_counter()
+            session = await service.get_session(
+                app_name=_APP, user_id=f"learner-{index}", session_id=ids[index]
+            )
+            for n in range(2):
+                clock += 1
+                await service.append_event(session, _event(n, clock))
+            latencies.append(time.perf_counter() - start)
+        gc.collect()
+        latencies.sort()
+        result = {
+            "create_s": create_s,
+            "rss_start_kb": rss_start,
+            "rss_created_kb": rss_created,
+            "rss_after_kb": _rss_kb(),
+            "turn_p50_ms": latencies[len(latencies) // 2] * 1000,
+            "turn_p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+            "disk_bytes": _disk_bytes(root),
+        }
+        if isinstance(service, PersistentSessionService):
+            result["metrics"] = service.metrics()
+            service.close()
+        return result
+
+    try:
+        return asyncio.run(drive())
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _report(name: str, result: Dict[str, Any], sessions: int) -> None:
+    held_kb = result["rss_created_kb"] - result["rss_start_kb"]
+    print(f"--- {name} ---")
+    print(
+        f"create {sessions:,} sessions: {result['create_s']:.1f}s  "
+        f"rss +{held_kb / 1024:,.1f}MB ({held_kb * 1024 / sessions:,.0f}B/session)  "
+        f"after turns: +{(result['rss_after_kb'] - result['rss_start_kb']) / 1024:,.1f}MB  "
+        f"on disk: {result['disk_bytes'] / 2**20:,.1f}MB"
+    )
+    print(f"    turn p50={result['turn_p50_ms']:.2f}ms p99={result['turn_p99_ms']:.2f}ms")
+    metrics = result.get("metrics")
+    if metrics:
+        print(
+            f"    resident={metrics['resident']:,} ({metrics['resident_bytes'] / 2**20:.1f}MB est.) "
+            f"hits={metrics['hits']:,} reloads={metrics['reloads']:,} "
+            f"hit_rate={metrics['hit_rate']:.1%} evictions={metrics['evictions']:,}"
+        )
+        print(
+            f"    reload p50={metrics['reload_ms_p50']:.2f}ms p95={metrics['reload_ms_p95']:.2f}ms "
+            f"max={metrics['reload_ms_max']:.2f}ms"
+        )
+
+
+def run_benchmark(
+    sessions: int,
+    events: int,
+    turns: int,
+    hot: int,
+    hot_share: float,
+    max_resident: int,
+    max_resident_bytes: int,
+    seed: int,
+) -> None:
+    print(
+        f"=== Session residency: {sessions:,} sessions x {events} events, {turns:,} turns "
+        f"({hot_share:.0%} to {hot:,} hot sessions) ==="
+    )
+    configurations = [
+        ("in-memory", "in-memory", 0, 0),
+        (f"bounded to {max_resident:,} sessions", "bounded", max_resident, 0),
+        (
+            f"bounded to {max_resident_bytes / 2**20:.0f}MB (serialized)",
+            "bounded",
+            0,
+            max_resident_bytes,
+        ),
+    ]
+    spawn = multiprocessing.get_context("spawn")
+    for name, kind, count_limit, byte_limit in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration,
+                kind,
+                sessions,
+                events,
+                turns,
+                hot,
+                hot_share,
+                count_limit,
+                byte_limit,
+                seed,
+            ).result()
+        _report(name, result, sessions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=6)
+    parser.add_argument("--turns", type=int, default=20_000)
+    parser.add_argument("--hot", type=int, default=1000)
+    parser.add_argument("--hot-share", type=float, default=0.9)
+    parser.add_argument("--max-resident", type=int, default=2000)
+    parser.add_argument("--max-resident-bytes", type=int, default=32 * 2**20)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    run_benchmark(
+        args.sessions,
+        args.events,
+        args.turns,
+        args.hot,
+        args.hot_share,
+        args.max_resident,
+        args.max_resident_bytes,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
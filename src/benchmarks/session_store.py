@@ -0,0 +1,137 @@
+"""
+Benchmark for resuming durable sessions from snapshot + event-log tail.
+
+Writes a long synthetic session (learner turns, agent replies, state updates
+and a context compaction every few hundred events) through
+PersistentSessionService, then compares:
+
+  - resume:      load the latest snapshot, replay only the log tail (mmap)
+  - full replay: re-read the entire event history and fold its state deltas
+
+    uv run python -m src.benchmarks.session_store --events 20000
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from google.genai import types as genai_types
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions, EventCompaction
+
+from src.core.session_store import PersistentSessionService, SessionEventLog
+
+
+_APP = "tutor_benchmark"
+_USER = "learner"
+
+
+def _event(index: int, timestamp: float) -> Event:
+    author = "user" if index % 2 == 0 else "feedback_agent"
+    text = f"turn {index}: " + ("lorem ipsum " * 20)
+    actions = EventActions()
+    if index % 10 == 0:
+        actions.state_delta = {"user:turns": index, "last_topic": f"topic {index % 37}"}
+    return Event(
+        invocation_id=f"inv-{index // 2}",
+        author=author,
+        content=genai_types.Content(
+            role="user" if author == "user" else "model",
+            parts=[genai_types.Part(text=text)],
+        ),
+        actions=actions,
+        timestamp=timestamp,
+    )
+
+
+def _compaction(start: float, end: float, timestamp: float) -> Event:
+    return Event(
+        invocation_id="compaction",
+        author="user",
+        actions=EventActions(
+            compaction=EventCompaction(
+                start_timestamp=start,
+                end_timestamp=end,
+                compacted_content=genai_types.Content(
+                    role="model", parts=[genai_types.Part(text="summary " * 50)]
+                ),
+            )
+        ),
+        timestamp=timestamp,
+    )
+
+
+async def _write_session(root: Path, events: int, compact_every: int, snapshot_every: int) -> str:
+    service = PersistentSessionService(root, snapshot_every=snapshot_every)
+    session = await service.create_session(app_name=_APP, user_id=_USER)
+    clock = 1_000_000.0
+    last_compacted = clock
+    for index in range(events):
+        clock += 1.0
+        await service.append_event(session, _event(index, clock))
+        if compact_every and index and index % compact_every == 0:
+            clock += 0.5
+            await service.append_event(session, _compaction(last_compacted, clock - 3.0, clock))
+            last_compacted = clock - 3.0
+    service.close()
+    return session.id
+
+
+async def run_benchmark(events: int, compact_every: int, snapshot_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        session_id = await _write_session(root, events, compact_every, snapshot_every)
+        log_bytes = sum(path.stat().st_size for path in root.rglob("*.log"))
+        print(
+            f"=== Session resume: {events} events, compaction every {compact_every}, "
+            f"snapshot every {snapshot_every}, log={log_bytes / 1e6:.1f}MB ==="
+        )
+
+        start = time.perf_counter()
+        resumed_service = PersistentSessionService(root, snapshot_every=snapshot_every)
+        resumed = await resumed_service.get_session(
+            app_name=_APP, user_id=_USER, session_id=session_id
+        )
+        resume_s = time.perf_counter() - start
+        replayed = resumed_service._log(_APP, _USER, session_id).events_since_snapshot
+        resumed_service.close()
+
+        # Baseline: decode the whole history and fold every state delta.
+        start = time.perf_counter()
+        log = SessionEventLog(root / _APP / _USER, session_id)
+        history = list(log.read_events())
+        full_state = {}
+        for event in history:
+            full_state.update(event.actions.state_delta)
+        full_s = time.perf_counter() - start
+
+        print(
+            f"resume       {resume_s * 1000:8.1f}ms  replayed_tail={replayed:<6} "
+            f"events_in_memory={len(resumed.events)}"
+        )
+        print(
+            f"full replay  {full_s * 1000:8.1f}ms  replayed={len(history):<6} "
+            f"events_in_memory={len(history)}"
+        )
+        print(
+            f"speedup={full_s / resume_s:.1f}x  "
+            f"state_match={resumed.state.get('user:turns') == full_state.get('user:turns')}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--compact-every", type=int, default=400)
+    parser.add_argument("--snapshot-every", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.events, args.compact_every, args.snapshot_every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Throughput scaling of multi-process serving (ShardedSupervisor).
+
+Runs the synthetic learners from `load_simulator` through 1..N worker
+processes and reports turns/sec per worker count. A second run starts with
+fewer workers, adds one mid-load (rebalancing learners onto it) and checks
+that every learner's recorded progress survived the move.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.sharding --workers 1,2,4
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import List
+
+from src.benchmarks.load_simulator import (
+    LearnerBehavior,
+    SyntheticLearner,
+    install_scripted_tutor,
+    make_learners,
+)
+from src.core.state import STATE_KEY_PROGRESS
+from src.core.workers import ShardedSupervisor
+
+
+async def _drive(
+    supervisor: ShardedSupervisor, learner: SyntheticLearner, session_id: str = ""
+) -> int:
+    """Play one learner's turns; returns how many answers were graded."""
+    session_id = session_id or await supervisor.create_session(learner.user_id)
+    answers = 0
+    for text in learner.turns():
+        result = await supervisor.run_turn(learner.user_id, session_id, text)
+        if result.error:
+            raise RuntimeError(result.error)
+        answers += "record_exercise_result" in result.tool_calls
+    return answers
+
+
+async def _scaling(
+    worker_counts: List[int], learners: List[SyntheticLearner], latency_ms: float
+) -> None:
+    baseline = None
+    for workers in worker_counts:
+        async with ShardedSupervisor(
+            workers=workers, initializer=(install_scripted_tutor, (latency_ms,))
+        ) as supervisor:
+            start = time.perf_counter()
+            await asyncio.gather(*(_drive(supervisor, learner) for learner in learners))
+            elapsed = time.perf_counter() - start
+            turns = {stat["worker"]: stat["turns"] for stat in await supervisor.stats()}
+
+        rate = sum(turns.values()) / elapsed
+        baseline = baseline or rate
+        print(
+            f"workers={workers:<3} turns/s={rate:7.1f} speedup={rate / baseline:4.2f}x "
+            f"turns_per_worker={sorted(turns.values())}"
+        )
+
+
+async def _rebalance(learners: List[SyntheticLearner], latency_ms: float) -> None:
+    async with ShardedSupervisor(
+        workers=2, initializer=(install_scripted_tutor, (latency_ms,))
+    ) as supervisor:
+        sessions = {}
+        for learner in learners:
+            sessions[learner.user_id] = await supervisor.create_session(learner.user_id)
+
+        load = asyncio.gather(
+            *(_drive(supervisor, learner, sessions[learner.user_id]) for learner in learners)
+        )
+        await asyncio.sleep(1.0)
+        new_worker = await supervisor.add_worker()
+        answers = await load
+
+        mismatched = 0
+        for learner, expected in zip(learners, answers):
+            state = await supervisor.get_state(learner.user_id, sessions[learner.user_id])
+            recorded = (state or {}).get(STATE_KEY_PROGRESS, {}).get("total_attempts", 0)
+            mismatched += recorded != expected
+        owners = Counter(supervisor.worker_for(learner.user_id) for learner in learners)
+
+    print(
+        f"added {new_worker} under load: migrated_users={supervisor.migrated_users} "
+        f"learners_per_worker={dict(sorted(owners.items()))} "
+        f"progress_mismatches={mismatched}/{len(learners)}"
+    )
+
+
+async def run_benchmark(
+    worker_counts: List[int], learners: int, lessons: int, latency_ms: float, seed: int
+) -> None:
+    population = make_learners(learners, lessons, LearnerBehavior(), seed)
+    print(
+        f"=== Sharded workers: {learners} learners x {lessons} lessons, "
+        f"{latency_ms:.0f}ms stub latency, {os.cpu_count()} CPUs ==="
+    )
+    await _scaling(worker_counts, population, latency_ms)
+    print()
+    await _rebalance(make_learners(learners, lessons, LearnerBehavior(), seed + 1), latency_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers", type=lambda raw: [int(v) for v in raw.split(",")], default=[1, 2, 4]
+    )
+    parser.add_argument("--learners", type=int, default=32)
+    parser.add_argument("--lessons", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(args.workers, args.learners, args.lessons, args.latency_ms, args.seed)
+    )
+
+
+if __name__ == "__main__":
+    main()
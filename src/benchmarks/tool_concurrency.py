@@ -0,0 +1,247 @@
+"""
+Lost learner-state updates and event-loop stalls under concurrent tool calls.
+
+Each learner runs several sessions at once (tabs, devices), all taking lessons
+and answering questions through the full App on the offline stub, so the
+tools updating `user:student_progress`, `user:review_schedule` and
+`user:student_profile` run concurrently for the same learner. The state
+helpers the tools call are slowed by a blocking sleep (`--store-ms` per load
+or save) to stand in for a state store with blocking I/O. Compared:
+
+  - sync tools:   the plain functions, run on the event loop
+  - async tools:  per-learner serialized updates (versioned, with stale
+                  writes upgraded on append), bodies on a bounded thread pool
+
+For each we report the gradings the tool acknowledged against the attempts
+left in the learner's stored progress (the difference are lost updates),
+turn latency, the simulated store time spent on the event loop's thread and
+how late a 10ms timer fires on the loop (stalls; with many sessions the
+loop is also busy with ADK's own per-turn work). Servers prewarm first, so
+lazy imports are not counted as stalls. Each
+configuration runs in a fresh process.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.tool_concurrency
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.tool_concurrency --sessions 8 --store-ms 20
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from google.genai import types as genai_types
+
+
+_STATE_HELPERS = (
+    "load_profile",
+    "save_profile",
+    "load_progress",
+    "save_progress",
+    "load_review_schedule",
+    "save_review_schedule",
+)
+
+
+# Simulated store time spent on the event loop's thread, in seconds.
+_on_loop_s = [0.0]
+
+
+def _blocking(func: Callable[..., Any], delay_s: float) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def call(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(delay_s)
+        if threading.current_thread() is threading.main_thread():
+            _on_loop_s[0] += delay_s
+        return func(*args, **kwargs)
+
+    return call
+
+
+def _run_configuration(
+    async_tools: bool,
+    users: int,
+    sessions: int,
+    lessons: int,
+    answers: int,
+    store_ms: float,
+    latency_ms: float,
+    workers: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    os.environ.update(
+        TUTOR_ASYNC_TOOLS="true" if async_tools else "false",
+        TUTOR_TOOL_WORKERS=str(workers),
+    )
+    from src.app_factory import app, build_runner
+    from src.benchmarks.load_simulator import (
+        LearnerBehavior,
+        LoopLagMonitor,
+        install_scripted_tutor,
+        make_learners,
+    )
+    from src.core import tools
+    from src.core.prewarm import prepare
+    from src.core.state import load_progress
+    from src.core.user_state import user_state
+
+    install_scripted_tutor(latency_ms)
+    for name in _STATE_HELPERS:
+        setattr(tools, name, _blocking(getattr(tools, name), store_ms / 1000.0))
+
+    async def drive() -> Dict[str, Any]:
+        runner = build_runner(app)
+        await prepare(app, runner)
+        graded: Counter = Counter()
+        latencies: List[float] = []
+
+        async def play(learner) -> None:
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=learner.user_id
+            )
+            for text in learner.turns():
+                start = time.perf_counter()
+                async for event in runner.run_async(
+                    user_id=learner.user_id,
+                    session_id=session.id,
+                    new_message=genai_types.Content(
+                        role="user", parts=[genai_types.Part(text=text)]
+                    ),
+                ):
+                    for response in event.get_function_responses():
+                        if (
+                            response.name == "record_exercise_result"
+                            and (response.response or {}).get("status") == "success"
+                        ):
+                            graded[learner.user_id] += 1
+                latencies.append(time.perf_counter() - start)
+
+        # `sessions` concurrent scripts per learner, all under the learner's id.
+        behavior = LearnerBehavior(answers_per_lesson=answers)
+        scripts = [
+            dataclasses.replace(learner, user_id=f"learner-{seed}-{index // sessions}")
+            for index, learner in enumerate(
+                make_learners(users * sessions, lessons, behavior, seed)
+            )
+        ]
+        monitor = LoopLagMonitor()
+        monitor.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(play(script) for script in scripts))
+        wall_s = time.perf_counter() - start
+        await monitor.stop()
+
+        recorded: Dict[str, int] = {}
+        for user_id in graded:
+            # A new session starts from the learner's stored state.
+            fresh = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=user_id
+            )
+            recorded[user_id] = load_progress(fresh.state).total_attempts
+        return {
+            "graded": dict(graded),
+            "recorded": recorded,
+            "latencies": latencies,
+            "wall_s": wall_s,
+            "store_on_loop_s": _on_loop_s[0],
+            "lag_p50": monitor.percentile(0.5),
+            "lag_p99": monitor.percentile(0.99),
+            "lag_max": max(monitor.samples, default=0.0),
+            "ledger": user_state.metrics(),
+        }
+
+    return asyncio.run(drive())
+
+
+def run_benchmark(
+    users: int,
+    sessions: int,
+    lessons: int,
+    answers: int,
+    store_ms: float,
+    latency_ms: float,
+    workers: int,
+    seed: int,
+) -> None:
+    print(
+        f"=== Concurrent tool calls: {users} learners x {sessions} sessions x {lessons} lessons "
+        f"x {answers} answers, state store {store_ms:.0f}ms/op, stub latency {latency_ms:.0f}ms ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    for name, async_tools in (("sync tools", False), ("async tools", True)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration,
+                async_tools,
+                users,
+                sessions,
+                lessons,
+                answers,
+                store_ms,
+                latency_ms,
+                workers,
+                seed,
+            ).result()
+        graded = sum(result["graded"].values())
+        recorded = sum(result["recorded"].values())
+        lost = graded - recorded
+        latencies = sorted(result["latencies"])
+        print(f"--- {name} ---")
+        print(
+            f"gradings={graded} attempts stored={recorded} "
+            f"lost updates={lost} ({lost / max(graded, 1):.0%})   "
+            f"turns={len(latencies)} wall={result['wall_s']:.1f}s "
+            f"turn_p50={latencies[len(latencies) // 2] * 1000:.0f}ms "
+            f"turn_p99={latencies[int(0.99 * (len(latencies) - 1))] * 1000:.0f}ms"
+        )
+        print(
+            f"    store I/O on the event loop={result['store_on_loop_s']:.2f}s "
+            f"loop_lag_p50={result['lag_p50'] * 1000:.1f}ms "
+            f"loop_lag_p99={result['lag_p99'] * 1000:.1f}ms "
+            f"loop_lag_max={result['lag_max'] * 1000:.1f}ms"
+        )
+        if async_tools:
+            print(f"    ledger: {result['ledger']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=6, help="concurrent sessions per learner")
+    parser.add_argument("--lessons", type=int, default=2)
+    parser.add_argument("--answers", type=int, default=3, help="answers per lesson")
+    parser.add_argument("--store-ms", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(
+        args.users,
+        args.sessions,
+        args.lessons,
+        args.answers,
+        args.store_ms,
+        args.latency_ms,
+        args.workers,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
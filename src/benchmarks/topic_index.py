@@ -0,0 +1,144 @@
+"""
+Benchmark for the topic canonicalization index.
+
+Generates a large synthetic topic vocabulary with the kinds of variants the
+LLM produces ("Q-learning", "q learning", "Q-Learning basics", ...), then
+reports how much the per-learner topic map shrinks and how fast lookups are.
+`canonicalize (tools)` goes through the per-user TopicCanonicalizer the way
+the progress tools call it, syncing with the learner's stored topics on every
+call.
+
+    uv run python -m src.benchmarks.topic_index
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+from src.core.models import StudentProgress
+from src.core.topic_index import TopicCanonicalizer, TopicIndex
+
+
+_WORDS = [
+    "gradient", "policy", "value", "network", "attention", "kernel", "bayesian",
+    "markov", "temporal", "convolution", "embedding", "regression", "boosting",
+    "clustering", "sampling", "entropy", "transformer", "optimizer", "residual",
+    "variational", "contrastive", "q", "actor", "critic", "monte", "carlo",
+    "dropout", "normalization", "tokenizer", "retrieval",
+]
+_SUFFIXES = ["learning", "descent", "iteration", "estimation", "methods", "models"]
+_FILLER = ["basics", "intro to", "fundamentals of", "overview of", "the"]
+
+
+def _base_topics(count: int, rng: random.Random) -> List[str]:
+    topics = set()
+    while len(topics) < count:
+        words = rng.sample(_WORDS, k=rng.choice([1, 2, 2, 3]))
+        topics.add(" ".join(words + [rng.choice(_SUFFIXES)]))
+    return sorted(topics)
+
+
+def _variant(topic: str, rng: random.Random) -> str:
+    choice = rng.randrange(5)
+    if choice == 0:
+        return topic.title()
+    if choice == 1:
+        return topic.replace(" ", "-", 1)
+    if choice == 2:
+        filler = rng.choice(_FILLER)
+        return f"{filler} {topic}" if filler != "basics" else f"{topic} basics"
+    if choice == 3:
+        return topic.upper()
+    return topic
+
+
+def _synthetic_stream(
+    base_count: int, stream_len: int, seed: int
+) -> Tuple[List[str], List[str]]:
+    rng = random.Random(seed)
+    bases = _base_topics(base_count, rng)
+    stream = [_variant(rng.choice(bases), rng) for _ in range(stream_len)]
+    return bases, stream
+
+
+def run_benchmark(base_count: int, stream_len: int, seed: int = 7) -> None:
+    bases, stream = _synthetic_stream(base_count, stream_len, seed)
+
+    raw_progress = StudentProgress()
+    for topic in stream:
+        raw_progress.record_result(topic=topic, difficulty="easy", was_correct=True)
+
+    index = TopicIndex()
+    canonical_progress = StudentProgress()
+    latencies: List[float] = []
+    for topic in stream:
+        start = time.perf_counter()
+        key = index.canonicalize(topic)
+        latencies.append(time.perf_counter() - start)
+        canonical_progress.record_result(topic=key, difficulty="easy", was_correct=True)
+
+    # As the tools call it: the learner's stored topics are passed every time.
+    canonicalizer = TopicCanonicalizer()
+    stored_progress = StudentProgress()
+    tool_latencies: List[float] = []
+    for topic in stream:
+        start = time.perf_counter()
+        key = canonicalizer.canonicalize("learner", topic, stored_progress.topics.keys())
+        tool_latencies.append(time.perf_counter() - start)
+        stored_progress.record_result(topic=key, difficulty="easy", was_correct=True)
+
+    # Cold lookups (cache cleared) against the full vocabulary.
+    cold_index = TopicIndex(bases)
+    probes = random.Random(seed + 1).sample(stream, k=min(2000, len(stream)))
+    cold: List[float] = []
+    for topic in probes:
+        cold_index._cache.clear()
+        start = time.perf_counter()
+        cold_index.lookup(topic)
+        cold.append(time.perf_counter() - start)
+
+    def _us(values: List[float], q: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+
+    raw_size = len(raw_progress.topics)
+    canonical_size = len(canonical_progress.topics)
+
+    print("=== Topic canonicalization benchmark ===")
+    print(f"base topics:            {len(bases)}")
+    print(f"recorded results:       {len(stream)}")
+    print(f"topic map (raw):        {raw_size}")
+    print(f"topic map (canonical):  {canonical_size}")
+    print(f"reduction:              {1 - canonical_size / raw_size:.1%}")
+    print(
+        "canonicalize latency:   "
+        f"mean={statistics.mean(latencies) * 1e6:.1f}us "
+        f"p50={_us(latencies, 0.5):.1f}us p99={_us(latencies, 0.99):.1f}us"
+    )
+    print(
+        "canonicalize (tools):   "
+        f"mean={statistics.mean(tool_latencies) * 1e6:.1f}us "
+        f"p50={_us(tool_latencies, 0.5):.1f}us p99={_us(tool_latencies, 0.99):.1f}us"
+    )
+    print(
+        "cold lookup latency:    "
+        f"mean={statistics.mean(cold) * 1e6:.1f}us "
+        f"p50={_us(cold, 0.5):.1f}us p99={_us(cold, 0.99):.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", type=int, default=5000)
+    parser.add_argument("--results", type=int, default=50000)
+    args = parser.parse_args()
+    run_benchmark(args.topics, args.results)
+
+
+if __name__ == "__main__":
+    main()
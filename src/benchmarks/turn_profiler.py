@@ -0,0 +1,146 @@
+"""
+Cost of per-turn profiling, and where the turn time goes.
+
+Synthetic learners from `load_simulator` play lessons one at a time on the
+offline stub (with a small model latency) under three settings:
+
+  - off:       no turn selected
+  - sampling:  every turn profiled by the stack sampler
+  - cprofile:  every turn profiled deterministically
+
+For each we report turn latency and the overhead over `off`, then the time
+per layer summed over all the per-turn reports (model client, ADK plumbing,
+state encode/decode, our callbacks and tools, imports, I/O wait). Each
+setting runs in a fresh process; the first turn (lazy imports) is excluded
+from the latency figures but not from the reports.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.turn_profiler
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.turn_profiler --learners 4 --lessons 4
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import tempfile
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from google.genai import types as genai_types
+
+from src.benchmarks.load_simulator import LearnerBehavior, install_scripted_tutor, make_learners
+
+
+def _run_configuration(
+    mode: str, learners: int, lessons: int, latency_ms: float, seed: int
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.app_factory import app, build_runner
+    from src.core.turn_profiler import profiled_run, turn_profiler
+
+    install_scripted_tutor(latency_ms)
+    directory = Path(tempfile.mkdtemp(prefix="tutor-profiles-"))
+    if mode != "off":
+        turn_profiler.directory = directory
+        turn_profiler.mode = mode
+        turn_profiler.sample_rate = 1.0
+
+    async def drive() -> List[float]:
+        runner = build_runner(app)
+        latencies: List[float] = []
+        for learner in make_learners(learners, lessons, LearnerBehavior(), seed):
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=learner.user_id
+            )
+            for text in learner.turns():
+                start = time.perf_counter()
+                async for _ in profiled_run(
+                    runner,
+                    user_id=learner.user_id,
+                    session_id=session.id,
+                    new_message=genai_types.Content(
+                        role="user", parts=[genai_types.Part(text=text)]
+                    ),
+                ):
+                    pass
+                latencies.append(time.perf_counter() - start)
+        return latencies
+
+    latencies = asyncio.run(drive())
+    layers: Counter = Counter()
+    agents: Counter = Counter()
+    reports = list(directory.glob("*/*.json"))
+    for path in reports:
+        summary = json.loads(path.read_text(encoding="utf-8"))
+        layers.update(summary["layers_ms"])
+        for entry in summary["agents"]:
+            agents[entry["agent"]] += 1
+    return {
+        "latencies": latencies[1:],
+        "reports": len(reports),
+        "files": sum(1 for _ in directory.glob("*/*")),
+        "layers_ms": dict(layers),
+        "agent_runs": dict(agents),
+        "metrics": turn_profiler.metrics(),
+    }
+
+
+def run_benchmark(learners: int, lessons: int, latency_ms: float, seed: int) -> None:
+    print(
+        f"=== Per-turn profiling: {learners} learners x {lessons} lessons, "
+        f"stub latency {latency_ms:.0f}ms ==="
+    )
+    spawn = multiprocessing.get_context("spawn")
+    baseline = None
+    for mode in ("off", "sampling", "cprofile"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration, mode, learners, lessons, latency_ms, seed
+            ).result()
+        latencies = sorted(result["latencies"])
+        mean = sum(latencies) / len(latencies)
+        baseline = baseline or mean
+        print(f"--- {mode} ---")
+        print(
+            f"turns={len(latencies) + 1} turn_mean={mean * 1000:.1f}ms "
+            f"p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+            f"overhead={(mean / baseline - 1) * 100:+.1f}% "
+            f"reports={result['reports']} files={result['files']}"
+        )
+        layers = result["layers_ms"]
+        if layers:
+            total = sum(layers.values())
+            print(
+                "    layers: "
+                + "  ".join(
+                    f"{name}={ms:,.0f}ms ({ms / total:.0%})"
+                    for name, ms in sorted(layers.items(), key=lambda item: -item[1])
+                )
+            )
+            print(f"    agent runs tagged: {result['agent_runs']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--learners", type=int, default=3)
+    parser.add_argument("--lessons", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.learners, args.lessons, args.latency_ms, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Per-learner usage budgets against a runaway learner, on the offline stub.
+
+One learner asks for a new lesson on every turn (so no response cache can
+help), then a few normal learners take a handful of lessons. For each
+configuration we report the model tokens each kind of learner consumed, the
+turn latency, and what the budget did:
+
+  - unmetered:  the usage budget plugin removed
+  - metered:    usage recorded per learner/session/agent, no limits
+  - budgeted:   soft and hard token limits per learner
+
+Under a budget, the runaway learner's calls switch to cheaper mode (capped
+output, no search tool offered) after the soft limit and are refused after
+the hard one, while the normal learners stay within budget. The budgeted run
+then drops the in-process meter, as a restart would, and checks that the
+learner's persisted totals still refuse the next turn.
+
+Each configuration runs in a fresh process.
+
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.usage_budget
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.benchmarks.usage_budget \\
+        --turns 60 --soft-tokens 100000 --hard-tokens 200000
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+
+from src.benchmarks.load_simulator import (
+    LearnerBehavior,
+    ScriptedTutor,
+    _stub_models,
+    make_learners,
+)
+from src.core.stub_llm import set_default_responder
+
+
+RUNAWAY_USER = "runaway-learner"
+
+
+class _RequestProbe:
+    """Wraps the scripted tutor to see what each request offered the model."""
+
+    def __init__(self, tutor: ScriptedTutor) -> None:
+        self.tutor = tutor
+        self.search_offered = 0
+        self.capped = 0
+
+    def __call__(self, llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+        if "google_search_agent" in llm_request.tools_dict:
+            self.search_offered += 1
+        if llm_request.config is not None and llm_request.config.max_output_tokens:
+            self.capped += 1
+        return self.tutor(llm_request, agent_name)
+
+
+async def _turn(runner: InMemoryRunner, user_id: str, session_id: str, text: str) -> str:
+    reply = ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            reply = event.content.parts[0].text
+    return reply
+
+
+def _tokens(model_usage: Dict[str, Dict[str, Dict[str, float]]]) -> int:
+    return int(
+        sum(
+            entry["prompt_tokens"] + entry["output_tokens"]
+            for models in model_usage.values()
+            for entry in models.values()
+        )
+    )
+
+
+def _run_configuration(
+    metered: bool,
+    soft_tokens: int,
+    hard_tokens: int,
+    turns: int,
+    learners: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Runs in a fresh process."""
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    from src.app_factory import build_app
+    from src.core.llm import model_usage
+    from src.core.observability import learner_usage, usage_metrics
+    from src.core.usage_budget import (
+        REFUSAL_TEXT,
+        STATE_KEY_TOKEN_USAGE,
+        UsageBudget,
+        UsageBudgetPlugin,
+        usage_meter,
+    )
+
+    app = build_app()
+    app.plugins[:] = [
+        plugin for plugin in app.plugins if not isinstance(plugin, UsageBudgetPlugin)
+    ]
+    if metered:
+        app.plugins.append(
+            UsageBudgetPlugin(
+                usage_meter, UsageBudget(soft_tokens=soft_tokens, hard_tokens=hard_tokens)
+            )
+        )
+    probe = _RequestProbe(ScriptedTutor())
+    set_default_responder(probe)
+    for model in _stub_models(app):
+        model.latency_s = 0.002
+
+    async def drive() -> Dict[str, Any]:
+        runner = InMemoryRunner(app=app)
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=RUNAWAY_USER
+        )
+        latencies: List[float] = []
+        phases: List[Dict[str, Any]] = []
+        refused_at: Optional[int] = None
+
+        async def runaway() -> None:
+            nonlocal refused_at
+            await _turn(runner, RUNAWAY_USER, session.id, "Hi, I'm a beginner learner.")
+            for index in range(turns):
+                before = _tokens(model_usage.metrics())
+                search_before = probe.search_offered
+                start = time.perf_counter()
+                reply = await _turn(
+                    runner, RUNAWAY_USER, session.id, f"Teach me runaway topic {index}"
+                )
+                latencies.append(time.perf_counter() - start)
+                if reply == REFUSAL_TEXT and refused_at is None:
+                    refused_at = index
+                phases.append(
+                    {
+                        "tokens": _tokens(model_usage.metrics()) - before,
+                        "search_offered": probe.search_offered - search_before,
+                    }
+                )
+
+        async def normal(learner) -> None:
+            normal_session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=learner.user_id
+            )
+            for text in learner.turns():
+                await _turn(runner, learner.user_id, normal_session.id, text)
+
+        # One after the other, so per-turn tokens are the runaway learner's own.
+        await runaway()
+        population = make_learners(learners, 4, LearnerBehavior(), seed)
+        await asyncio.gather(*(normal(learner) for learner in population))
+
+        result: Dict[str, Any] = {
+            "latencies": latencies,
+            "phases": phases,
+            "refused_at": refused_at,
+            "total_tokens": _tokens(model_usage.metrics()),
+            "search_offered": probe.search_offered,
+            "capped_requests": probe.capped,
+        }
+        if metered:
+            result["usage"] = usage_metrics(top_users=learners + 1)
+            result["runaway"] = learner_usage(RUNAWAY_USER)
+            stored = await runner.session_service.get_session(
+                app_name=runner.app_name, user_id=RUNAWAY_USER, session_id=session.id
+            )
+            result["persisted"] = STATE_KEY_TOKEN_USAGE in stored.state
+            # A restart loses the in-process meter; the persisted totals remain.
+            usage_meter.reset()
+            reply = await _turn(runner, RUNAWAY_USER, session.id, "Teach me one more topic")
+            result["refused_after_restart"] = reply == REFUSAL_TEXT
+        return result
+
+    return asyncio.run(drive())
+
+
+def _report(name: str, result: Dict[str, Any], soft_tokens: int, hard_tokens: int) -> None:
+    latencies = sorted(result["latencies"])
+    phases = result["phases"]
+    print(f"--- {name} ---")
+    print(
+        f"runaway turns={len(latencies)} "
+        f"turn_mean={sum(latencies) / len(latencies) * 1000:.1f}ms "
+        f"total model tokens (all learners)={result['total_tokens']:,}"
+    )
+    cumulative = 0
+    rows = []
+    for index, phase in enumerate(phases):
+        cumulative += phase["tokens"]
+        rows.append((index, cumulative, phase))
+    step = max(1, len(rows) // 8)
+    for index, cumulative, phase in rows[::step]:
+        print(
+            f"    turn {index:>3}: {phase['tokens']:>6,} tokens "
+            f"(cumulative {cumulative:>8,}) search offered {phase['search_offered']}x"
+        )
+    if "usage" not in result:
+        return
+    usage = result["usage"]
+    runaway = result["runaway"]
+    print(
+        f"    runaway rolling={runaway['rolling']['tokens']:,} tokens budget={runaway['budget']} "
+        f"refused from turn {result['refused_at']} "
+        f"(soft={soft_tokens or 'off'}, hard={hard_tokens or 'off'})"
+    )
+    others = [
+        totals["tokens"] for user, totals in usage["top_users"].items() if user != RUNAWAY_USER
+    ]
+    print(
+        f"    other learners: {len(others)} using {min(others, default=0):,}.."
+        f"{max(others, default=0):,} tokens; soft_limited={usage['soft_limited']} "
+        f"hard_limited={usage['hard_limited']} cheap_calls={usage['cheap_calls']} "
+        f"refusals={usage['refusals']} capped_requests={result['capped_requests']}"
+    )
+    print(
+        f"    persisted in state={result['persisted']} "
+        f"refused after restart={result['refused_after_restart']}"
+    )
+
+
+def run_benchmark(
+    turns: int, learners: int, soft_tokens: int, hard_tokens: int, seed: int
+) -> None:
+    print(
+        f"=== Usage budgets: 1 runaway learner x {turns} lessons + {learners} learners, "
+        f"soft {soft_tokens:,} / hard {hard_tokens:,} tokens ==="
+    )
+    configurations = [
+        ("unmetered", False, 0, 0),
+        ("metered", True, 0, 0),
+        ("budgeted", True, soft_tokens, hard_tokens),
+    ]
+    spawn = multiprocessing.get_context("spawn")
+    for name, metered, soft, hard in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                _run_configuration, metered, soft, hard, turns, learners, seed
+            ).result()
+        _report(name, result, soft, hard)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--learners", type=int, default=3)
+    parser.add_argument("--soft-tokens", type=int, default=150000)
+    parser.add_argument("--hard-tokens", type=int, default=250000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.turns, args.learners, args.soft_tokens, args.hard_tokens, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Non-interactive batch mode for the tutor CLI.
+
+Reads a JSONL script of learner turns, one object per line:
+
+    {"user_id": "alice", "message": "Hi, I'm a beginner in RL."}
+    {"user_id": "alice", "message": "Teach me Q-learning"}
+    {"user_id": "bob", "session": "s2", "message": "Explain gradient descent"}
+
+Turns that share (user_id, session) form one session and run in script
+order; different sessions run concurrently. One JSONL result is written per
+turn as it completes, with the reply text, the answering agent, tool calls
+and latency. `--workers N` spreads sessions over N processes.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from src.core.workers import ShardedSupervisor, TurnResult, run_turn
+
+
+SessionKey = Tuple[str, str]
+
+
+def read_script(stream: TextIO) -> Dict[SessionKey, List[Tuple[int, str]]]:
+    """Group script lines by session, keeping their order and line numbers."""
+    sessions: Dict[SessionKey, List[Tuple[int, str]]] = {}
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            turn = json.loads(line)
+            key = (str(turn["user_id"]), str(turn.get("session", "")))
+            message = str(turn["message"])
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"Invalid script line {line_number}: {exc}") from exc
+        sessions.setdefault(key, []).append((line_number, message))
+    return sessions
+
+
+class _LocalBackend:
+    """Runs sessions on an in-process runner."""
+
+    def __init__(self) -> None:
+        from src.app_factory import app, build_runner
+
+        self.app = app
+        self.runner = build_runner(app)
+
+    async def start(self) -> "_LocalBackend":
+        from src.core.prewarm import prepare
+
+        await prepare(self.app, self.runner)
+        return self
+
+    async def create_session(self, user_id: str) -> str:
+        session = await self.runner.session_service.create_session(
+            app_name=self.runner.app_name, user_id=user_id
+        )
+        return session.id
+
+    async def run_turn(self, user_id: str, session_id: str, text: str) -> TurnResult:
+        return await run_turn(self.runner, user_id, session_id, text)
+
+
+async def run_batch(
+    script: TextIO,
+    output: TextIO,
+    concurrency: int = 16,
+    workers: int = 0,
+) -> Dict[str, Any]:
+    """Run every session in `script`; returns a summary of the run."""
+    sessions = read_script(script)
+    supervisor: Optional[ShardedSupervisor] = None
+    if workers > 0:
+        supervisor = await ShardedSupervisor(workers=workers).start()
+        backend: Any = supervisor
+    else:
+        backend = await _LocalBackend().start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    turns = 0
+    errors = 0
+
+    def write(line_number: int, message: str, result: TurnResult) -> None:
+        nonlocal turns, errors
+        turns += 1
+        errors += result.error is not None
+        record = {"line": line_number, "message": message, **asdict(result)}
+        record["latency_ms"] = round(record.pop("latency_s") * 1000, 1)
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    async def play(key: SessionKey, session_turns: List[Tuple[int, str]]) -> None:
+        user_id = key[0]
+        async with semaphore:
+            session_id = await backend.create_session(user_id)
+            for line_number, message in session_turns:
+                try:
+                    result = await backend.run_turn(user_id, session_id, message)
+                except Exception as exc:  # noqa: BLE001 - reported in the output
+                    result = TurnResult(
+                        user_id=user_id,
+                        session_id=session_id,
+                        error=f"{type(exc).__name__}: {exc}",
+                    )
+                write(line_number, message, result)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(play(key, session_turns) for key, session_turns in sessions.items())
+        )
+    finally:
+        if supervisor is not None:
+            await supervisor.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": len(sessions),
+        "turns": turns,
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "turns_per_s": round(turns / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def run_batch_files(
+    script_path: str, output_path: str, concurrency: int, workers: int
+) -> None:
+    script = sys.stdin if script_path == "-" else open(script_path, encoding="utf-8")
+    output = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    try:
+        summary = asyncio.run(run_batch(script, output, concurrency, workers))
+    finally:
+        if script is not sys.stdin:
+            script.close()
+        if output is not sys.stdout:
+            output.close()
+    print(json.dumps(summary), file=sys.stderr)
@@ -0,0 +1,77 @@
+"""
+Offline batch generation for the exercise bank.
+
+Fills TUTOR_EXERCISE_BANK_PATH (or --path) with questions for the given
+topics at every difficulty, so popular lessons can be served without a live
+model call:
+
+    uv run python -m src.cli.exercise_bank --topics "Q-learning,gradient descent"
+    uv run python -m src.cli.exercise_bank --topics-file topics.txt --per-difficulty 12
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List
+
+from src.config import config
+from src.core.exercise_bank import DIFFICULTIES, ExerciseBank, generate_exercises
+from src.core.llm import build_gemini_model
+from src.core.topic_index import canonical_topic_form
+
+
+def _read_topics(args: argparse.Namespace) -> List[str]:
+    topics: List[str] = []
+    if args.topics:
+        topics.extend(args.topics.split(","))
+    if args.topics_file:
+        topics.extend(Path(args.topics_file).read_text(encoding="utf-8").splitlines())
+    return [topic.strip() for topic in topics if topic.strip()]
+
+
+async def build_bank(
+    bank: ExerciseBank, topics: List[str], per_difficulty: int, batch_size: int
+) -> None:
+    model = build_gemini_model("exercise_bank_generator")
+
+    async def fill(topic: str, difficulty: str) -> None:
+        bank_topic = canonical_topic_form(topic)
+        attempts = 0
+        # Models repeat themselves; stop after a few batches that add nothing new.
+        while bank.stock(bank_topic, difficulty) < per_difficulty and attempts < 3:
+            exercises = await generate_exercises(model, topic, difficulty, batch_size)
+            attempts = 0 if bank.add(bank_topic, exercises) else attempts + 1
+        print(f"{topic} [{difficulty}]: {bank.stock(bank_topic, difficulty)} questions")
+
+    # The shared rate limiter paces these calls.
+    await asyncio.gather(
+        *(fill(topic, difficulty) for topic in topics for difficulty in DIFFICULTIES)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", default="", help="Comma-separated topics.")
+    parser.add_argument("--topics-file", default="", help="File with one topic per line.")
+    parser.add_argument("--path", default=config.exercise_bank_path)
+    parser.add_argument("--per-difficulty", type=int, default=9)
+    parser.add_argument("--batch-size", type=int, default=6)
+    args = parser.parse_args()
+
+    topics = _read_topics(args)
+    if not topics:
+        parser.error("give at least one topic with --topics or --topics-file")
+    if not args.path:
+        parser.error("set TUTOR_EXERCISE_BANK_PATH or pass --path")
+
+    bank = ExerciseBank(Path(args.path))
+    print(f"=== Building exercise bank at {args.path} ===")
+    asyncio.run(build_bank(bank, topics, args.per_difficulty, args.batch_size))
+    print(f"\nTotal questions in bank: {len(bank)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,20 @@ Clean CLI entrypoint to interact with the AI Tutor Agent using ADK.
 """
 
 
+import argparse
 import asyncio
 import logging
+import os
+from pathlib import Path
 from typing import List, Optional
 
-from google.adk.runners import InMemoryRunner
 from google.genai import types as genai_types
 
-from src.app_factory import app
+from src.app_factory import app, build_runner
+from src.cli.batch import run_batch_files
+from src.config import config
+from src.core.prewarm import prepare
+from src.core.turn_profiler import PROFILE_MODES, profiled_run, turn_profiler
 
 
 # Color codes for terminal output (ANSI)
@@ -63,22 +69,47 @@ def content_to_text(content: Optional[genai_types.Content]) -> str:
     return "\n".join(texts)
 
 
-async def run_cli() -> None:
+async def run_cli(resume_session_id: Optional[str] = None, profile: bool = False) -> None:
     """Start an interactive CLI session with the tutor."""
-    runner = InMemoryRunner(app=app)
+    runner = build_runner(app)
+    health = await prepare(app, runner)
 
     user_id = "cli_user"
-    session = await runner.session_service.create_session(
-        app_name=runner.app_name,
-        user_id=user_id,
-        session_id=None,
-    )
+    session = None
+    if resume_session_id:
+        # Durable sessions are resumed from their snapshot + event-log tail.
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name,
+            user_id=user_id,
+            session_id=resume_session_id,
+        )
+        if session is None:
+            print(f"Session {resume_session_id} not found; starting a new one.")
+    if session is None:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name,
+            user_id=user_id,
+            session_id=None,
+        )
     session_id = session.id
+    if profile:
+        turn_profiler.enable_session(session_id)
 
     print_banner()
+    for error in health["errors"]:
+        print(f"Warm-up incomplete ({error}); the first reply may be slow.\n")
+    if config.session_dir:
+        print(f"Session id: {session_id} (resume with --session-id {session_id})\n")
+    if profile:
+        print(f"Profiling every turn to {turn_profiler.directory / session_id}\n")
 
     while True:
-        user_input = input(f"{BLUE}you > {RESET}")
+        # Read stdin off the event loop so background tasks (cache refills,
+        # rate-limiter dispatch) keep running while the user types.
+        try:
+            user_input = await asyncio.to_thread(input, f"{BLUE}you > {RESET}")
+        except EOFError:
+            break
         if user_input.strip().lower() in {"exit", "quit"}:
             break
 
@@ -88,7 +119,8 @@ async def run_cli() -> None:
         )
 
         final_text: str = ""
-        async for event in runner.run_async(
+        async for event in profiled_run(
+            runner,
             user_id=user_id,
             session_id=session_id,
             new_message=user_message,
@@ -106,5 +138,71 @@ async def run_cli() -> None:
             print(f"\n{GREEN}tutor > {RESET}[No text response]\n")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI Tutor CLI (interactive or batch).")
+    parser.add_argument(
+        "--session-id",
+        default=None,
+        help="Resume a saved session (requires TUTOR_SESSION_DIR).",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="SCRIPT",
+        default=None,
+        help="Run a JSONL script of {user_id, message} turns ('-' for stdin).",
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Where batch mode writes JSONL results ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Batch mode: sessions run at the same time.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Batch mode: spread sessions over N worker processes (0 = in-process).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every turn; reports go to --profile-dir/<session_id>/.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=config.profile_dir or "profiles",
+        help="Where per-turn profile reports are written.",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=PROFILE_MODES,
+        default=turn_profiler.mode,
+        help="cprofile (deterministic, .pstats) or sampling (collapsed stacks).",
+    )
+    args = parser.parse_args()
+
+    if args.profile:
+        turn_profiler.directory = Path(args.profile_dir)
+        turn_profiler.mode = args.profile_mode
+        # Batch worker processes read the same settings from the environment.
+        os.environ.update(
+            TUTOR_PROFILE_DIR=args.profile_dir,
+            TUTOR_PROFILE_MODE=args.profile_mode,
+            TUTOR_PROFILE_SAMPLE_RATE="1",
+        )
+
+    if args.batch:
+        if args.profile:
+            turn_profiler.sample_rate = 1.0
+        run_batch_files(args.batch, args.output, args.concurrency, args.workers)
+    else:
+        asyncio.run(run_cli(args.session_id, args.profile))
+
+
 if __name__ == "__main__":
-    asyncio.run(run_cli())
+    main()
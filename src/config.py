@@ -6,7 +6,8 @@ a typed AppConfig object that can be imported anywhere in the codebase.
 """
 
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
 import os
 
 try:
@@ -26,18 +27,113 @@ class AppConfig:
     app_name: str
     model_name: str
     google_api_key: str
+    # Model tiers: fast-tier agents use fast_model_name when model_tiering is on;
+    # agent_models pins individual agents to a model either way.
+    model_tiering: bool = False
+    fast_model_name: str = "gemini-2.5-flash-lite"
+    agent_models: Dict[str, str] = field(default_factory=dict)
+    # Offline mode: every agent uses the local stub model instead of Gemini.
+    use_stub_model: bool = False
+    stub_latency_ms: float = 0.0
+    stub_connect_ms: float = 0.0
+    # Process-wide model quota shared by all agents (0 disables the limit).
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    # Hedged requests for interactive agents (opt-in).
+    hedge_requests: bool = False
+    hedge_percentile: float = 0.95
+    hedge_budget_ratio: float = 0.1
+    # Circuit breaker around the model backend.
+    circuit_failure_rate: float = 0.5
+    circuit_open_seconds: float = 15.0
+    # Explanation/search response caches ("" keeps them in memory only).
+    response_cache_size: int = 1024
+    response_cache_ttl_s: float = 24 * 3600
+    response_cache_dir: str = ""
+    # Pre-generated exercise bank ("" keeps it in memory only).
+    exercise_bank_path: str = ""
+    exercise_bank_min_stock: int = 6
+    # Questions kept per session for grading by reference (0 = grade from history).
+    exercise_table_size: int = 30
+    # Durable sessions: event log + snapshots under this directory ("" = in-memory).
+    session_dir: str = ""
+    session_snapshot_every: int = 200
+    # Keep at most N sessions / ~N serialized bytes in memory (0 = unbounded);
+    # the rest are spilled to session_dir (or a temporary directory).
+    session_max_resident: int = 0
+    session_max_resident_bytes: int = 0
+    # Register static instruction + tool prefixes as cached content (opt-in).
+    prompt_cache: bool = False
+    prompt_cache_ttl_s: float = 3600.0
+    # Per-turn session size sampling; tracemalloc profiling when frames > 0.
+    session_metrics: bool = True
+    session_heap_every: int = 10
+    session_warn_bytes: int = 256 * 1024
+    tracemalloc_frames: int = 0
+    # Per-learner token/cost metering; rolling budgets (0 disables a limit).
+    usage_metering: bool = True
+    budget_window_s: float = 86400.0
+    budget_soft_tokens: int = 0
+    budget_hard_tokens: int = 0
+    budget_soft_usd: float = 0.0
+    budget_hard_usd: float = 0.0
+    budget_soft_max_output_tokens: int = 256
+    # Search fan-out: sub-queries per call, concurrency and digest size;
+    # a JSONL corpus path replaces Google Search with local keyword search.
+    search_max_queries: int = 5
+    search_concurrency: int = 4
+    search_results_per_query: int = 4
+    search_digest_chars: int = 3000
+    search_corpus_path: str = ""
+    # Per-turn CPU profiling: listed sessions and/or a sampled fraction of turns.
+    profile_dir: str = ""
+    profile_sample_rate: float = 0.0
+    profile_sessions: Tuple[str, ...] = ()
+    profile_mode: str = "cprofile"
+    profile_interval_ms: float = 2.0
+    # Warm the agent tree, run path and model clients before serving; `ping`
+    # also sends one no-op request per distinct model to open its connections.
+    prewarm: bool = True
+    prewarm_ping: bool = False
+    # Tools run as coroutines: per-user serialized state updates, blocking work
+    # on a bounded thread pool. Off = the plain synchronous tools.
+    async_tools: bool = True
+    tool_workers: int = 4
 
     @property
     def has_valid_api_key(self) -> bool:
         return bool(self.google_api_key)
 
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_mapping(name: str) -> Dict[str, str]:
+    """Parse "key=value,key=value" into a dict."""
+    mapping: Dict[str, str] = {}
+    for item in os.getenv(name, "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def _env_list(name: str) -> Tuple[str, ...]:
+    """Parse "a,b,c" into a tuple of non-empty items."""
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
+
 def _load_config() -> AppConfig:
     app_name = os.getenv("APP_NAME", "agentic_ai_tutor_with_googleadk")
     model_name = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash-lite")
     google_api_key = os.getenv("GOOGLE_API_KEY", "")
+    use_stub_model = _env_bool("TUTOR_USE_STUB_MODEL")
 
-    if not google_api_key:
+    if not google_api_key and not use_stub_model:
         raise RuntimeError(
             "GOOGLE_API_KEY is not set. Define it in your environment or .env file."
         )
@@ -46,6 +142,58 @@ def _load_config() -> AppConfig:
         app_name=app_name,
         model_name=model_name,
         google_api_key=google_api_key,
+        model_tiering=_env_bool("GEMINI_MODEL_TIERING"),
+        fast_model_name=os.getenv("GEMINI_FAST_MODEL_NAME", "gemini-2.5-flash-lite"),
+        agent_models=_env_mapping("GEMINI_AGENT_MODELS"),
+        use_stub_model=use_stub_model,
+        stub_latency_ms=float(os.getenv("TUTOR_STUB_LATENCY_MS", "0")),
+        stub_connect_ms=float(os.getenv("TUTOR_STUB_CONNECT_MS", "0")),
+        requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0")),
+        tokens_per_minute=int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "0")),
+        hedge_requests=_env_bool("GEMINI_HEDGE_REQUESTS"),
+        hedge_percentile=float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0.95")),
+        hedge_budget_ratio=float(os.getenv("GEMINI_HEDGE_BUDGET_RATIO", "0.1")),
+        circuit_failure_rate=float(os.getenv("GEMINI_CIRCUIT_FAILURE_RATE", "0.5")),
+        circuit_open_seconds=float(os.getenv("GEMINI_CIRCUIT_OPEN_SECONDS", "15")),
+        response_cache_size=int(os.getenv("TUTOR_RESPONSE_CACHE_SIZE", "1024")),
+        response_cache_ttl_s=float(os.getenv("TUTOR_RESPONSE_CACHE_TTL_S", "86400")),
+        response_cache_dir=os.getenv("TUTOR_RESPONSE_CACHE_DIR", ""),
+        exercise_bank_path=os.getenv("TUTOR_EXERCISE_BANK_PATH", ""),
+        exercise_bank_min_stock=int(os.getenv("TUTOR_EXERCISE_BANK_MIN_STOCK", "6")),
+        exercise_table_size=int(os.getenv("TUTOR_EXERCISE_TABLE_SIZE", "30")),
+        session_dir=os.getenv("TUTOR_SESSION_DIR", ""),
+        session_snapshot_every=int(os.getenv("TUTOR_SESSION_SNAPSHOT_EVERY", "200")),
+        session_max_resident=int(os.getenv("TUTOR_SESSION_MAX_RESIDENT", "0")),
+        session_max_resident_bytes=int(os.getenv("TUTOR_SESSION_MAX_RESIDENT_BYTES", "0")),
+        prompt_cache=_env_bool("GEMINI_PROMPT_CACHE"),
+        prompt_cache_ttl_s=float(os.getenv("GEMINI_PROMPT_CACHE_TTL_S", "3600")),
+        session_metrics=_env_bool("TUTOR_SESSION_METRICS", True),
+        session_heap_every=int(os.getenv("TUTOR_SESSION_HEAP_EVERY", "10")),
+        session_warn_bytes=int(os.getenv("TUTOR_SESSION_WARN_BYTES", "262144")),
+        tracemalloc_frames=int(os.getenv("TUTOR_TRACEMALLOC_FRAMES", "0")),
+        usage_metering=_env_bool("TUTOR_USAGE_METERING", True),
+        budget_window_s=float(os.getenv("TUTOR_BUDGET_WINDOW_S", "86400")),
+        budget_soft_tokens=int(os.getenv("TUTOR_BUDGET_SOFT_TOKENS", "0")),
+        budget_hard_tokens=int(os.getenv("TUTOR_BUDGET_HARD_TOKENS", "0")),
+        budget_soft_usd=float(os.getenv("TUTOR_BUDGET_SOFT_USD", "0")),
+        budget_hard_usd=float(os.getenv("TUTOR_BUDGET_HARD_USD", "0")),
+        budget_soft_max_output_tokens=int(
+            os.getenv("TUTOR_BUDGET_SOFT_MAX_OUTPUT_TOKENS", "256")
+        ),
+        search_max_queries=int(os.getenv("TUTOR_SEARCH_MAX_QUERIES", "5")),
+        search_concurrency=int(os.getenv("TUTOR_SEARCH_CONCURRENCY", "4")),
+        search_results_per_query=int(os.getenv("TUTOR_SEARCH_RESULTS_PER_QUERY", "4")),
+        search_digest_chars=int(os.getenv("TUTOR_SEARCH_DIGEST_CHARS", "3000")),
+        search_corpus_path=os.getenv("TUTOR_SEARCH_CORPUS", ""),
+        profile_dir=os.getenv("TUTOR_PROFILE_DIR", ""),
+        profile_sample_rate=float(os.getenv("TUTOR_PROFILE_SAMPLE_RATE", "0")),
+        profile_sessions=_env_list("TUTOR_PROFILE_SESSIONS"),
+        profile_mode=os.getenv("TUTOR_PROFILE_MODE", "cprofile"),
+        profile_interval_ms=float(os.getenv("TUTOR_PROFILE_INTERVAL_MS", "2")),
+        prewarm=_env_bool("TUTOR_PREWARM", True),
+        prewarm_ping=_env_bool("TUTOR_PREWARM_PING"),
+        async_tools=_env_bool("TUTOR_ASYNC_TOOLS", True),
+        tool_workers=int(os.getenv("TUTOR_TOOL_WORKERS", "4")),
     )
 
 
@@ -0,0 +1,130 @@
+"""
+Serving lesson exercises from the pre-generated exercise bank.
+
+  - before_model: draw unseen questions at the strategy-chosen difficulty and
+                  answer without a model call; fall back to live generation
+                  on a miss
+  - after_model:  add live-generated questions to the bank
+
+Either way, low stock for the topic triggers a background refill.
+"""
+
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from google.genai import types as genai_types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.config import config
+from src.core.difficulty_strategy import AccuracyBasedDifficultyStrategy
+from src.core.exercise_bank import (
+    ExerciseBank,
+    ExerciseRefiller,
+    exercise_id,
+    format_exercises,
+    parse_exercises,
+)
+from src.core.llm import build_gemini_model
+from src.core.state import STATE_KEY_SEEN_EXERCISES, load_progress
+from src.core.topic_index import canonical_topic_form, topic_canonicalizer, topic_from_request
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.exercise_bank")
+
+QUESTIONS_PER_LESSON = 3
+MAX_SEEN_EXERCISES = 1000
+
+exercise_bank = ExerciseBank(
+    Path(config.exercise_bank_path) if config.exercise_bank_path else None
+)
+exercise_refiller = ExerciseRefiller(
+    exercise_bank,
+    model_factory=lambda: build_gemini_model("exercise_bank_generator"),
+    min_stock=config.exercise_bank_min_stock,
+)
+
+_difficulty_strategy = AccuracyBasedDifficultyStrategy()
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if content is None:
+        return ""
+    return "\n".join(part.text for part in content.parts or [] if part.text)
+
+
+def _is_first_model_call(llm_request: LlmRequest) -> bool:
+    if not llm_request.contents:
+        return True
+    return not any(part.function_response for part in llm_request.contents[-1].parts or [])
+
+
+def exercise_bank_before_model_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Answer with unseen banked questions when the bank has enough of them."""
+    if not _is_first_model_call(llm_request):
+        return None
+    topic = topic_from_request(_user_text(callback_context))
+    if topic is None:
+        return None
+
+    state = callback_context.state
+    progress = load_progress(state)
+    known_topic = topic_canonicalizer.lookup(
+        callback_context.user_id, topic, progress.topics.keys()
+    )
+    difficulty = _difficulty_strategy.choose_difficulty(known_topic or topic, progress)
+    bank_topic = canonical_topic_form(topic)
+
+    seen: List[str] = list(state.get(STATE_KEY_SEEN_EXERCISES) or [])
+    drawn = exercise_bank.draw(bank_topic, difficulty, QUESTIONS_PER_LESSON, exclude=seen)
+    exercise_refiller.maybe_refill(bank_topic, difficulty)
+    if drawn is None:
+        logger.info("[BANK] miss topic=%s difficulty=%s", bank_topic, difficulty)
+        return None
+
+    seen.extend(drawn_id for drawn_id, _ in drawn)
+    state[STATE_KEY_SEEN_EXERCISES] = seen[-MAX_SEEN_EXERCISES:]
+    logger.info("[BANK] hit topic=%s difficulty=%s", bank_topic, difficulty)
+    return LlmResponse(
+        content=genai_types.Content(
+            role="model",
+            parts=[genai_types.Part(text=format_exercises(ex for _, ex in drawn))],
+        ),
+        custom_metadata={"exercise_bank": True},
+    )
+
+
+def exercise_bank_after_model_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> Optional[LlmResponse]:
+    """Bank the questions a live model call produced."""
+    if llm_response.partial or llm_response.content is None:
+        return None
+    if llm_response.custom_metadata:
+        return None  # served by a callback, not generated
+
+    text = "".join(part.text for part in llm_response.content.parts or [] if part.text)
+    exercises = parse_exercises(text)
+    topic = topic_from_request(_user_text(callback_context))
+    if not exercises or topic is None:
+        return None
+
+    bank_topic = canonical_topic_form(topic)
+    exercise_bank.add(bank_topic, exercises)
+    # The learner has now seen these; don't serve them back later.
+    seen: List[str] = list(callback_context.state.get(STATE_KEY_SEEN_EXERCISES) or [])
+    seen.extend(exercise_id(bank_topic, question) for _, question, _ in exercises)
+    callback_context.state[STATE_KEY_SEEN_EXERCISES] = seen[-MAX_SEEN_EXERCISES:]
+    for difficulty in {difficulty for difficulty, _, _ in exercises}:
+        exercise_refiller.maybe_refill(bank_topic, difficulty)
+    return None
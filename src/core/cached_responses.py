@@ -0,0 +1,209 @@
+"""
+Cached explanations and search results.
+
+Explanations are keyed on (canonical topic, learner level, preferred style);
+search results on the normalized query. Concurrent identical misses share
+one in-flight model call. The explanation callbacks hook into the agent the
+same way the observability callbacks do:
+
+  - before_model: serve a cached/shared explanation instead of calling the model
+  - after_model:  remember the agent's final text
+  - after_agent:  store it and release any waiting requests
+
+A leader that never reaches after_agent (the model call raised, the run
+failed or was cancelled) must not leave its followers waiting on a dead
+flight: `ExplanationFlightPlugin` abandons the flight on a model or run
+error and when the invocation ends, and the leader's task abandons it when
+the task is done.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+
+from src.config import config
+from src.core.response_cache import ResponseCache, SingleFlight
+from src.core.state import load_profile
+from src.core.topic_index import canonical_topic_form, normalize_topic, topic_from_request
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.cache")
+
+
+def _build_cache(name: str) -> ResponseCache:
+    persist_path = (
+        Path(config.response_cache_dir) / f"{name}.sqlite3"
+        if config.response_cache_dir
+        else None
+    )
+    return ResponseCache(
+        name=name,
+        max_entries=config.response_cache_size,
+        ttl_s=config.response_cache_ttl_s,
+        persist_path=persist_path,
+    )
+
+
+explanation_cache = _build_cache("explanations")
+search_cache = _build_cache("search")
+explanation_flights = SingleFlight()
+search_flights = SingleFlight()
+
+# invocation_id -> (cache key, leader's flight, final text so far) for
+# explanations in progress.
+_MAX_PENDING = 1024
+_pending: "OrderedDict[str, Tuple[str, asyncio.Future, Optional[str]]]" = OrderedDict()
+
+
+def explanation_cache_key(message: str, state) -> Optional[str]:
+    """Key for a self-contained explanation request, or None if not cacheable."""
+    topic = topic_from_request(message)
+    if topic is None:
+        return None
+
+    profile = load_profile(state)
+    level = profile.level if profile else "unknown"
+    style = profile.preferred_style if profile else "unknown"
+    return "|".join(
+        [canonical_topic_form(topic), normalize_topic(level), normalize_topic(style)]
+    )
+
+
+def search_cache_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if content is None:
+        return ""
+    return "\n".join(part.text for part in content.parts or [] if part.text)
+
+
+def _is_first_model_call(llm_request: LlmRequest) -> bool:
+    if not llm_request.contents:
+        return True
+    last = llm_request.contents[-1]
+    return not any(part.function_response for part in last.parts or [])
+
+
+def _final_text(llm_response: LlmResponse) -> Optional[str]:
+    if llm_response.partial or llm_response.content is None:
+        return None
+    parts = llm_response.content.parts or []
+    if any(part.function_call for part in parts):
+        return None
+    text = "".join(part.text for part in parts if part.text and not part.thought)
+    return text or None
+
+
+def _cached_response(text: str) -> LlmResponse:
+    return LlmResponse(
+        content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)])
+    )
+
+
+async def explanation_before_model_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Serve a cached or in-flight explanation instead of calling the model."""
+    if not _is_first_model_call(llm_request):
+        return None
+
+    key = explanation_cache_key(_user_text(callback_context), callback_context.state)
+    if key is None:
+        return None
+
+    cached = explanation_cache.get(key)
+    if cached is not None:
+        logger.info("[CACHE] explanation hit key=%s", key)
+        return _cached_response(cached)
+
+    is_leader, future = explanation_flights.begin(key)
+    if not is_leader:
+        shared = await explanation_flights.wait(future)
+        if shared is not None:
+            logger.info("[CACHE] explanation shared in-flight key=%s", key)
+            return _cached_response(shared)
+        return None
+
+    invocation_id = callback_context.invocation_id
+    _pending[invocation_id] = (key, future, None)
+    task = asyncio.current_task()
+    if task is not None:
+        # Cancellation skips every callback; a finished invocation is a no-op.
+        task.add_done_callback(lambda _: release_explanation(invocation_id))
+    while len(_pending) > _MAX_PENDING:
+        release_explanation(next(iter(_pending)))
+    return None
+
+
+def release_explanation(invocation_id: str, error: Optional[Exception] = None) -> None:
+    """Abandon an invocation's explanation flight, if it still leads one."""
+    pending = _pending.pop(invocation_id, None)
+    if pending is not None:
+        key, future, _ = pending
+        explanation_flights.abandon(key, future, error)
+
+
+def explanation_after_model_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> Optional[LlmResponse]:
+    """Remember the latest final text of an explanation we are caching."""
+    pending = _pending.get(callback_context.invocation_id)
+    text = _final_text(llm_response)
+    if pending is not None and text:
+        _pending[callback_context.invocation_id] = (pending[0], pending[1], text)
+    return None
+
+
+def explanation_after_agent_callback(
+    callback_context: CallbackContext,
+) -> Optional[genai_types.Content]:
+    """Store the finished explanation and release waiting requests."""
+    pending = _pending.pop(callback_context.invocation_id, None)
+    if pending is None:
+        return None
+
+    key, future, text = pending
+    if text:
+        explanation_cache.put(key, text)
+        explanation_flights.complete(key, text)
+    else:
+        explanation_flights.abandon(key, future)
+    return None
+
+
+class ExplanationFlightPlugin(BasePlugin):
+    """Releases an explanation's followers when its leader's invocation fails or ends."""
+
+    def __init__(self) -> None:
+        super().__init__(name="explanation_flights")
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        release_explanation(callback_context.invocation_id, error)
+        return None
+
+    async def on_run_error_callback(
+        self, *, invocation_context: InvocationContext, error: Exception
+    ) -> None:
+        release_explanation(invocation_context.invocation_id, error)
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        release_explanation(invocation_context.invocation_id)
@@ -0,0 +1,175 @@
+"""
+Circuit breaker around the model backend.
+
+While the backend is healthy the circuit is CLOSED. Once the error rate over
+a rolling window crosses a threshold it OPENS: calls fail immediately with
+CircuitOpenError instead of retrying for a minute, and agents switch to their
+degraded-mode fallbacks (see `src/core/degraded_mode.py`). After a cool-down
+it goes HALF_OPEN and lets a few probe calls through; if they succeed the
+circuit closes again.
+"""
+
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Dict, Tuple
+
+import httpx
+from google.genai import errors as genai_errors
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.circuit_breaker")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the backend while the circuit is open."""
+
+
+def is_backend_failure(exc: BaseException) -> bool:
+    """
+    Errors that say the backend is unhealthy: 5xx responses, rate limiting,
+    timeouts and failed connections. Anything else (a bad request, a bug in a
+    callback, a cancelled call) says nothing about the backend.
+    """
+    if isinstance(exc, genai_errors.ServerError):
+        return True
+    if isinstance(exc, genai_errors.ClientError):
+        return exc.code in (408, 429)
+    return isinstance(exc, (TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class CircuitBreaker:
+    """Rolling error-rate circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str = "model_backend",
+        failure_rate_threshold: float = 0.5,
+        window_s: float = 30.0,
+        min_requests: int = 5,
+        open_duration_s: float = 15.0,
+        half_open_probes: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_s = window_s
+        self.min_requests = min_requests
+        self.open_duration_s = open_duration_s
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.transitions: Dict[str, int] = {}
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_duration_s
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def is_open(self) -> bool:
+        """
+        True while a new call would be short-circuited: the circuit is open,
+        or half-open with every probe slot taken. Reserves nothing.
+        """
+        state = self.state
+        if state is CircuitState.HALF_OPEN:
+            return self._probes_in_flight >= self.half_open_probes
+        return state is CircuitState.OPEN
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self._state
+        if old_state is new_state:
+            return
+        self._state = new_state
+        key = f"{old_state.value}->{new_state.value}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+
+        if new_state is CircuitState.OPEN:
+            self._opened_at = self._clock()
+        elif new_state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        else:
+            self._outcomes.clear()
+
+        logger.warning("[CIRCUIT] %s %s (error_rate=%.2f)", self.name, key, self.error_rate)
+
+    def _trim(self) -> None:
+        horizon = self._clock() - self.window_s
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+
+    @property
+    def error_rate(self) -> float:
+        self._trim()
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures / len(self._outcomes)
+
+    def allow_request(self) -> bool:
+        """Reserve a call; False means fail fast."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CircuitState.CLOSED)
+            return
+        self._outcomes.append((self._clock(), True))
+
+    def record_failure(self) -> None:
+        if self._state is CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+        self._outcomes.append((self._clock(), False))
+        self._trim()
+        if (
+            self._state is CircuitState.CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and self.error_rate >= self.failure_rate_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def release_probe(self) -> None:
+        """Give back a probe slot for a call that ended without an outcome."""
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "state": self.state.value,
+            "error_rate": self.error_rate,
+            "window_requests": len(self._outcomes),
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
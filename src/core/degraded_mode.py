@@ -0,0 +1,276 @@
+"""
+Degraded-mode behavior while the model circuit breaker is open.
+
+Each agent gets a before-model callback that answers immediately instead of
+stalling on an unhealthy backend:
+  - root tutor:   deterministic routing (answers -> feedback, topics -> lesson)
+  - explanation:  serve a cached explanation for the topic, if any
+  - exercises:    templated questions at the strategy-chosen difficulty
+  - feedback:     queue the answer for grading once the backend recovers
+
+Queued answers stay queued until the feedback agent has graded them: they
+are handed to it on the next healthy turn and removed only when that turn's
+final reply arrives, so a grading call that fails leaves them for the next.
+  - profiling:    ask the learner to continue later
+
+Responses produced here carry `custom_metadata={"degraded": True}` so they
+can be told apart from real model output.
+"""
+
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from google.genai import types as genai_types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.core.cached_responses import explanation_cache, explanation_cache_key
+from src.core.circuit_breaker import CircuitOpenError
+from src.core.difficulty_strategy import AccuracyBasedDifficultyStrategy
+from src.core.llm import circuit_breaker
+from src.core.state import STATE_KEY_PENDING_GRADING, load_progress
+from src.core.topic_index import topic_canonicalizer, topic_from_request
+
+
+MAX_PENDING_GRADING = 20
+
+# invocation_id -> queued_at of the answers handed to the feedback agent.
+_MAX_HANDED = 1024
+_handed: "OrderedDict[str, List[float]]" = OrderedDict()
+
+_ANSWER_PATTERN = re.compile(
+    r"\bQ\d\b|\bmy answer\b|\bthe answer is\b|\bis this correct\b", re.IGNORECASE
+)
+
+_EXERCISE_TEMPLATES: Dict[str, List[str]] = {
+    "easy": [
+        "In your own words, what is {topic} and what problem does it solve?",
+        "Name the key terms you need to describe {topic} and define each in one line.",
+        "Give one everyday example where {topic} could be applied.",
+    ],
+    "medium": [
+        "Walk through a small worked example of {topic}, step by step.",
+        "Compare {topic} with a closely related idea: what is the key difference?",
+        "Which inputs or parameters matter most in {topic}, and why?",
+    ],
+    "hard": [
+        "What are the main limitations or failure modes of {topic}? Propose a fix for one.",
+        "Design a small experiment that would show whether {topic} is working correctly.",
+        "Explain how {topic} behaves in an edge case of your choice, and justify it.",
+    ],
+}
+
+_difficulty_strategy = AccuracyBasedDifficultyStrategy()
+
+
+def _degraded_response(
+    text: str = "",
+    function_call: Optional[genai_types.FunctionCall] = None,
+) -> LlmResponse:
+    part = (
+        genai_types.Part(function_call=function_call)
+        if function_call is not None
+        else genai_types.Part(text=text)
+    )
+    return LlmResponse(
+        content=genai_types.Content(role="model", parts=[part]),
+        custom_metadata={"degraded": True},
+    )
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if content is None:
+        return ""
+    return "\n".join(part.text for part in content.parts or [] if part.text)
+
+
+def _after_tool_call(llm_request: LlmRequest) -> bool:
+    if not llm_request.contents:
+        return False
+    return any(part.function_response for part in llm_request.contents[-1].parts or [])
+
+
+def root_degraded_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Route deterministically while the model cannot be asked to route."""
+    if not circuit_breaker.is_open():
+        return None
+
+    message = _user_text(callback_context)
+    target = None
+    # After a tool call the turn is already routed; just answer.
+    if not _after_tool_call(llm_request):
+        if _ANSWER_PATTERN.search(message):
+            target = "feedback_agent"
+        elif topic_from_request(message):
+            target = "lesson_pipeline_agent"
+
+    if target is None:
+        return _degraded_response(
+            "The tutor is running in a limited mode right now. You can still ask for a "
+            "topic (e.g. 'Teach me Q-learning') or submit an answer (e.g. 'For Q1 my "
+            "answer is ...')."
+        )
+    return _degraded_response(
+        function_call=genai_types.FunctionCall(
+            name="transfer_to_agent", args={"agent_name": target}
+        )
+    )
+
+
+def explanation_degraded_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Serve the closest cached explanation for the requested topic."""
+    if not circuit_breaker.is_open():
+        return None
+
+    message = _user_text(callback_context)
+    cached = None
+    key = explanation_cache_key(message, callback_context.state)
+    if key is not None:
+        # Prefer an exact (topic, level, style) match, then any level/style.
+        cached = explanation_cache.get(key) or explanation_cache.find_prefix(
+            key.split("|", 1)[0] + "|"
+        )
+
+    if cached is not None:
+        return _degraded_response(cached)
+    return _degraded_response(
+        "I can't produce a fresh explanation right now. Let's start with some practice "
+        "questions, and I'll explain the concept in full as soon as I can."
+    )
+
+
+def exercise_degraded_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Templated questions at the difficulty the accuracy strategy picks."""
+    if not circuit_breaker.is_open():
+        return None
+
+    topic = topic_from_request(_user_text(callback_context)) or "this topic"
+    progress = load_progress(callback_context.state)
+    known_topic = topic_canonicalizer.lookup(
+        callback_context.user_id, topic, progress.topics.keys()
+    )
+    difficulty = _difficulty_strategy.choose_difficulty(known_topic or topic, progress)
+
+    lines = []
+    for number, template in enumerate(_EXERCISE_TEMPLATES[difficulty], start=1):
+        lines.append(f"Q{number} ({difficulty}): {template.format(topic=topic)}")
+        lines.append("Hint/clarification: Answer in a few sentences in your own words.")
+        lines.append("")
+    return _degraded_response("\n".join(lines).strip())
+
+
+def feedback_degraded_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Queue the answer for grading once the backend is healthy again."""
+    if not circuit_breaker.is_open():
+        return None
+
+    state = callback_context.state
+    pending: List[Dict[str, Any]] = list(state.get(STATE_KEY_PENDING_GRADING) or [])
+    pending.append({"answer": _user_text(callback_context), "queued_at": time.time()})
+    state[STATE_KEY_PENDING_GRADING] = pending[-MAX_PENDING_GRADING:]
+
+    return _degraded_response(
+        "Thanks, I've saved your answer. Grading is temporarily delayed; I'll give you "
+        "detailed feedback on it with your next answer."
+    )
+
+
+def feedback_pending_grading_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Once healthy, hand queued answers to the feedback agent."""
+    if circuit_breaker.is_open() or _after_tool_call(llm_request):
+        return None
+
+    state = callback_context.state
+    pending = state.get(STATE_KEY_PENDING_GRADING) or []
+    if not pending:
+        return None
+
+    answers = "\n".join(f"- {item.get('answer', '')}" for item in pending)
+    queued = genai_types.Content(
+        role="user",
+        parts=[
+            genai_types.Part(
+                text="These earlier answers were queued while grading was unavailable. Grade "
+                "each of them as well (call 'record_exercise_result' once per answer):\n"
+                + answers
+            )
+        ],
+    )
+    # Ahead of the learner's current message; the system instruction stays static.
+    llm_request.contents.insert(max(len(llm_request.contents) - 1, 0), queued)
+    _handed[callback_context.invocation_id] = [item.get("queued_at") for item in pending]
+    while len(_handed) > _MAX_HANDED:
+        _handed.popitem(last=False)
+    return None
+
+
+def feedback_pending_graded_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> Optional[LlmResponse]:
+    """Clear the handed answers from the queue once the grading reply arrives."""
+    if llm_response.partial or llm_response.error_code or llm_response.content is None:
+        return None
+    parts = llm_response.content.parts or []
+    if any(part.function_call for part in parts) or not any(part.text for part in parts):
+        return None  # record_exercise_result still to run
+    handed = _handed.pop(callback_context.invocation_id, None)
+    if handed is None:
+        return None
+
+    state = callback_context.state
+    # Answers queued meanwhile by another session stay queued.
+    state[STATE_KEY_PENDING_GRADING] = [
+        item
+        for item in state.get(STATE_KEY_PENDING_GRADING) or []
+        if item.get("queued_at") not in handed
+    ]
+    return None
+
+
+def profiling_degraded_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    if not circuit_breaker.is_open():
+        return None
+    return _degraded_response(
+        "I'd like to learn a bit about your background, but I can't do that properly "
+        "right now. Meanwhile, tell me a topic you want to practice."
+    )
+
+
+class ResilientEventSummarizer(LlmEventSummarizer):
+    """Skips context compaction while the backend circuit is open."""
+
+    async def maybe_summarize_events(self, *, events):
+        if circuit_breaker.is_open():
+            return None
+        try:
+            return await super().maybe_summarize_events(events=events)
+        except CircuitOpenError:
+            return None
+
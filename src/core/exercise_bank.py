@@ -0,0 +1,275 @@
+"""
+Persistent bank of pre-generated practice questions.
+
+Questions are stored per (canonical topic, difficulty) in SQLite so they
+survive restarts and can be filled offline (`python -m src.cli.exercise_bank`).
+Lessons draw questions the learner has not seen yet; stock that runs low is
+refilled in the background by ExerciseRefiller.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from google.genai import types as genai_types
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.exercise_bank")
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# (difficulty, question, hint)
+Exercise = Tuple[str, str, str]
+
+_QUESTION_PATTERN = re.compile(
+    r"^\s*\**Q\d+\**\s*\((easy|medium|hard)\)\**\s*:\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_HINT_PATTERN = re.compile(r"^\s*\**Hint(?:/clarification)?\**\s*:\s*(.+?)\s*$", re.IGNORECASE)
+
+
+def parse_exercises(text: str) -> List[Exercise]:
+    """Extract questions written in the exercise agent's Q1/Q2/Q3 format."""
+    exercises: List[Exercise] = []
+    matches = list(_QUESTION_PATTERN.finditer(text))
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        hint = ""
+        for line in text[match.end():end].splitlines():
+            hint_match = _HINT_PATTERN.match(line)
+            if hint_match:
+                hint = hint_match.group(1)
+                break
+        exercises.append((match.group(1).lower(), match.group(2), hint))
+    return exercises
+
+
+def format_exercises(exercises: Iterable[Exercise]) -> str:
+    """Render exercises in the same format the exercise agent uses."""
+    blocks = []
+    for number, (difficulty, question, hint) in enumerate(exercises, start=1):
+        block = f"Q{number} ({difficulty}): {question}"
+        if hint:
+            block += f"\nHint/clarification: {hint}"
+        blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+def exercise_id(topic: str, question: str) -> str:
+    normalized = " ".join(question.lower().split())
+    return hashlib.sha1(f"{topic}|{normalized}".encode("utf-8")).hexdigest()[:16]
+
+
+class ExerciseBank:
+    """
+    SQLite-backed question store keyed by (topic, difficulty).
+
+    `path=None` keeps the bank in memory for the life of the process. A
+    disabled bank misses every draw and stores nothing.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._clock = clock
+        self.enabled = True
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            str(path) if path is not None else ":memory:", check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS exercises ("
+            "id TEXT PRIMARY KEY, topic TEXT NOT NULL, difficulty TEXT NOT NULL, "
+            "question TEXT NOT NULL, hint TEXT NOT NULL, created_at REAL NOT NULL, "
+            "served INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS exercises_by_topic ON exercises (topic, difficulty)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM exercises").fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def add(self, topic: str, exercises: Iterable[Exercise]) -> int:
+        """Store new questions for `topic`; duplicates are ignored. Returns the count added."""
+        if not self.enabled:
+            return 0
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO exercises (id, topic, difficulty, question, hint, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (exercise_id(topic, question), topic, difficulty, question, hint, self._clock())
+                for difficulty, question, hint in exercises
+                if difficulty in DIFFICULTIES and question
+            ],
+        )
+        self._db.commit()
+        return self._db.total_changes - before
+
+    def stock(self, topic: str, difficulty: str) -> int:
+        return self._db.execute(
+            "SELECT COUNT(*) FROM exercises WHERE topic = ? AND difficulty = ?",
+            (topic, difficulty),
+        ).fetchone()[0]
+
+    def draw(
+        self,
+        topic: str,
+        difficulty: str,
+        count: int,
+        exclude: Iterable[str] = (),
+    ) -> Optional[List[Tuple[str, Exercise]]]:
+        """
+        Return `count` (id, exercise) pairs the caller has not seen, least
+        served first, or None (a miss) if the bank cannot fill the request.
+        """
+        if not self.enabled:
+            self.misses += 1
+            return None
+        seen: Set[str] = set(exclude)
+        rows = self._db.execute(
+            "SELECT id, question, hint FROM exercises WHERE topic = ? AND difficulty = ? "
+            "ORDER BY served, created_at",
+            (topic, difficulty),
+        ).fetchall()
+        chosen = [row for row in rows if row[0] not in seen][:count]
+        if len(chosen) < count:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._db.executemany(
+            "UPDATE exercises SET served = served + 1 WHERE id = ?",
+            [(row[0],) for row in chosen],
+        )
+        self._db.commit()
+        return [(row[0], (difficulty, row[1], row[2])) for row in chosen]
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def _generation_prompt(topic: str, difficulty: str, count: int) -> str:
+    return (
+        f"Write {count} distinct {difficulty} practice questions about {topic} for an "
+        "AI tutor's question bank. Each question must stand on its own.\n"
+        "Use exactly this format and nothing else:\n"
+        f"Q1 ({difficulty}): <question text>\n"
+        "Hint/clarification: <one short sentence on what the learner should do, not the "
+        "solution>\n"
+    )
+
+
+async def generate_exercises(
+    model: BaseLlm, topic: str, difficulty: str, count: int
+) -> List[Exercise]:
+    """Ask `model` for `count` new questions at one difficulty."""
+    request = LlmRequest(
+        model=model.model,
+        contents=[
+            genai_types.Content(
+                role="user",
+                parts=[genai_types.Part(text=_generation_prompt(topic, difficulty, count))],
+            )
+        ],
+        config=genai_types.GenerateContentConfig(),
+    )
+    text = ""
+    async for llm_response in model.generate_content_async(request):
+        if llm_response.partial or llm_response.content is None:
+            continue
+        text += "".join(part.text for part in llm_response.content.parts or [] if part.text)
+    # The batch was requested at one difficulty, whatever the model labelled it.
+    return [(difficulty, question, hint) for _, question, hint in parse_exercises(text)]
+
+
+class ExerciseRefiller:
+    """Tops up (topic, difficulty) stock in the background when it runs low."""
+
+    def __init__(
+        self,
+        bank: ExerciseBank,
+        model_factory: Callable[[], BaseLlm],
+        min_stock: int = 6,
+        batch_size: int = 6,
+    ) -> None:
+        self.bank = bank
+        self.min_stock = min_stock
+        self.batch_size = batch_size
+        self._model_factory = model_factory
+        self._model: Optional[BaseLlm] = None
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.refills = 0
+        self.failures = 0
+
+    def maybe_refill(self, topic: str, difficulty: str) -> Optional[asyncio.Task]:
+        """Schedule a refill if stock is below `min_stock` and none is running."""
+        key = (topic, difficulty)
+        if self.min_stock <= 0 or key in self._in_flight:
+            return None
+        if self.bank.stock(topic, difficulty) >= self.min_stock:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        task = loop.create_task(self.refill(topic, difficulty))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    async def refill(self, topic: str, difficulty: str) -> int:
+        if self._model is None:
+            self._model = self._model_factory()
+        try:
+            exercises = await generate_exercises(
+                self._model, topic, difficulty, self.batch_size
+            )
+        except Exception:  # noqa: BLE001 - background work must not crash the lesson
+            self.failures += 1
+            logger.warning("[BANK] refill failed topic=%s difficulty=%s", topic, difficulty)
+            return 0
+        added = self.bank.add(topic, exercises)
+        self.refills += 1
+        logger.info("[BANK] refilled topic=%s difficulty=%s added=%d", topic, difficulty, added)
+        return added
+
+    async def drain(self) -> None:
+        """Wait for every scheduled refill to finish."""
+        while self._in_flight:
+            await asyncio.gather(*list(self._in_flight.values()), return_exceptions=True)
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "refills": self.refills,
+            "failures": self.failures,
+            "in_flight": len(self._in_flight),
+        }
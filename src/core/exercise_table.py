@@ -0,0 +1,222 @@
+"""
+Structured records of the exercises a learner was given, for grading.
+
+Once the exercise generator finishes, its Q1/Q2/Q3 output (generated live,
+served from the bank or written in degraded mode) is recorded in session
+state as one record per question: question id, label, canonical topic,
+difficulty, question text and hint. The table is bounded to the most recent
+`max_records` questions.
+
+When the learner answers "Q2", the feedback agent is given that record as a
+user message just before the answer, and only the current turn's contents
+instead of the whole conversation. The record goes in the contents, not the
+system instruction, so the agent's static prefix stays cacheable. Grading
+then no longer depends on the question still being in the history, which
+compaction may already have summarized away. Answers that name no known
+question are graded from the full history as before.
+"""
+
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from google.genai import types as genai_types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.config import config
+from src.core.exercise_bank import exercise_id, parse_exercises
+from src.core.models import ExerciseRecord
+from src.core.state import (
+    STATE_KEY_PENDING_GRADING,
+    load_exercise_table,
+    load_progress,
+    save_exercise_table,
+)
+from src.core.topic_index import canonical_topic_form, topic_canonicalizer, topic_from_request
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.exercise_table")
+
+_LABEL = re.compile(r"\bQ\s*(\d+)\b", re.IGNORECASE)
+
+
+def referenced_labels(message: str) -> List[str]:
+    """Question labels a learner message refers to, in order ("q 2" -> "Q2")."""
+    labels: List[str] = []
+    for match in _LABEL.finditer(message):
+        label = f"Q{int(match.group(1))}"
+        if label not in labels:
+            labels.append(label)
+    return labels
+
+
+def render_records(records: List[ExerciseRecord]) -> str:
+    lines = [
+        "The learner is answering the question(s) below, recorded when they were set. "
+        "Grade against them and pass their topic and difficulty to 'record_exercise_result':"
+    ]
+    for record in records:
+        details = record.difficulty
+        if record.topic:
+            details = f"topic: {record.topic}, {details}"
+        lines.append(f"{record.label} ({details}): {record.question}")
+        if record.hint:
+            lines.append(f"Hint/clarification: {record.hint}")
+    return "\n".join(lines)
+
+
+class ExerciseContext:
+    """Records lessons' questions and narrows the feedback agent's prompt to them."""
+
+    def __init__(self, max_records: int = 30) -> None:
+        # 0 disables the table; grading then reads the conversation history.
+        self.max_records = max_records
+        self.lessons_recorded = 0
+        self.questions_recorded = 0
+        self.lookups = 0
+        self.resolved = 0
+        self.unresolved = 0
+        self.contents_dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_records > 0
+
+    def record(self, callback_context: CallbackContext) -> List[ExerciseRecord]:
+        text = _final_text(callback_context)
+        exercises = parse_exercises(text) if text else []
+        if not exercises:
+            return []
+
+        state = callback_context.state
+        topic = topic_from_request(_user_text(callback_context))
+        if topic is not None:
+            # The learner's existing key for the topic, if any, so grading
+            # lands on the same progress entry.
+            progress = load_progress(state)
+            topic = topic_canonicalizer.lookup(
+                callback_context.user_id, topic, progress.topics.keys()
+            ) or canonical_topic_form(topic)
+        topic = topic or ""
+        added = [
+            ExerciseRecord(
+                exercise_id=exercise_id(topic, question),
+                label=f"Q{number}",
+                lesson=0,
+                topic=topic,
+                difficulty=difficulty,
+                question=question,
+                hint=hint,
+            )
+            for number, (difficulty, question, hint) in enumerate(exercises, start=1)
+        ]
+        table = load_exercise_table(state)
+        table.add_lesson(added, self.max_records)
+        save_exercise_table(table, state)
+        self.lessons_recorded += 1
+        self.questions_recorded += len(added)
+        return added
+
+    def narrow(self, callback_context: CallbackContext, llm_request: LlmRequest) -> bool:
+        """
+        Inject the referenced questions and drop the earlier conversation.
+        Returns False (leaving the request alone) when an answer names no
+        recorded question.
+        """
+        message = _user_text(callback_context)
+        labels = referenced_labels(message)
+        if not labels:
+            return False
+
+        self.lookups += 1
+        table = load_exercise_table(callback_context.state)
+        records = [table.find(label) for label in labels]
+        if any(record is None for record in records):
+            self.unresolved += 1
+            logger.info("[EXERCISES] unresolved %s in %d records", labels, len(table.records))
+            return False
+        self.resolved += 1
+        context = genai_types.Content(
+            role="user", parts=[genai_types.Part(text=render_records(records))]
+        )
+
+        start = _turn_start(llm_request, message)
+        if start < 0:
+            llm_request.contents.append(context)
+            return True
+        # Queued answers from degraded mode still need the history to be graded.
+        if start > 0 and not callback_context.state.get(STATE_KEY_PENDING_GRADING):
+            self.contents_dropped += start
+            llm_request.contents = llm_request.contents[start:]
+            start = 0
+        llm_request.contents.insert(start, context)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_records": self.max_records,
+            "lessons_recorded": self.lessons_recorded,
+            "questions_recorded": self.questions_recorded,
+            "lookups": self.lookups,
+            "resolved": self.resolved,
+            "unresolved": self.unresolved,
+            "contents_dropped": self.contents_dropped,
+        }
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if content is None:
+        return ""
+    return "\n".join(part.text for part in content.parts or [] if part.text)
+
+
+def _final_text(callback_context: CallbackContext) -> str:
+    """The agent's last text reply in this invocation."""
+    for event in reversed(callback_context.session.events):
+        if event.invocation_id != callback_context.invocation_id:
+            break
+        if event.author != callback_context.agent_name or event.partial or not event.content:
+            continue
+        text = "".join(part.text for part in event.content.parts or [] if part.text)
+        if text:
+            return text
+    return ""
+
+
+def _turn_start(llm_request: LlmRequest, message: str) -> int:
+    """Index of the learner's current message in the request contents (-1 if absent)."""
+    for index in range(len(llm_request.contents) - 1, -1, -1):
+        content = llm_request.contents[index]
+        if content.role != "user":
+            continue
+        if "\n".join(part.text for part in content.parts or [] if part.text) == message:
+            return index
+    return -1
+
+
+exercise_context = ExerciseContext(max_records=config.exercise_table_size)
+
+
+def record_exercises_callback(
+    callback_context: CallbackContext,
+) -> Optional[genai_types.Content]:
+    """After the exercise generator: record the questions it set."""
+    if exercise_context.enabled:
+        exercise_context.record(callback_context)
+    return None
+
+
+def feedback_exercise_context_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Grade from the referenced question's record instead of the full history."""
+    if exercise_context.enabled:
+        exercise_context.narrow(callback_context, llm_request)
+    return None
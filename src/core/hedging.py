@@ -0,0 +1,124 @@
+"""
+Request hedging for latency-sensitive model calls.
+
+If a call has not returned by a chosen percentile of recent latency, a
+duplicate is sent and whichever finishes first wins; the other is cancelled.
+A shared budget caps the extra load hedges add.
+
+The tracker follows the backend's latency, not the hedged one: every call
+records how long its primary took, or, when a hedge won and the primary was
+cancelled, how long the primary had run by then (a lower bound). Recording
+only winners would pull the percentile down to the hedges' latency and hedge
+ever earlier.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_s: float) -> None:
+        self._samples.append(latency_s)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile `q`, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Allows at most `ratio` hedges per request on average.
+
+    Every request earns `ratio` credit (capped at `burst`); a hedge spends one.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._credit = burst
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.denied = 0
+
+    def on_request(self) -> None:
+        self.requests += 1
+        self._credit = min(self.burst, self._credit + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._credit < 1:
+            self.denied += 1
+            return False
+        self._credit -= 1
+        self.hedges += 1
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "denied": self.denied,
+            "extra_request_rate": self.hedges / self.requests if self.requests else 0.0,
+        }
+
+
+async def hedged_call(
+    primary: Callable[[], Awaitable[Any]],
+    hedge: Callable[[], Awaitable[Any]],
+    tracker: LatencyTracker,
+    budget: HedgeBudget,
+    percentile: float = 0.95,
+) -> Any:
+    """
+    Run `primary`; if it is slower than the tracked percentile and the budget
+    allows, also run `hedge` and return whichever result arrives first.
+    """
+    budget.on_request()
+    delay = tracker.percentile(percentile)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    primary_task = asyncio.ensure_future(primary())
+    primary_end: List[float] = []
+    primary_task.add_done_callback(lambda _: primary_end.append(loop.time()))
+    tasks = {primary_task}
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and budget.try_spend():
+                tasks.add(asyncio.ensure_future(hedge()))
+
+        while True:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            winner = next(iter(done))
+            tasks.discard(winner)
+            if winner.exception() is None or not tasks:
+                break
+            # The first finisher failed; fall back to the call still running.
+
+        result = winner.result()
+        if winner is not primary_task:
+            budget.hedge_wins += 1
+        return result
+    finally:
+        for task in tasks:
+            task.cancel()
+        if not primary_end:
+            tracker.record(loop.time() - start)  # still running: censored
+        elif not primary_task.cancelled() and primary_task.exception() is None:
+            tracker.record(primary_end[0] - start)
@@ -1,18 +1,395 @@
 """
 Factory functions for configuring LLM models used by agents.
+
+Every agent gets its model from `build_gemini_model(agent_name)`, which picks
+the agent's model tier and wraps the backend (Gemini, or the offline stub)
+with process-wide call policies.
 """
 
 
 from __future__ import annotations
 
+import logging
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.genai import errors as genai_errors
 from google.genai import types as genai_types
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
 
 from src.config import config
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError, is_backend_failure
+from src.core.hedging import HedgeBudget, LatencyTracker, hedged_call
+from src.core.model_tiers import ModelUsageTracker, TierPolicy, malformed_tool_call
+from src.core.prompt_cache import GeminiCacheBackend, PrefixCache, is_cache_miss
+from src.core.rate_limiter import Priority, RateLimiter
+from src.core.stub_llm import (
+    SimulatedCachedContent,
+    SimulatedConnections,
+    StubLlm,
+    estimate_tokens,
+    request_text,
+)
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.llm")
+
+# Agents not listed here are user-facing and get Priority.INTERACTIVE.
+AGENT_PRIORITIES: Dict[str, Priority] = {
+    "google_search_agent": Priority.SEARCH,
+    "event_summarizer": Priority.BACKGROUND,
+    "exercise_bank_generator": Priority.BACKGROUND,
+}
+
+# Shared by every model instance in the process.
+rate_limiter = RateLimiter(
+    requests_per_minute=config.requests_per_minute,
+    tokens_per_minute=config.tokens_per_minute,
+)
+
+# Interactive agents whose calls may be hedged (when hedging is enabled).
+HEDGED_AGENTS = frozenset(
+    {"root_tutor_agent", "explanation_agent", "exercise_generator_agent"}
+)
+
+# Shared cap on the extra load added by hedged requests.
+hedge_budget = HedgeBudget(ratio=config.hedge_budget_ratio)
+
+# One breaker for the shared model backend.
+circuit_breaker = CircuitBreaker(
+    failure_rate_threshold=config.circuit_failure_rate,
+    open_duration_s=config.circuit_open_seconds,
+)
+
+# Which model each agent runs on.
+tier_policy = TierPolicy(
+    strong_model=config.model_name,
+    fast_model=config.fast_model_name if config.model_tiering else config.model_name,
+    overrides=config.agent_models,
+)
+
+# Calls, latency, tokens and cost per (agent, model).
+model_usage = ModelUsageTracker()
+
+# Server-side cached contents and connection pools of the offline stub model.
+stub_cached_contents = SimulatedCachedContent()
+stub_connections = SimulatedConnections(setup_s=config.stub_connect_ms / 1000.0)
+
+# One Gemini backend per model name, shared by every agent on that model, so
+# they share its client and connection pool (and prewarming opens it once).
+_gemini_backends: Dict[str, Gemini] = {}
+
+# Static instruction + tool prefixes registered as cached content (opt-in).
+prefix_cache: Optional[PrefixCache] = (
+    PrefixCache(
+        backend=stub_cached_contents if config.use_stub_model else GeminiCacheBackend(),
+        ttl_s=config.prompt_cache_ttl_s,
+    )
+    if config.prompt_cache
+    else None
+)
+
+# How long to hold all callers back after the backend returns 429.
+QUOTA_PAUSE_SECONDS = 2.0
+
+# Response tokens assumed before the real usage is known.
+_EXPECTED_RESPONSE_TOKENS = 512
+
+
+def _response_tokens(llm_response: LlmResponse) -> int:
+    parts = llm_response.content.parts if llm_response.content else None
+    return sum(
+        estimate_tokens(part.text or str(part.function_call or ""))
+        for part in parts or []
+    )
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Delegates to `inner` after acquiring capacity from the shared limiter,
+    and records the call's latency and token usage for `agent_name`.
+    """
+
+    inner: BaseLlm
+    priority: Priority = Priority.INTERACTIVE
+    limiter: RateLimiter
+    agent_name: str = ""
+    usage: Optional[ModelUsageTracker] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated = estimate_tokens(request_text(llm_request)) + _EXPECTED_RESPONSE_TOKENS
+        await self.limiter.acquire(self.priority, estimated)
+
+        actual = estimated
+        prompt_tokens = estimated - _EXPECTED_RESPONSE_TOKENS
+        cached_tokens = 0
+        recorded = self.usage is None
+        start = time.perf_counter()
+        first_response_s: Optional[float] = None
+        try:
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=stream
+            ):
+                if first_response_s is None:
+                    first_response_s = time.perf_counter() - start
+                usage = llm_response.usage_metadata
+                if usage is not None and usage.total_token_count:
+                    actual = usage.total_token_count
+                    prompt_tokens = usage.prompt_token_count or prompt_tokens
+                    cached_tokens = usage.cached_content_token_count or 0
+                # Callers may stop iterating after the final response, so it
+                # is recorded before being passed on.
+                if not recorded and not llm_response.partial:
+                    output_tokens = (
+                        usage.candidates_token_count
+                        if usage is not None and usage.candidates_token_count
+                        else _response_tokens(llm_response)
+                    )
+                    self.usage.record_call(
+                        self.agent_name,
+                        self.model,
+                        time.perf_counter() - start,
+                        prompt_tokens,
+                        output_tokens,
+                        cached_tokens=cached_tokens,
+                        first_response_s=first_response_s,
+                    )
+                    recorded = True
+                yield llm_response
+        except genai_errors.ClientError as exc:
+            if exc.code == 429:
+                self.limiter.pause(QUOTA_PAUSE_SECONDS)
+            raise
+        finally:
+            self.limiter.reconcile(estimated, actual)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+class PrefixCachedLlm(BaseLlm):
+    """
+    Sends the request's static prefix (system instruction, tools) as a
+    reference to cached content registered in `cache`, and only the
+    contents in full. Falls back to the full request when the prefix cannot
+    be cached or its cache has gone away.
+    """
+
+    inner: BaseLlm
+    cache: PrefixCache
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        prefix = None
+        if llm_request.config is not None and not llm_request.config.cached_content:
+            prefix = await self.cache.lookup(self.model, llm_request.config)
+        if prefix is None:
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=stream
+            ):
+                yield llm_response
+            return
+
+        # The API rejects instruction/tools alongside cached content; the
+        # original request keeps them for the fallback and for the caller.
+        cached_request = llm_request.model_copy(
+            update={
+                "config": llm_request.config.model_copy(
+                    update={
+                        "cached_content": prefix.name,
+                        "system_instruction": None,
+                        "tools": None,
+                        "tool_config": None,
+                    }
+                ),
+                "contents": list(llm_request.contents),
+            }
+        )
+        started = False
+        try:
+            async for llm_response in self.inner.generate_content_async(
+                cached_request, stream=stream
+            ):
+                started = True
+                yield llm_response
+        except genai_errors.ClientError as exc:
+            if started or not is_cache_miss(exc):
+                raise
+            logger.info("[PROMPT_CACHE] %s is gone, sending the full prompt", prefix.name)
+            self.cache.invalidate(prefix)
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=stream
+            ):
+                yield llm_response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
 
 
-def build_gemini_model() -> Gemini:
-    """Create a Gemini model with sensible retry options."""
+class EscalatingLlm(BaseLlm):
+    """
+    Runs a call on the fast tier (`inner`) and re-issues it on the strong
+    tier (`fallback`) when the fast model returns a tool call the agent
+    cannot execute.
+    """
+
+    inner: BaseLlm
+    fallback: BaseLlm
+    agent_name: str = ""
+    usage: Optional[ModelUsageTracker] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            # Partial responses are already on screen, so streams are not retried.
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=True
+            ):
+                yield llm_response
+            return
+
+        # Backends may mutate the request, so the retry gets its own config.
+        retry_request = llm_request.model_copy(
+            update={
+                "model": self.fallback.model,
+                "config": llm_request.config.model_copy(deep=True),
+                "contents": list(llm_request.contents),
+            }
+        )
+        responses = [
+            llm_response
+            async for llm_response in self.inner.generate_content_async(llm_request)
+        ]
+        problem = next(
+            filter(None, (malformed_tool_call(r, llm_request) for r in responses)), None
+        )
+        if problem is None:
+            for llm_response in responses:
+                yield llm_response
+            return
+
+        logger.warning(
+            "[MODEL_TIER] escalating agent=%s from=%s to=%s: %s",
+            self.agent_name,
+            self.inner.model,
+            self.fallback.model,
+            problem,
+        )
+        if self.usage is not None:
+            self.usage.record_escalation(self.agent_name, self.inner.model)
+        async for llm_response in self.fallback.generate_content_async(retry_request):
+            yield llm_response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+class HedgedLlm(BaseLlm):
+    """
+    Sends a duplicate request when a call outlives the tracked latency
+    percentile, returning whichever copy finishes first.
+    """
+
+    inner: BaseLlm
+    percentile: float = 0.95
+    tracker: LatencyTracker
+    budget: HedgeBudget
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            # Partial responses cannot be taken back, so streams are not hedged.
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=True
+            ):
+                yield llm_response
+            return
+
+        # Backends may mutate the request, so each copy gets its own config.
+        hedge_request = llm_request.model_copy(
+            update={
+                "config": llm_request.config.model_copy(deep=True),
+                "contents": list(llm_request.contents),
+            }
+        )
+
+        async def _collect(request: LlmRequest) -> List[LlmResponse]:
+            return [
+                llm_response
+                async for llm_response in self.inner.generate_content_async(request)
+            ]
+
+        responses = await hedged_call(
+            primary=lambda: _collect(llm_request),
+            hedge=lambda: _collect(hedge_request),
+            tracker=self.tracker,
+            budget=self.budget,
+            percentile=self.percentile,
+        )
+        for llm_response in responses:
+            yield llm_response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+class CircuitBreakerLlm(BaseLlm):
+    """Fails fast with CircuitOpenError while the backend circuit is open."""
+
+    inner: BaseLlm
+    breaker: CircuitBreaker
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Model backend circuit is {self.breaker.state.value}.")
+
+        # Callers may stop iterating after the final response, so success is
+        # recorded as soon as a complete response arrives.
+        recorded = False
+        try:
+            async for llm_response in self.inner.generate_content_async(
+                llm_request, stream=stream
+            ):
+                if not recorded and not llm_response.partial:
+                    self.breaker.record_success()
+                    recorded = True
+                yield llm_response
+        except BaseException as exc:
+            if not recorded:
+                if is_backend_failure(exc):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release_probe()
+            raise
+        if not recorded:
+            self.breaker.release_probe()
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+def _build_backend(agent_name: str, model_name: str) -> BaseLlm:
+    if config.use_stub_model:
+        return StubLlm(
+            model=model_name,
+            agent_name=agent_name,
+            latency_s=config.stub_latency_ms / 1000.0,
+            cached_contents=stub_cached_contents,
+            connections=stub_connections,
+        )
+    if model_name in _gemini_backends:
+        return _gemini_backends[model_name]
+
     retry_config = genai_types.HttpRetryOptions(
         attempts=5,
         exp_base=2,
@@ -24,8 +401,63 @@ def build_gemini_model() -> Gemini:
         top_p=0.9,
     )
 
-    return Gemini(
-        model=config.model_name,
+    backend = _gemini_backends[model_name] = Gemini(
+        model=model_name,
         retry_options=retry_config,
         generation_config=generation_config,
     )
+    return backend
+
+
+def _rate_limited(agent_name: str, model_name: str) -> RateLimitedLlm:
+    backend = _build_backend(agent_name, model_name)
+    if prefix_cache is not None:
+        backend = PrefixCachedLlm(model=model_name, inner=backend, cache=prefix_cache)
+    return RateLimitedLlm(
+        model=backend.model,
+        inner=backend,
+        priority=AGENT_PRIORITIES.get(agent_name, Priority.INTERACTIVE),
+        limiter=rate_limiter,
+        agent_name=agent_name,
+        usage=model_usage,
+    )
+
+
+def build_gemini_model(agent_name: str = "", model_name: Optional[str] = None) -> BaseLlm:
+    """
+    Create the model for one agent.
+
+    The model is `model_name` if given, otherwise the agent's tier from
+    `tier_policy` (GEMINI_MODEL_TIERING, GEMINI_AGENT_MODELS). The backend is
+    Gemini with sensible retry options (or the offline stub when
+    TUTOR_USE_STUB_MODEL is set), behind the shared rate limiter. With
+    GEMINI_PROMPT_CACHE the static instruction + tool prefix is sent as
+    process-wide cached content. Fast-tier agents escalate malformed tool
+    calls to the strong tier. Interactive agents are hedged when
+    GEMINI_HEDGE_REQUESTS is enabled; each hedge copy goes through the rate
+    limiter on its own. The circuit breaker sits outermost so an unhealthy
+    backend fails fast without queueing.
+    """
+    model_name = model_name or tier_policy.model_for(agent_name)
+    model: BaseLlm = _rate_limited(agent_name, model_name)
+
+    escalation_model = tier_policy.escalation_model(agent_name)
+    if escalation_model and escalation_model != model_name:
+        model = EscalatingLlm(
+            model=model_name,
+            inner=model,
+            fallback=_rate_limited(agent_name, escalation_model),
+            agent_name=agent_name,
+            usage=model_usage,
+        )
+
+    if config.hedge_requests and agent_name in HEDGED_AGENTS:
+        model = HedgedLlm(
+            model=model_name,
+            inner=model,
+            percentile=config.hedge_percentile,
+            tracker=LatencyTracker(),
+            budget=hedge_budget,
+        )
+
+    return CircuitBreakerLlm(model=model_name, inner=model, breaker=circuit_breaker)
@@ -0,0 +1,194 @@
+"""
+Per-agent model tiers and per-agent usage accounting.
+
+Routing, event summarization and short answer grading run on a fast, cheap
+model; explanations and exercise writing stay on the stronger one. A fast-tier
+call whose tool call does not match the agent's declared tools is re-issued
+on the strong tier (see `EscalatingLlm` in `src/core/llm.py`).
+
+Every model call is recorded per (agent, model) with latency, tokens and an
+estimated cost, so tier configurations can be compared.
+"""
+
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.core.hedging import LatencyTracker
+
+
+# Agents whose calls are short and structured enough for the fast tier.
+FAST_TIER_AGENTS: FrozenSet[str] = frozenset(
+    {"root_tutor_agent", "event_summarizer", "feedback_agent"}
+)
+
+# Approximate list prices in USD per million (input, output) tokens, matched
+# by the longest model-name prefix. Unknown models are costed at zero.
+MODEL_PRICES_PER_MTOK: Dict[str, Tuple[float, float]] = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+# Cached prompt tokens are billed at this fraction of the input price
+# (cache storage is billed separately and not included).
+CACHED_INPUT_PRICE_RATIO = 0.25
+
+
+def call_cost(
+    model: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0
+) -> float:
+    """Estimated USD cost of one call; `prompt_tokens` includes `cached_tokens`."""
+    matches = [name for name in MODEL_PRICES_PER_MTOK if model.startswith(name)]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICES_PER_MTOK[max(matches, key=len)]
+    billed_prompt = prompt_tokens - cached_tokens + cached_tokens * CACHED_INPUT_PRICE_RATIO
+    return (billed_prompt * input_price + output_tokens * output_price) / 1_000_000
+
+
+@dataclass(frozen=True)
+class TierPolicy:
+    """Which model each agent uses, and where a failing fast call escalates."""
+
+    strong_model: str
+    fast_model: str
+    fast_agents: FrozenSet[str] = FAST_TIER_AGENTS
+    # Explicit per-agent models; these win over the tier lists.
+    overrides: Dict[str, str] = field(default_factory=dict)
+    escalate: bool = True
+
+    def model_for(self, agent_name: str) -> str:
+        if agent_name in self.overrides:
+            return self.overrides[agent_name]
+        return self.fast_model if agent_name in self.fast_agents else self.strong_model
+
+    def escalation_model(self, agent_name: str) -> Optional[str]:
+        """The strong model to retry on, or None if the agent already uses it."""
+        if not self.escalate or self.model_for(agent_name) == self.strong_model:
+            return None
+        return self.strong_model
+
+
+def malformed_tool_call(llm_response: LlmResponse, llm_request: LlmRequest) -> Optional[str]:
+    """
+    Why a response's tool calls cannot be executed, or None if they can.
+
+    Checks the backend's own MALFORMED_FUNCTION_CALL finish reason, calls to
+    tools the agent does not have, missing required arguments and values
+    outside a declared enum (e.g. an unknown transfer target).
+    """
+    if llm_response.finish_reason == genai_types.FinishReason.MALFORMED_FUNCTION_CALL:
+        return "malformed_function_call"
+    parts = llm_response.content.parts if llm_response.content else None
+    for part in parts or []:
+        call = part.function_call
+        if call is None:
+            continue
+        tool = llm_request.tools_dict.get(call.name or "")
+        if tool is None:
+            return f"unknown tool {call.name!r}"
+        declaration = tool._get_declaration()
+        if declaration is None:
+            continue
+        schema: Dict[str, Any] = declaration.parameters_json_schema or {}
+        if not schema and declaration.parameters is not None:
+            schema = declaration.parameters.model_dump(mode="json", exclude_none=True)
+        args = call.args or {}
+        for name in schema.get("required") or []:
+            if name not in args:
+                return f"{call.name} missing argument {name!r}"
+        for name, value in args.items():
+            allowed = ((schema.get("properties") or {}).get(name) or {}).get("enum")
+            if allowed and value not in allowed:
+                return f"{call.name} argument {name}={value!r} not in {allowed}"
+    return None
+
+
+class ModelUsageTracker:
+    """Per (agent, model) call counts, latency, tokens, cost and escalations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._usage: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._latency: Dict[Tuple[str, str], LatencyTracker] = {}
+
+    def _entry(self, agent_name: str, model: str) -> Dict[str, float]:
+        key = (agent_name or "unknown", model)
+        if key not in self._usage:
+            self._usage[key] = {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "latency_s": 0.0,
+                "first_response_s": 0.0,
+                "escalations": 0,
+            }
+            self._latency[key] = LatencyTracker(window=1000, min_samples=1)
+        return self._usage[key]
+
+    def record_call(
+        self,
+        agent_name: str,
+        model: str,
+        latency_s: float,
+        prompt_tokens: int,
+        output_tokens: int,
+        cached_tokens: int = 0,
+        first_response_s: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            entry = self._entry(agent_name, model)
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["cached_tokens"] += cached_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cost_usd"] += call_cost(model, prompt_tokens, output_tokens, cached_tokens)
+            entry["latency_s"] += latency_s
+            entry["first_response_s"] += (
+                latency_s if first_response_s is None else first_response_s
+            )
+            self._latency[(agent_name or "unknown", model)].record(latency_s)
+
+    def record_escalation(self, agent_name: str, model: str) -> None:
+        with self._lock:
+            self._entry(agent_name, model)["escalations"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._usage.clear()
+            self._latency.clear()
+
+    def metrics(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        {agent: {model: usage}} with mean/p95 latency and mean time to the
+        first response (TTFT when streaming) in milliseconds.
+        """
+        with self._lock:
+            report: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (agent_name, model), entry in sorted(self._usage.items()):
+                calls = entry["calls"]
+                p95 = self._latency[(agent_name, model)].percentile(0.95)
+                report.setdefault(agent_name, {})[model] = {
+                    "calls": calls,
+                    "prompt_tokens": entry["prompt_tokens"],
+                    "cached_tokens": entry["cached_tokens"],
+                    "output_tokens": entry["output_tokens"],
+                    "cost_usd": round(entry["cost_usd"], 6),
+                    "latency_mean_ms": round(entry["latency_s"] / calls * 1000, 1) if calls else 0.0,
+                    "latency_p95_ms": round((p95 or 0.0) * 1000, 1),
+                    "ttft_mean_ms": (
+                        round(entry["first_response_s"] / calls * 1000, 1) if calls else 0.0
+                    ),
+                    "escalations": entry["escalations"],
+                }
+            return report
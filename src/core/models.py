@@ -3,13 +3,14 @@ Simple domain models for the AI Tutor:
 - StudentProfile: stable learner info
 - TopicStats: per-topic statistics
 - StudentProgress: overall progression and mastery tracking
+- ExerciseRecord / ExerciseTable: the questions set in a session, for grading
 """
 
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -69,3 +70,38 @@ class StudentProgress:
             stats.correct += 1
 
         self.difficulty_history.append(difficulty)
+
+
+@dataclass
+class ExerciseRecord:
+    """One practice question as it was shown to the learner."""
+
+    exercise_id: str
+    label: str  # "Q1", "Q2", ... within its lesson
+    lesson: int
+    topic: str
+    difficulty: str
+    question: str
+    hint: str = ""
+
+
+@dataclass
+class ExerciseTable:
+    """The most recent questions set in a session, oldest first."""
+
+    records: List[ExerciseRecord] = field(default_factory=list)
+    lessons: int = 0
+
+    def add_lesson(self, records: List[ExerciseRecord], max_records: int) -> None:
+        """Append one lesson's questions, keeping at most `max_records` overall."""
+        self.lessons += 1
+        for record in records:
+            record.lesson = self.lessons
+        self.records = (self.records + records)[-max_records:]
+
+    def find(self, label: str) -> Optional[ExerciseRecord]:
+        """The latest question with this label, i.e. from the most recent lesson."""
+        for record in reversed(self.records):
+            if record.label == label:
+                return record
+        return None
@@ -6,12 +6,32 @@ Callbacks and logging helpers for keeping track of agent behavior.
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from google.genai import types as genai_types
 from google.adk.agents.callback_context import CallbackContext
 
+from src.core.banked_exercises import exercise_bank, exercise_refiller
+from src.core.cached_responses import (
+    explanation_cache,
+    explanation_flights,
+    search_cache,
+    search_flights,
+)
+from src.core.exercise_table import exercise_context
+from src.core.llm import (
+    circuit_breaker,
+    hedge_budget,
+    model_usage,
+    prefix_cache,
+    rate_limiter,
+)
+from src.core.prewarm import readiness
+from src.core.search_fanout import search_fanout
+from src.core.session_metrics import allocation_profiler, session_monitor
 from src.core.state import STATE_KEY_PROGRESS
+from src.core.usage_budget import usage_meter
+from src.core.user_state import user_state
 
 
 logger = logging.getLogger("agentic_ai_tutor_with_googleadk")
@@ -73,3 +93,78 @@ def tutor_after_agent_callback(
 
     # Do not modify content; this callback is for side-effect logging only.
     return None
+
+
+def model_call_metrics() -> Dict[str, Any]:
+    """
+    Snapshot of process-wide model-call metrics: queue wait, hedging,
+    circuit-breaker state, cache and exercise-bank hit rates, exercise-table
+    lookups for grading, search fan-out, prompt-prefix caching, and calls,
+    latency and cost per agent and model tier.
+    """
+    return {
+        "rate_limiter": rate_limiter.metrics(),
+        "hedging": hedge_budget.metrics(),
+        "circuit_breaker": circuit_breaker.metrics(),
+        "explanation_cache": explanation_cache.metrics()
+        | {"shared_in_flight": explanation_flights.shared},
+        "search_cache": search_cache.metrics() | {"shared_in_flight": search_flights.shared},
+        "search_fanout": search_fanout.metrics(),
+        "exercise_bank": exercise_bank.metrics() | exercise_refiller.metrics(),
+        "exercise_table": exercise_context.metrics(),
+        "model_usage": model_usage.metrics(),
+        "prompt_cache": prefix_cache.metrics() if prefix_cache is not None else {},
+    }
+
+
+def health_check() -> Dict[str, Any]:
+    """
+    Readiness for load balancers: "ready" once startup prewarming finished,
+    with per-step warm-up times, the models warmed and the circuit state.
+    """
+    return readiness.health() | {"circuit_breaker": circuit_breaker.state.value}
+
+
+def session_size_metrics(top_sites: int = 10) -> Dict[str, Any]:
+    """
+    Snapshot of per-session sizes (events, content and state bytes, heap held,
+    growth per turn) and, while allocation profiling is on, the top
+    allocation sites per agent.
+    """
+    return {
+        "sessions": session_monitor.metrics(),
+        "allocation_profiling": allocation_profiler.active,
+        "allocations": allocation_profiler.report(top_sites),
+    }
+
+
+def usage_metrics(top_users: int = 10) -> Dict[str, Any]:
+    """
+    Snapshot of per-learner model usage: learners over their soft or hard
+    budget, cheaper-mode calls and refusals, the heaviest learners' rolling
+    totals and tokens and cost per agent.
+    """
+    return usage_meter.metrics(top_users)
+
+
+def tool_state_metrics() -> Dict[str, Any]:
+    """
+    Snapshot of learner-state updates from the async tools: lock contention
+    and wait, stale session copies refreshed and stale writes upgraded.
+    """
+    return user_state.metrics()
+
+
+def learner_usage(user_id: str) -> Dict[str, Any]:
+    """One learner's rolling totals, budget level and per-agent/session usage."""
+    return usage_meter.user_usage(user_id)
+
+
+def start_allocation_profiling(frames: int = 1) -> None:
+    """Start attributing tracemalloc allocation growth to agents."""
+    allocation_profiler.start(frames)
+
+
+def stop_allocation_profiling() -> None:
+    """Stop tracemalloc profiling; the collected report is kept."""
+    allocation_profiler.stop()
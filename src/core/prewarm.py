@@ -0,0 +1,260 @@
+"""
+Startup prewarming and readiness.
+
+The first learner turn after a start used to pay for everything built on
+first use: ADK's lazily imported run path, tool declarations (including the
+AgentTool around the search agent), the event summarizer, model clients and
+connection setup. `prewarm(app, runner)` does that work before traffic is
+accepted:
+
+  - agents:  resolve every agent's tools and build their declarations, and
+             the summarizer's prompt formatting
+  - runner:  one throwaway turn through the runner, answered locally by
+             `PrewarmPlugin` (no model calls), then deleted
+  - models:  create the client of each distinct model configuration and,
+             with `ping`, send it one tiny no-op request so its connection
+             pool is open
+
+Servers call `prepare(app, runner)` before accepting traffic (TUTOR_PREWARM,
+TUTOR_PREWARM_PING). It also rebuilds `review_index` from the learners'
+stored review schedules, prewarming or not, so bulk review queries see
+learners who have not had a turn since the restart. `readiness` records the
+outcome; `readiness.health()` is the health check. A failed step is reported
+but does not block serving: the tutor is then as slow on its first turn as
+without prewarming, not unavailable.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.agents import LlmAgent
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.apps.app import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions.state import State
+from google.adk.tools.agent_tool import AgentTool
+
+from src.config import config
+from src.core.review_scheduler import ReviewSchedule, review_index
+from src.core.state import STATE_KEY_REVIEW_SCHEDULE
+from src.core.stub_llm import StubLlm
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.prewarm")
+
+PREWARM_USER_ID = "__prewarm__"
+
+
+class PrewarmPlugin(BasePlugin):
+    """Answers the warm-up turn's model calls locally; inert for learners."""
+
+    def __init__(self) -> None:
+        super().__init__(name="prewarm")
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        if callback_context.user_id != PREWARM_USER_ID:
+            return None
+        return LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text="ok")])
+        )
+
+
+class Readiness:
+    """Startup state for the health check: starting -> warming -> ready."""
+
+    def __init__(self) -> None:
+        self.status = "starting"
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self.steps_ms: Dict[str, float] = {}
+        self.models: List[str] = []
+        self.errors: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def mark_ready(self) -> None:
+        """Accept traffic (also used when prewarming is switched off)."""
+        self.status = "ready"
+        self.ready_at = time.time()
+
+    def health(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "uptime_s": round(now - self.started_at, 1),
+            "startup_s": round(self.ready_at - self.started_at, 2) if self.ready_at else None,
+            "prewarm_ms": dict(self.steps_ms),
+            "models": list(self.models),
+            "errors": list(self.errors),
+        }
+
+
+def _walk_agents(agent: BaseAgent) -> Iterator[BaseAgent]:
+    yield agent
+    for tool in getattr(agent, "tools", None) or []:
+        if isinstance(tool, AgentTool):
+            yield from _walk_agents(tool.agent)
+    for sub_agent in agent.sub_agents:
+        yield from _walk_agents(sub_agent)
+
+
+def _backends(model: Any) -> Iterator[BaseLlm]:
+    """The backends under a model's call policies (hedging, tiers, ...)."""
+    inner = [getattr(model, attr, None) for attr in ("inner", "fallback")]
+    if not any(isinstance(child, BaseLlm) for child in inner):
+        if isinstance(model, BaseLlm):
+            yield model
+        return
+    for child in inner:
+        if isinstance(child, BaseLlm):
+            yield from _backends(child)
+
+
+def distinct_backends(app: App) -> Dict[Tuple[str, str], BaseLlm]:
+    """One backend per distinct (kind, model) configuration in the app."""
+    models = [getattr(agent, "model", None) for agent in _walk_agents(app.root_agent)]
+    compaction = app.events_compaction_config
+    if compaction is not None and compaction.summarizer is not None:
+        models.append(getattr(compaction.summarizer, "_llm", None))
+    distinct: Dict[Tuple[str, str], BaseLlm] = {}
+    for model in models:
+        for backend in _backends(model):
+            distinct.setdefault((type(backend).__name__, backend.model), backend)
+    return distinct
+
+
+async def _warm_agents(app: App) -> None:
+    for agent in _walk_agents(app.root_agent):
+        if not isinstance(agent, LlmAgent):
+            continue
+        for tool in await agent.canonical_tools():
+            tool._get_declaration()
+    compaction = app.events_compaction_config
+    summarizer = compaction.summarizer if compaction is not None else None
+    if hasattr(summarizer, "_format_events_for_prompt"):
+        summarizer._format_events_for_prompt([])
+
+
+async def _warm_runner(runner: Any) -> None:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
+        user_id=PREWARM_USER_ID,
+        session_id=f"prewarm-{uuid.uuid4().hex[:8]}",
+    )
+    try:
+        async for _ in runner.run_async(
+            user_id=PREWARM_USER_ID,
+            session_id=session.id,
+            new_message=genai_types.Content(role="user", parts=[genai_types.Part(text="hi")]),
+        ):
+            pass
+    finally:
+        await runner.session_service.delete_session(
+            app_name=runner.app_name, user_id=PREWARM_USER_ID, session_id=session.id
+        )
+
+
+async def _warm_backend(backend: BaseLlm, ping: bool) -> None:
+    if isinstance(backend, Gemini):
+        client = backend.api_client  # built per event loop, so build it on this one
+        if ping:
+            # A metadata GET: opens the pooled connection without generating tokens.
+            await client.aio.models.get(model=backend.model)
+    elif isinstance(backend, StubLlm) and ping and backend.connections is not None:
+        await backend.connections.acquire(backend.model)
+
+
+def _record_error(step: str, exc: BaseException) -> None:
+    logger.warning("Prewarm step %s failed: %s", step, exc)
+    readiness.errors.append(f"{step}: {type(exc).__name__}: {exc}")
+
+
+async def prewarm(app: App, runner: Any = None, ping: bool = False) -> Dict[str, Any]:
+    """Warm everything the first turn would otherwise build; returns the health report."""
+    readiness.status = "warming"
+    steps = [("agents", lambda: _warm_agents(app))]
+    if runner is not None:
+        steps.append(("runner", lambda: _warm_runner(runner)))
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as exc:  # noqa: BLE001 - reported, serving goes ahead
+            _record_error(name, exc)
+        readiness.steps_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    # Distinct models are independent; warm them concurrently.
+    backends = distinct_backends(app)
+    readiness.models = [f"{kind}:{model}" for kind, model in backends]
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(_warm_backend(backend, ping) for backend in backends.values()),
+        return_exceptions=True,
+    )
+    for (_, model), outcome in zip(backends, outcomes):
+        if isinstance(outcome, Exception):
+            _record_error(f"model {model}", outcome)
+    readiness.steps_ms["models"] = round((time.perf_counter() - start) * 1000, 1)
+
+    readiness.mark_ready()
+    logger.info(
+        "Prewarmed in %.0fms (%d models, %d errors)",
+        sum(readiness.steps_ms.values()),
+        len(backends),
+        len(readiness.errors),
+    )
+    return readiness.health()
+
+
+readiness = Readiness()
+
+
+def restore_review_index(runner: Any) -> int:
+    """
+    Rebuild `review_index` from every stored learner's schedule; returns the
+    items indexed. In-memory sessions start empty, so there is nothing to load.
+    """
+    user_states = getattr(runner.session_service, "iter_user_states", None)
+    if user_states is None:
+        return 0
+    key = STATE_KEY_REVIEW_SCHEDULE[len(State.USER_PREFIX):]
+    review_index.rebuild(
+        (user_id, ReviewSchedule.from_state(state.get(key)))
+        for user_id, state in user_states(runner.app_name)
+    )
+    return len(review_index)
+
+
+async def prepare(app: App, runner: Any) -> Dict[str, Any]:
+    """
+    Restore the review index, prewarm as configured, then report ready; call
+    before accepting traffic.
+    """
+    start = time.perf_counter()
+    try:
+        restored = restore_review_index(runner)
+        logger.info("Review index restored: %d items", restored)
+    except Exception as exc:  # noqa: BLE001 - reported, serving goes ahead
+        _record_error("review_index", exc)
+    readiness.steps_ms["review_index"] = round((time.perf_counter() - start) * 1000, 1)
+    if config.prewarm:
+        return await prewarm(app, runner, ping=config.prewarm_ping)
+    readiness.mark_ready()
+    return readiness.health()
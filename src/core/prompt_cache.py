@@ -0,0 +1,265 @@
+"""
+Process-wide cache of static prompt prefixes.
+
+An agent's system instruction (identity, static instruction, transfer rules)
+and its tool declarations are the same on every call; only the contents
+change. The first call registers that prefix once per process as cached
+content with the backend. Later calls reference it by name and send only the
+contents, so the prefix is billed at the cached-token rate and is not
+re-processed before the first token.
+
+Caches are created with a TTL and refreshed when a call finds one close to
+expiry, so prefixes in use never lapse while idle ones expire on their own.
+Backends enforce a minimum cacheable size; smaller prefixes are sent as
+before.
+"""
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+from src.core.response_cache import SingleFlight
+from src.core.stub_llm import estimate_tokens, prefix_text
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.prompt_cache")
+
+# Smallest prefix the Gemini API will cache, matched by model-name prefix.
+MIN_CACHE_TOKENS: Dict[str, int] = {
+    "gemini-2.5-": 2048,
+    "gemini-3": 4096,
+}
+
+
+def min_cache_tokens(model: str) -> int:
+    model = model.rsplit("/", 1)[-1]
+    for prefix, tokens in MIN_CACHE_TOKENS.items():
+        if model.startswith(prefix):
+            return tokens
+    return 0
+
+
+def prefix_fingerprint(model: str, config: genai_types.GenerateContentConfig) -> str:
+    """Stable hash of everything that goes into the cached prefix."""
+    instruction = config.system_instruction
+    data = {
+        "model": model,
+        "system_instruction": (
+            instruction
+            if isinstance(instruction, str) or instruction is None
+            else genai_types.Content.model_validate(instruction).model_dump(
+                mode="json", exclude_none=True
+            )
+        ),
+        "tools": [
+            tool.model_dump(mode="json", exclude_none=True)
+            for tool in config.tools or []
+            if isinstance(tool, genai_types.Tool)
+        ],
+        "tool_config": (
+            config.tool_config.model_dump(mode="json", exclude_none=True)
+            if config.tool_config
+            else None
+        ),
+    }
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def is_cache_miss(exc: BaseException) -> bool:
+    """True if the backend rejected a request because its cache is gone."""
+    return (
+        isinstance(exc, genai_errors.ClientError)
+        and exc.code in (403, 404)
+        and "cachedcontent" in str(exc).lower()
+    )
+
+
+class GeminiCacheBackend:
+    """Registers prefixes through the Gemini cached-content API."""
+
+    def __init__(self) -> None:
+        self._client: Any = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    async def create(
+        self, model: str, config: genai_types.GenerateContentConfig, ttl_s: float
+    ) -> Tuple[str, int, float]:
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=genai_types.CreateCachedContentConfig(
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                tool_config=config.tool_config,
+                ttl=f"{int(ttl_s)}s",
+                display_name=f"tutor-prefix-{prefix_fingerprint(model, config)}",
+            ),
+        )
+        tokens = cached.usage_metadata.total_token_count if cached.usage_metadata else 0
+        return cached.name, tokens or 0, self._expire_time(cached, ttl_s)
+
+    async def refresh(self, name: str, ttl_s: float) -> float:
+        cached = await self.client.aio.caches.update(
+            name=name, config=genai_types.UpdateCachedContentConfig(ttl=f"{int(ttl_s)}s")
+        )
+        return self._expire_time(cached, ttl_s)
+
+    async def delete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+    @staticmethod
+    def _expire_time(cached: genai_types.CachedContent, ttl_s: float) -> float:
+        return cached.expire_time.timestamp() if cached.expire_time else time.time() + ttl_s
+
+
+@dataclass
+class CachedPrefix:
+    name: str
+    model: str
+    fingerprint: str
+    tokens: int
+    expire_time: float
+    hits: int = 0
+
+
+class PrefixCache:
+    """
+    Registry of cached prefixes, one per (model, instruction, tools).
+
+    `backend` is any object with async `create(model, config, ttl_s)`,
+    `refresh(name, ttl_s)` and `delete(name)`: GeminiCacheBackend, or the
+    stub's SimulatedCachedContent. `min_tokens` overrides the per-model
+    minimum cacheable size.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        ttl_s: float = 3600.0,
+        refresh_margin_s: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self.refresh_margin_s = ttl_s / 5 if refresh_margin_s is None else refresh_margin_s
+        self.min_tokens = min_tokens
+        self._clock = clock
+        self._prefixes: Dict[str, CachedPrefix] = {}
+        # Prefixes the backend will not cache (too small or rejected).
+        self._uncacheable: Set[str] = set()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.created = 0
+        self.refreshed = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.uncacheable = 0
+
+    async def lookup(
+        self, model: str, config: genai_types.GenerateContentConfig
+    ) -> Optional[CachedPrefix]:
+        """The live cache for this request's prefix, registering it if needed."""
+        fingerprint = prefix_fingerprint(model, config)
+        if fingerprint in self._uncacheable:
+            return None
+
+        prefix = self._prefixes.get(fingerprint)
+        now = self._clock()
+        if prefix is not None and prefix.expire_time <= now:
+            del self._prefixes[fingerprint]
+            self.expired += 1
+            prefix = None
+
+        if prefix is None:
+            prefix = await self._flights.do(
+                fingerprint, lambda: self._register(fingerprint, model, config)
+            )
+        elif prefix.expire_time - now < self.refresh_margin_s:
+            prefix = await self._flights.do(fingerprint, lambda: self._refresh(prefix))
+
+        if prefix is not None:
+            prefix.hits += 1
+            self.hits += 1
+        return prefix
+
+    async def _register(
+        self, fingerprint: str, model: str, config: genai_types.GenerateContentConfig
+    ) -> Optional[CachedPrefix]:
+        if fingerprint in self._prefixes:
+            return self._prefixes[fingerprint]
+
+        floor = min_cache_tokens(model) if self.min_tokens is None else self.min_tokens
+        if estimate_tokens(prefix_text(config)) < floor:
+            self._mark_uncacheable(fingerprint, f"prefix below {floor} tokens")
+            return None
+        try:
+            name, tokens, expire_time = await self.backend.create(model, config, self.ttl_s)
+        except Exception as exc:  # noqa: BLE001 - caching is best effort
+            if isinstance(exc, genai_errors.ClientError) and exc.code == 400:
+                self._mark_uncacheable(fingerprint, str(exc))
+            else:
+                logger.warning("[PROMPT_CACHE] registering %s failed: %s", fingerprint, exc)
+            return None
+
+        prefix = CachedPrefix(
+            name=name, model=model, fingerprint=fingerprint, tokens=tokens, expire_time=expire_time
+        )
+        self._prefixes[fingerprint] = prefix
+        self.created += 1
+        logger.info("[PROMPT_CACHE] registered %s model=%s tokens=%d", name, model, tokens)
+        return prefix
+
+    async def _refresh(self, prefix: CachedPrefix) -> Optional[CachedPrefix]:
+        if prefix.expire_time - self._clock() >= self.refresh_margin_s:
+            return prefix
+        try:
+            prefix.expire_time = await self.backend.refresh(prefix.name, self.ttl_s)
+        except Exception as exc:  # noqa: BLE001 - caching is best effort
+            logger.warning("[PROMPT_CACHE] refresh of %s failed: %s", prefix.name, exc)
+            self.invalidate(prefix)
+            return None
+        self.refreshed += 1
+        return prefix
+
+    def _mark_uncacheable(self, fingerprint: str, reason: str) -> None:
+        self._uncacheable.add(fingerprint)
+        self.uncacheable += 1
+        logger.info("[PROMPT_CACHE] prefix %s not cached: %s", fingerprint, reason)
+
+    def invalidate(self, prefix: CachedPrefix) -> None:
+        """Forget a cache the backend no longer has; the next call re-registers it."""
+        if self._prefixes.get(prefix.fingerprint) is prefix:
+            del self._prefixes[prefix.fingerprint]
+            self.invalidated += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "prefixes": len(self._prefixes),
+            "cached_tokens": sum(prefix.tokens for prefix in self._prefixes.values()),
+            "largest_prefix_tokens": max(
+                (prefix.tokens for prefix in self._prefixes.values()), default=0
+            ),
+            "hits": self.hits,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "expired": self.expired,
+            "invalidated": self.invalidated,
+            "uncacheable": self.uncacheable,
+        }
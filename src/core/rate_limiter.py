@@ -0,0 +1,226 @@
+"""
+Process-wide rate limiting for model calls.
+
+All model instances share one RateLimiter with a requests/min and a
+tokens/min bucket. Callers wait in a priority queue, so interactive agents are
+served before the search AgentTool, and both before background summarization.
+A 429 from the backend pauses the whole queue instead of letting every session
+retry on its own.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.rate_limiter")
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+
+    INTERACTIVE = 0
+    SEARCH = 1
+    BACKGROUND = 2
+
+
+class TokenBucket:
+    """Classic token bucket; `rate_per_s` <= 0 means unlimited."""
+
+    def __init__(
+        self,
+        capacity: float,
+        rate_per_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.rate_per_s = rate_per_s
+        self._clock = clock
+        self._available = capacity
+        self._last = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_per_s <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._available = min(
+            self.capacity, self._available + (now - self._last) * self.rate_per_s
+        )
+        self._last = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        missing = amount - self._available
+        return 0.0 if missing <= 0 else missing / self.rate_per_s
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._available -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        if not self.unlimited:
+            self._refill()
+            self._available = min(self.capacity, self._available + delta)
+
+
+@dataclass
+class QueueWaitStats:
+    """Queue wait metrics for one priority class."""
+
+    requests: int = 0
+    queued: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+    @property
+    def mean_wait_s(self) -> float:
+        return self.total_wait_s / self.requests if self.requests else 0.0
+
+
+class RateLimiter:
+    """
+    Async requests/min + tokens/min limiter with strict priority classes.
+
+    Within a class, callers are served FIFO. A lower class only gets capacity
+    when no higher-priority caller is waiting.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self.requests = TokenBucket(
+            capacity=max(1.0, requests_per_minute / 60.0),
+            rate_per_s=requests_per_minute / 60.0,
+            clock=clock,
+        )
+        # One minute of token budget as burst, so large prompts can still fit.
+        self.tokens = TokenBucket(
+            capacity=max(1.0, float(tokens_per_minute)),
+            rate_per_s=tokens_per_minute / 60.0,
+            clock=clock,
+        )
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, float, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats: Dict[Priority, QueueWaitStats] = {p: QueueWaitStats() for p in Priority}
+        self.throttled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return not (self.requests.unlimited and self.tokens.unlimited)
+
+    def _wait_time(self, tokens: float) -> float:
+        paused = max(0.0, self._paused_until - self._clock())
+        return max(paused, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def _record(self, priority: Priority, waited: float, queued: bool) -> None:
+        stats = self.stats[priority]
+        stats.requests += 1
+        stats.total_wait_s += waited
+        stats.max_wait_s = max(stats.max_wait_s, waited)
+        if queued:
+            stats.queued += 1
+
+    async def acquire(self, priority: Priority, tokens: float = 1) -> float:
+        """
+        Wait for capacity for one request of roughly `tokens` tokens.
+
+        Returns the time spent waiting, in seconds.
+        """
+        if not self.enabled:
+            self._record(priority, 0.0, queued=False)
+            return 0.0
+
+        if not self._waiters and self._wait_time(tokens) == 0:
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._record(priority, 0.0, queued=False)
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        enqueued_at = self._clock()
+        heapq.heappush(
+            self._waiters, (int(priority), next(self._seq), tokens, enqueued_at, future)
+        )
+        self._ensure_dispatcher(loop)
+
+        await future
+        waited = self._clock() - enqueued_at
+        self._record(priority, waited, queued=True)
+        return waited
+
+    def _ensure_dispatcher(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._dispatcher is None or self._dispatcher.done() or (
+            self._dispatcher.get_loop() is not loop
+        ):
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        else:
+            self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            _, _, tokens, _, future = self._waiters[0]
+            if future.done():  # caller was cancelled
+                heapq.heappop(self._waiters)
+                continue
+
+            delay = self._wait_time(tokens)
+            if delay == 0:
+                heapq.heappop(self._waiters)
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                future.set_result(None)
+                continue
+
+            # Sleep until capacity frees up, or until a new (possibly
+            # higher-priority) caller arrives.
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def reconcile(self, estimated_tokens: float, actual_tokens: float) -> None:
+        """Correct the token bucket once the real usage is known."""
+        self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every queued caller back, e.g. after the backend returned 429."""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        logger.warning("Model quota exceeded; pausing model calls for %.1fs", seconds)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Queue wait metrics per priority class."""
+        return {
+            priority.name.lower(): {
+                "requests": stats.requests,
+                "queued": stats.queued,
+                "mean_wait_s": stats.mean_wait_s,
+                "max_wait_s": stats.max_wait_s,
+            }
+            for priority, stats in self.stats.items()
+        } | {"backend": {"throttled": self.throttled, "queue_depth": len(self._waiters)}}
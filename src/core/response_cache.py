@@ -0,0 +1,206 @@
+"""
+Response caching for repeated model work.
+
+- ResponseCache: LRU + TTL cache of text responses, optionally persisted to a
+  SQLite file so it survives restarts.
+- SingleFlight: makes concurrent identical misses share one in-flight call.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    LRU cache with a per-entry TTL.
+
+    Expiry uses wall-clock time so persisted entries keep their deadline
+    across restarts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_s: float = 24 * 3600,
+        persist_path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        # When False every lookup misses and nothing is stored.
+        self.enabled = True
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if persist_path is not None:
+            self._open_db(Path(persist_path))
+
+    def _open_db(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "touched_at REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (self._clock(),))
+        rows = self._db.execute(
+            "SELECT key, value, expires_at FROM responses "
+            "ORDER BY touched_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, value, expires_at in reversed(rows):
+            self._entries[key] = (expires_at, value)
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key) if self.enabled else None
+        if entry is not None and entry[0] <= self._clock():
+            self._delete(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def find_prefix(self, prefix: str) -> Optional[str]:
+        """Most recently used live value whose key starts with `prefix` (O(n))."""
+        if not self.enabled:
+            return None
+        now = self._clock()
+        for key in reversed(self._entries):
+            expires_at, value = self._entries[key]
+            if key.startswith(prefix) and expires_at > now:
+                return value
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl_s
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, self._clock()),
+            )
+            self._db.commit()
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._delete(oldest)
+            self.evictions += 1
+
+    def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent work by key.
+
+    `do()` covers the simple case. `begin()`/`complete()`/`abandon()` support
+    callers (such as agent callbacks) where the work starts and finishes in
+    different functions; followers that outlive `stale_after_s` stop waiting
+    and do the work themselves.
+    """
+
+    def __init__(self, stale_after_s: float = 120.0) -> None:
+        self.stale_after_s = stale_after_s
+        # When False every caller leads its own call.
+        self.enabled = True
+        self._flights: Dict[str, Tuple[float, asyncio.Future]] = {}
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        is_leader, future = self.begin(key)
+        if not is_leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except BaseException as exc:
+            self.abandon(key, future, exc if isinstance(exc, Exception) else None)
+            raise
+        self.complete(key, result)
+        return result
+
+    def begin(self, key: str) -> Tuple[bool, asyncio.Future]:
+        """Return (is_leader, future). Followers should await the future."""
+        flight = self._flights.get(key)
+        if flight is not None and not flight[1].done():
+            started_at, future = flight
+            if time.monotonic() - started_at < self.stale_after_s:
+                self.shared += 1
+                return False, future
+
+        future = asyncio.get_running_loop().create_future()
+        if self.enabled:
+            self._flights[key] = (time.monotonic(), future)
+        return True, future
+
+    async def wait(self, future: asyncio.Future) -> Optional[Any]:
+        """Await a leader's result; None if it failed or took too long."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.stale_after_s)
+        except Exception:  # leader failed or timed out
+            return None
+
+    def complete(self, key: str, result: Any) -> None:
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight[1].done():
+            flight[1].set_result(result)
+
+    def abandon(
+        self,
+        key: str,
+        future: Optional[asyncio.Future] = None,
+        exc: Optional[BaseException] = None,
+    ) -> None:
+        """Drop a flight without a result; waiting followers are released."""
+        flight = self._flights.get(key)
+        if flight is None or (future is not None and flight[1] is not future):
+            return
+        del self._flights[key]
+        if not flight[1].done():
+            flight[1].set_exception(exc or RuntimeError(f"flight {key!r} abandoned"))
+            # Nobody may be awaiting; avoid "exception was never retrieved".
+            flight[1].exception()
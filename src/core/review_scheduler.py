@@ -0,0 +1,329 @@
+"""
+Spaced-repetition review scheduling.
+
+Every recorded exercise result reschedules its topic for the learner with an
+SM-2 style rule: the answer (correctness and difficulty) is graded 0-5, a
+passing grade grows the review interval by the topic's ease factor and a
+failing one resets it to a day. Each learner's schedule is persisted in
+state next to `user:student_progress` as the per-topic items plus a binary
+min-heap of `[due, topic]` entries, so the next topic to review is at the top
+of the heap and rescheduling a topic is one O(log n) push (the superseded
+entry is dropped lazily when it reaches the top).
+
+`review_index` mirrors every learner's due times in one process-wide heap so
+"what is due now, for whom" is answered in bulk without scanning every topic
+of every learner. Entries found due are popped off the heap once, in due
+order, onto a list that later queries read up to their `now`. The most
+overdue few are taken in order from that list and a best-first walk of the
+heap's due nodes, without visiting the rest. Servers rebuild the index from
+the stored schedules at startup.
+"""
+
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import math
+import operator
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DAY_S = 86400.0
+
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+# (difficulty, was_correct) -> SM-2 grade (0-5). A correct hard answer is
+# the strongest recall signal, a wrong easy one the weakest.
+_GRADES: Dict[Tuple[str, bool], int] = {
+    ("hard", True): 5,
+    ("medium", True): 4,
+    ("easy", True): 3,
+    ("hard", False): 2,
+    ("medium", False): 1,
+    ("easy", False): 0,
+}
+
+# Rebuild a heap once superseded entries outnumber live ones.
+_STALE_RATIO = 2
+
+
+def grade(difficulty: str, was_correct: bool) -> int:
+    return _GRADES.get((difficulty.lower(), was_correct), 4 if was_correct else 1)
+
+
+@dataclass
+class ReviewItem:
+    """Review state of one topic for one learner."""
+
+    due: float
+    interval_days: float = 0.0
+    ease: float = DEFAULT_EASE
+    repetitions: int = 0
+    lapses: int = 0
+
+    def reviewed(self, quality: int, now: float) -> None:
+        """Apply one graded review (SM-2)."""
+        if quality < 3:
+            self.repetitions = 0
+            self.lapses += 1
+            self.interval_days = 1.0
+        else:
+            if self.repetitions == 0:
+                self.interval_days = 1.0
+            elif self.repetitions == 1:
+                self.interval_days = 6.0
+            else:
+                self.interval_days = round(self.interval_days * self.ease, 2)
+            self.repetitions += 1
+        miss = 5 - quality
+        self.ease = max(MIN_EASE, round(self.ease + 0.1 - miss * (0.08 + miss * 0.02), 3))
+        self.due = now + self.interval_days * DAY_S
+
+
+def _iter_due(heap: List[Any], now: float) -> Iterator[Any]:
+    """
+    The heap entries due at `now`, soonest first, without modifying the heap:
+    a best-first walk over a frontier of due nodes. Taking the first k entries
+    costs O(k log k) however many are due.
+    """
+    if not heap or heap[0][0] > now:
+        return
+    size = len(heap)
+    frontier = [(heap[0], 0)]
+    while frontier:
+        entry, position = heapq.heappop(frontier)
+        yield entry
+        child = 2 * position + 1
+        if child < size and heap[child][0] <= now:
+            heapq.heappush(frontier, (heap[child], child))
+        child += 1
+        if child < size and heap[child][0] <= now:
+            heapq.heappush(frontier, (heap[child], child))
+
+
+class ReviewSchedule:
+    """One learner's review items and their due-time heap."""
+
+    def __init__(
+        self,
+        items: Optional[Dict[str, ReviewItem]] = None,
+        queue: Optional[List[List[Any]]] = None,
+    ) -> None:
+        self.items: Dict[str, ReviewItem] = items or {}
+        self.queue: List[List[Any]] = queue if queue is not None else []
+        if queue is None:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self.queue = [[item.due, topic] for topic, item in self.items.items()]
+        heapq.heapify(self.queue)
+
+    def _live(self, entry: List[Any]) -> bool:
+        item = self.items.get(entry[1])
+        return item is not None and item.due == entry[0]
+
+    def record(
+        self, topic: str, difficulty: str, was_correct: bool, now: Optional[float] = None
+    ) -> ReviewItem:
+        now = time.time() if now is None else now
+        item = self.items.get(topic)
+        if item is None:
+            item = self.items[topic] = ReviewItem(due=now)
+        item.reviewed(grade(difficulty, was_correct), now)
+        heapq.heappush(self.queue, [item.due, topic])
+        if len(self.queue) > _STALE_RATIO * len(self.items):
+            self._rebuild()
+        return item
+
+    def next_due(self) -> Optional[Tuple[str, ReviewItem]]:
+        """The topic due soonest (possibly in the future), or None."""
+        while self.queue and not self._live(self.queue[0]):
+            heapq.heappop(self.queue)
+        if not self.queue:
+            return None
+        topic = self.queue[0][1]
+        return topic, self.items[topic]
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Topics due at `now`, most overdue first."""
+        now = time.time() if now is None else now
+        return [entry[1] for entry in _iter_due(self.queue, now) if self._live(entry)]
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "items": {
+                topic: {
+                    "due": item.due,
+                    "interval_days": item.interval_days,
+                    "ease": item.ease,
+                    "repetitions": item.repetitions,
+                    "lapses": item.lapses,
+                }
+                for topic, item in self.items.items()
+            },
+            # Kept in heap order, so loading does not re-heapify.
+            "queue": [list(entry) for entry in self.queue],
+        }
+
+    @classmethod
+    def from_state(cls, raw: Any) -> "ReviewSchedule":
+        if not isinstance(raw, dict):
+            return cls()
+        items = {
+            topic: ReviewItem(
+                due=float(item_raw.get("due", 0.0)),
+                interval_days=float(item_raw.get("interval_days", 0.0)),
+                ease=float(item_raw.get("ease", DEFAULT_EASE)),
+                repetitions=int(item_raw.get("repetitions", 0)),
+                lapses=int(item_raw.get("lapses", 0)),
+            )
+            for topic, item_raw in raw.get("items", {}).items()
+        }
+        queue = raw.get("queue")
+        if not isinstance(queue, list) or len(queue) < len(items):
+            return cls(items)
+        return cls(items, [[float(due), topic] for due, topic in queue])
+
+
+class ReviewIndex:
+    """
+    Due times of every learner's topics, for bulk queries: a min-heap of the
+    entries not yet found due and, ahead of it, the entries already found due
+    in due order.
+
+    A query pops the heap entries due by then onto the due list, so each entry
+    leaves the heap once however often it is queried, and reads the due list
+    up to `now`. Entries are `[due, user_id, topic, current]` lists;
+    rescheduling clears the old entry's flag and adds a new one, so superseded
+    entries are skipped without a lookup and dropped when the index is rebuilt.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._heap: List[List[Any]] = []
+        # Sorted; every heap entry is due after `_popped_until`. Entries before
+        # `_head` are superseded.
+        self._due_list: List[List[Any]] = []
+        self._head = 0
+        self._popped_until = -math.inf
+        self._entries: Dict[Tuple[str, str], List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, user_id: str, topic: str, due: float) -> None:
+        with self._lock:
+            self._update(user_id, topic, due)
+
+    def _update(self, user_id: str, topic: str, due: float) -> None:
+        key = (user_id, topic)
+        old = self._entries.get(key)
+        if old is not None:
+            if old[0] == due:
+                return
+            old[3] = False
+        entry = self._entries[key] = [due, user_id, topic, True]
+        if due <= self._popped_until:
+            bisect.insort(self._due_list, entry, lo=self._head)
+        else:
+            heapq.heappush(self._heap, entry)
+        held = len(self._heap) + len(self._due_list) - self._head
+        if held > _STALE_RATIO * len(self._entries):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
+        self._due_list = []
+        self._head = 0
+        self._popped_until = -math.inf
+
+    def sync(self, user_id: str, schedule: ReviewSchedule) -> None:
+        """Register a learner's schedule as loaded from state (e.g. after a restart)."""
+        with self._lock:
+            for topic, item in schedule.items.items():
+                self._update(user_id, topic, item.due)
+
+    def rebuild(self, schedules: Iterable[Tuple[str, ReviewSchedule]]) -> None:
+        """Replace the index with (user_id, schedule) pairs, e.g. all stored ones at startup."""
+        with self._lock:
+            self._entries = {
+                (user_id, topic): [item.due, user_id, topic, True]
+                for user_id, schedule in schedules
+                for topic, item in schedule.items.items()
+            }
+            self._rebuild()
+
+    def _pop_due(self, now: float) -> None:
+        """Move the heap entries due at `now` onto the due list."""
+        if now <= self._popped_until:
+            return
+        heap, due_list = self._heap, self._due_list
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if entry[3]:
+                due_list.append(entry)
+        self._popped_until = now
+
+    def next_due(self) -> Optional[Tuple[float, str, str]]:
+        """(due, user_id, topic) of the entry due soonest, or None."""
+        with self._lock:
+            due_list = self._due_list
+            while self._head < len(due_list) and not due_list[self._head][3]:
+                self._head += 1
+            if self._head < len(due_list):
+                entry = due_list[self._head]
+            else:
+                heap = self._heap
+                while heap and not heap[0][3]:
+                    heapq.heappop(heap)
+                if not heap:
+                    return None
+                entry = heap[0]
+            return entry[0], entry[1], entry[2]
+
+    def due_now(
+        self, now: Optional[float] = None, limit: Optional[int] = None
+    ) -> Dict[str, List[str]]:
+        """
+        {user_id: topics due at `now`}, most overdue first. With `limit`, only
+        the `limit` most overdue entries are returned.
+        """
+        now = time.time() if now is None else now
+        due: Dict[str, List[str]] = {}
+        with self._lock:
+            if limit is not None and now > self._popped_until:
+                # The due list comes first; take the rest from the heap in
+                # order without popping everything that is due.
+                entries: Iterable[List[Any]] = itertools.chain(
+                    itertools.islice(self._due_list, self._head, None),
+                    _iter_due(self._heap, now),
+                )
+            else:
+                self._pop_due(now)
+                end = bisect.bisect_right(
+                    self._due_list, now, lo=self._head, key=operator.itemgetter(0)
+                )
+                entries = itertools.islice(self._due_list, self._head, end)
+            found = 0
+            for when, user_id, topic, current in entries:
+                if limit is not None and found >= limit:
+                    break
+                if current:
+                    due.setdefault(user_id, []).append(topic)
+                    found += 1
+        return due
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rebuild()
+
+
+review_index = ReviewIndex()
@@ -0,0 +1,366 @@
+"""
+Multi-query search fan-out with a merged, size-bounded digest.
+
+A multi-faceted question used to cost one nested search conversation per
+facet, one after the other. The search tool now accepts several sub-queries
+and runs them concurrently against a pluggable backend, under a cap:
+
+  - AgentSearchBackend:  the nested google_search_agent, one conversation per
+                         sub-query (cached and shared in flight per query)
+  - LocalCorpusBackend:  keyword search over a local JSONL corpus, a stand-in
+                         for offline runs, evaluation and benchmarks
+
+Results are merged round-robin across sub-queries so every facet is
+represented, de-duplicated by normalized URL and by a hash of the normalized
+content, and rendered as one compact digest that never exceeds a character
+budget.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+)
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.config import config
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.search")
+
+_URL = re.compile(r"https?://[^\s)\]>\"']+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to what when where which why with".split()
+)
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One search result: where it came from and the text worth keeping."""
+
+    query: str
+    snippet: str
+    url: str = ""
+    title: str = ""
+
+
+class SearchBackend(Protocol):
+    async def search(self, query: str, tool_context: Any = None) -> List[SearchHit]: ...
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form for de-duplication: no scheme, www., fragment or tracking params."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query)
+            if not key.lower().startswith(_TRACKING_PARAMS)
+        )
+    )
+    return urlunsplit(("", host, path, query, ""))
+
+
+def content_hash(text: str) -> str:
+    """Hash of the lowercased words, so reformatted copies of a text collide."""
+    words = " ".join(_WORD.findall(text.lower()))
+    return hashlib.sha1(words.encode("utf-8")).hexdigest()
+
+
+def hits_from_text(text: str, query: str) -> List[SearchHit]:
+    """
+    Split a search agent's summary into hits: one per paragraph or bullet,
+    with the first URL it cites.
+    """
+    hits: List[SearchHit] = []
+    for chunk in re.split(r"\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)])\s)", text):
+        url_match = _URL.search(chunk)
+        url = url_match.group(0).rstrip(".,;") if url_match else ""
+        snippet = " ".join(_URL.sub("", chunk).replace("()", "").split()).strip(" -*•")
+        if snippet:
+            hits.append(SearchHit(query=query, snippet=snippet, url=url))
+    return hits
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[: max(0, limit - 1)].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+class AgentSearchBackend:
+    """Runs each sub-query as its own nested search-agent conversation."""
+
+    def __init__(self, run: Callable[[str, Any], Awaitable[Any]]) -> None:
+        self._run = run
+
+    async def search(self, query: str, tool_context: Any = None) -> List[SearchHit]:
+        result = await self._run(query, tool_context)
+        return hits_from_text(result, query) if isinstance(result, str) else []
+
+
+class LocalCorpusBackend:
+    """
+    Keyword search over an in-memory corpus of {url, title, text} documents,
+    ranked by the number of distinct query words a document contains.
+    `latency_s` simulates a remote search backend.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Dict[str, str]],
+        latency_s: float = 0.0,
+        snippet_chars: int = 280,
+    ) -> None:
+        self.documents = list(documents)
+        self.latency_s = latency_s
+        self.snippet_chars = snippet_chars
+        self._postings: Dict[str, Set[int]] = {}
+        for doc_id, document in enumerate(self.documents):
+            text = f"{document.get('title', '')} {document.get('text', '')}".lower()
+            for word in set(_WORD.findall(text)) - _STOPWORDS:
+                self._postings.setdefault(word, set()).add(doc_id)
+
+    @classmethod
+    def from_file(cls, path: Path, **kwargs: Any) -> "LocalCorpusBackend":
+        """Load a JSONL corpus, one {url, title, text} object per line."""
+        with open(path, encoding="utf-8") as handle:
+            documents = [json.loads(line) for line in handle if line.strip()]
+        return cls(documents, **kwargs)
+
+    async def search(self, query: str, tool_context: Any = None) -> List[SearchHit]:
+        if self.latency_s > 0:
+            await asyncio.sleep(self.latency_s)
+        scores: Dict[int, int] = {}
+        for word in set(_WORD.findall(query.lower())) - _STOPWORDS:
+            for doc_id in self._postings.get(word, ()):
+                scores[doc_id] = scores.get(doc_id, 0) + 1
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [
+            SearchHit(
+                query=query,
+                snippet=_truncate(
+                    " ".join(self.documents[doc_id].get("text", "").split()), self.snippet_chars
+                ),
+                url=self.documents[doc_id].get("url", ""),
+                title=self.documents[doc_id].get("title", ""),
+            )
+            for doc_id in ranked
+        ]
+
+
+def merge_hits(results: Sequence[List[SearchHit]]) -> Tuple[List[SearchHit], int]:
+    """
+    Interleave each sub-query's hits (best first) and drop any hit whose URL
+    or content was already seen. Returns (unique hits, duplicates dropped).
+    """
+    merged: List[SearchHit] = []
+    seen_urls: Set[str] = set()
+    seen_content: Set[str] = set()
+    duplicates = 0
+    for rank in range(max((len(hits) for hits in results), default=0)):
+        for hits in results:
+            if rank >= len(hits):
+                continue
+            hit = hits[rank]
+            url_key = normalize_url(hit.url) if hit.url else ""
+            text_key = content_hash(hit.snippet)
+            if (url_key and url_key in seen_urls) or text_key in seen_content:
+                duplicates += 1
+                continue
+            if url_key:
+                seen_urls.add(url_key)
+            seen_content.add(text_key)
+            merged.append(hit)
+    return merged, duplicates
+
+
+def render_digest(
+    queries: Sequence[str],
+    hits: Sequence[SearchHit],
+    max_chars: int,
+    snippet_chars: int = 300,
+    duplicates: int = 0,
+    failed: Sequence[str] = (),
+) -> str:
+    """One compact, numbered digest of the merged hits, at most `max_chars` long."""
+    header = "Search results for: " + "; ".join(f'"{query}"' for query in queries)
+    lines = [_truncate(header, max_chars)]
+    used = len(lines[0])
+    shown = 0
+    for hit in hits:
+        label = f"{hit.title}: " if hit.title else ""
+        source = f" ({hit.url})" if hit.url else ""
+        line = f"[{shown + 1}] {label}{_truncate(hit.snippet, snippet_chars)}{source}"
+        # Reserve room for the footer so the digest stays within budget.
+        if used + 1 + len(line) > max_chars - 80:
+            break
+        lines.append(line)
+        used += 1 + len(line)
+        shown += 1
+
+    notes = []
+    if not hits:
+        notes.append("no results")
+    if duplicates:
+        notes.append(f"merged {duplicates} duplicate results")
+    if shown < len(hits):
+        notes.append(f"omitted {len(hits) - shown} more results")
+    if failed:
+        notes.append(f"{len(failed)} of {len(queries)} searches failed")
+    if notes:
+        footer = f"({', '.join(notes)})"
+        if used + 1 + len(footer) <= max_chars:
+            lines.append(footer)
+    return "\n".join(lines)
+
+
+def split_queries(args: Dict[str, Any], max_queries: int) -> List[str]:
+    """Distinct sub-queries from a tool call's `queries` and/or `request`."""
+    raw = args.get("queries")
+    if isinstance(raw, str):
+        raw = [raw]
+    candidates = list(raw) if isinstance(raw, (list, tuple)) else []
+    if isinstance(args.get("request"), str):
+        candidates.insert(0, args["request"])
+
+    queries: List[str] = []
+    seen: Set[str] = set()
+    for query in candidates:
+        if not isinstance(query, str) or not query.strip():
+            continue
+        key = " ".join(query.lower().split())
+        if key not in seen:
+            seen.add(key)
+            queries.append(query.strip())
+    if len(queries) > max_queries:
+        logger.info("Search fan-out capped at %d of %d sub-queries", max_queries, len(queries))
+    return queries[:max_queries]
+
+
+class SearchFanOut:
+    """
+    Runs sub-queries concurrently (at most `concurrency` at a time) and merges
+    their results into one digest.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        results_per_query: int = 4,
+        digest_chars: int = 3000,
+        snippet_chars: int = 300,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.results_per_query = results_per_query
+        self.digest_chars = digest_chars
+        self.snippet_chars = snippet_chars
+        self.fan_outs = 0
+        self.sub_queries = 0
+        self.failures = 0
+        self.hits = 0
+        self.duplicates = 0
+        self.digest_chars_total = 0
+
+    async def search(
+        self, queries: Sequence[str], backend: SearchBackend, tool_context: Any = None
+    ) -> str:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _one(query: str) -> List[SearchHit]:
+            async with semaphore:
+                hits = await backend.search(query, tool_context)
+            return hits[: self.results_per_query]
+
+        outcomes = await asyncio.gather(*(_one(query) for query in queries), return_exceptions=True)
+        results: List[List[SearchHit]] = []
+        failed: List[str] = []
+        for query, outcome in zip(queries, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning("Search for %r failed: %s", query, outcome)
+                failed.append(query)
+                results.append([])
+            else:
+                results.append(outcome)
+        if failed and len(failed) == len(queries):
+            raise next(outcome for outcome in outcomes if isinstance(outcome, BaseException))
+
+        merged, duplicates = merge_hits(results)
+        digest = render_digest(
+            queries,
+            merged,
+            self.digest_chars,
+            snippet_chars=self.snippet_chars,
+            duplicates=duplicates,
+            failed=failed,
+        )
+        self.fan_outs += 1
+        self.sub_queries += len(queries)
+        self.failures += len(failed)
+        self.hits += sum(len(hits) for hits in results)
+        self.duplicates += duplicates
+        self.digest_chars_total += len(digest)
+        return digest
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "fan_outs": self.fan_outs,
+            "sub_queries": self.sub_queries,
+            "failures": self.failures,
+            "hits": self.hits,
+            "duplicates_merged": self.duplicates,
+            "mean_digest_chars": (
+                round(self.digest_chars_total / self.fan_outs, 1) if self.fan_outs else 0.0
+            ),
+        }
+
+
+def _configured_backend() -> Optional[SearchBackend]:
+    if not config.search_corpus_path:
+        return None
+    try:
+        return LocalCorpusBackend.from_file(Path(config.search_corpus_path))
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not load search corpus %s: %s", config.search_corpus_path, exc)
+        return None
+
+
+search_fanout = SearchFanOut(
+    concurrency=config.search_concurrency,
+    results_per_query=config.search_results_per_query,
+    digest_chars=config.search_digest_chars,
+)
+# None means the nested google_search_agent answers every sub-query.
+_search_backend: Optional[SearchBackend] = _configured_backend()
+
+
+def get_search_backend() -> Optional[SearchBackend]:
+    return _search_backend
+
+
+def set_search_backend(backend: Optional[SearchBackend]) -> None:
+    """Route searches to `backend` (None restores the nested search agent)."""
+    global _search_backend
+    _search_backend = backend
@@ -0,0 +1,367 @@
+"""
+Per-session size and memory instrumentation.
+
+`SessionMetricsPlugin` samples every session at the end of each turn: event
+count, content bytes, serialized size of each state key (the learner profile
+and progress in particular), the length of `difficulty_history`, and, every
+few turns, the Python heap held by the session object graph. Sizes are
+tracked per session from its first sampled turn, so a key that grows on
+every turn shows up as a steady per-turn growth rate long before it becomes
+a problem; state keys above a size threshold are logged once per session.
+
+Allocation profiling is on demand: while `allocation_profiler` is started,
+agent runs are profiled one at a time with tracemalloc and the allocations
+still alive when a run ends are attributed to that agent (inclusive of any
+sub-agent it transfers to). Under concurrent sessions, allocations made by
+other sessions during the same run are attributed too, so profile at low
+concurrency. Profiling clears tracemalloc's traces at the start of each
+window.
+"""
+
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from types import FunctionType, ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions.session import Session
+
+from src.config import config
+from src.core.state import STATE_KEY_PROFILE, STATE_KEY_PROGRESS
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.session_metrics")
+
+SessionKey = Tuple[str, str, str]
+
+# Objects shared by every session, never counted towards one.
+_SHARED_TYPES = (type, ModuleType, FunctionType)
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Bytes held by `obj` and everything it references (classes excluded)."""
+    seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        batch = []
+        for item in pending:
+            if id(item) in seen or isinstance(item, _SHARED_TYPES):
+                continue
+            seen.add(id(item))
+            size += sys.getsizeof(item)
+            batch.append(item)
+        pending = gc.get_referents(*batch)
+    return size
+
+
+def _json_bytes(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def content_bytes(content: Optional[genai_types.Content]) -> int:
+    """Text plus serialized tool-call arguments and results of one content."""
+    size = 0
+    for part in (content.parts if content else None) or []:
+        if part.text:
+            size += len(part.text.encode("utf-8"))
+        if part.function_call is not None:
+            size += _json_bytes(part.function_call.args or {})
+        if part.function_response is not None:
+            size += _json_bytes(part.function_response.response or {})
+    return size
+
+
+class _SessionSizes:
+    """First and latest sample of one session, plus incremental content size."""
+
+    def __init__(self) -> None:
+        self.turns = 0
+        self.first: Dict[str, int] = {}
+        self.latest: Dict[str, int] = {}
+        self.key_bytes: Dict[str, int] = {}
+        self.heap_bytes = 0
+        self.warned: set = set()
+        # Events already counted in `content_bytes`, identified by the last one.
+        self.counted_events = 0
+        self.last_event_id = ""
+        self.content_bytes = 0
+
+    def count_content(self, session: Session) -> int:
+        events = session.events
+        counted = self.counted_events
+        if counted > len(events) or (counted and events[counted - 1].id != self.last_event_id):
+            # The event list was trimmed or replaced (e.g. a resumed session).
+            counted = 0
+            self.content_bytes = 0
+        for event in events[counted:]:
+            self.content_bytes += content_bytes(event.content)
+        self.counted_events = len(events)
+        self.last_event_id = events[-1].id if events else ""
+        return self.content_bytes
+
+
+class SessionSizeMonitor:
+    """
+    Latest size sample of up to `max_sessions` recently active sessions.
+
+    The heap held by a session is measured on its first sampled turn and then
+    every `heap_every` turns (0 disables it). State keys larger than
+    `warn_bytes` are logged once per session.
+    """
+
+    def __init__(
+        self, max_sessions: int = 1024, heap_every: int = 10, warn_bytes: int = 256 * 1024
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.heap_every = heap_every
+        self.warn_bytes = warn_bytes
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[SessionKey, _SessionSizes]" = OrderedDict()
+        self.samples = 0
+        self.warnings = 0
+
+    def record(self, session: Session) -> Dict[str, int]:
+        """Sample one session; returns the sample."""
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            sizes = self._sessions.pop(key, None) or _SessionSizes()
+            self._sessions[key] = sizes
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            state = session.state
+            key_bytes = {name: _json_bytes(value) for name, value in state.items()}
+            progress = state.get(STATE_KEY_PROGRESS)
+            history = progress.get("difficulty_history", []) if isinstance(progress, dict) else []
+            if self.heap_every and sizes.turns % self.heap_every == 0:
+                sizes.heap_bytes = deep_sizeof(session)
+            sample = {
+                "events": len(session.events),
+                "content_bytes": sizes.count_content(session),
+                "state_bytes": sum(key_bytes.values()),
+                "profile_bytes": key_bytes.get(STATE_KEY_PROFILE, 0),
+                "progress_bytes": key_bytes.get(STATE_KEY_PROGRESS, 0),
+                "difficulty_history": len(history),
+                "heap_bytes": sizes.heap_bytes,
+            }
+            if not sizes.turns:
+                sizes.first = sample
+            sizes.turns += 1
+            sizes.latest = sample
+            sizes.key_bytes = key_bytes
+            self.samples += 1
+
+            for name, size in key_bytes.items():
+                if size > self.warn_bytes and name not in sizes.warned:
+                    sizes.warned.add(name)
+                    self.warnings += 1
+                    logger.warning(
+                        "[SESSION_SIZE] session=%s key=%s is %d bytes after %d turns",
+                        session.id,
+                        name,
+                        size,
+                        sizes.turns,
+                    )
+            return sample
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self.samples = 0
+            self.warnings = 0
+
+    def metrics(self, top_keys: int = 5) -> Dict[str, Any]:
+        """
+        Mean and max of each latest sample across sessions, mean growth per
+        turn (over sessions sampled at least twice) and the largest state keys.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            samples = self.samples
+            warnings = self.warnings
+        if not sessions:
+            return {"sessions": 0, "samples": samples, "warnings": warnings}
+
+        report: Dict[str, Any] = {
+            "sessions": len(sessions),
+            "samples": samples,
+            "warnings": warnings,
+            "max_turns": max(sizes.turns for sizes in sessions),
+        }
+        grown = [sizes for sizes in sessions if sizes.turns > 1]
+        for name in sessions[0].latest:
+            values = [sizes.latest[name] for sizes in sessions]
+            report[name] = {
+                "mean": round(sum(values) / len(values), 1),
+                "max": max(values),
+                "growth_per_turn": round(
+                    sum(
+                        (sizes.latest[name] - sizes.first[name]) / (sizes.turns - 1)
+                        for sizes in grown
+                    )
+                    / len(grown),
+                    1,
+                )
+                if grown
+                else 0.0,
+            }
+
+        largest: Dict[str, int] = {}
+        for sizes in sessions:
+            for name, size in sizes.key_bytes.items():
+                largest[name] = max(largest.get(name, 0), size)
+        report["largest_state_keys"] = dict(
+            sorted(largest.items(), key=lambda item: item[1], reverse=True)[:top_keys]
+        )
+        return report
+
+
+class AllocationProfiler:
+    """
+    Top allocation sites per agent from tracemalloc (on demand).
+
+    One agent run is profiled at a time: its window starts by clearing
+    tracemalloc's traces, so the snapshot taken when the run ends holds only
+    the allocations made during it that are still alive. That keeps each
+    snapshot small (diffing two full snapshots of a running app takes
+    seconds). Runs that start while a window is open are not profiled.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._window: Optional[Tuple[str, str]] = None
+        # agent -> site -> [bytes, allocations]
+        self._sites: Dict[str, Dict[str, List[int]]] = {}
+        self._runs: Dict[str, int] = {}
+        self._started_tracing = False
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing (if this profiler started it); the report is kept."""
+        with self._lock:
+            self._window = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def begin(self, invocation_id: str, agent_name: str) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            if self._window is not None:
+                return
+            self._window = (invocation_id, agent_name)
+            tracemalloc.clear_traces()
+
+    def end(self, invocation_id: str, agent_name: Optional[str] = None) -> None:
+        """
+        Close the window of this agent run, or with no `agent_name`, any
+        window of the invocation (agents that transfer control never get an
+        after-agent callback; their window closes when the turn ends).
+        """
+        with self._lock:
+            if self._window is None or self._window[0] != invocation_id:
+                return
+            if agent_name is not None and self._window[1] != agent_name:
+                return
+            agent_name = self._window[1]
+            self._window = None
+            if not self.active:
+                return
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            self._runs[agent_name] = self._runs.get(agent_name, 0) + 1
+            sites = self._sites.setdefault(agent_name, {})
+            for stat in snapshot.statistics("lineno"):
+                frame = stat.traceback[0]
+                site = sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += stat.size
+                site[1] += stat.count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+            self._runs.clear()
+
+    def report(self, top: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        {agent: {runs, retained_kib, sites: [{site, kib, allocations}]}}: the
+        memory still held when profiled runs ended, largest sites first.
+        """
+        with self._lock:
+            return {
+                agent_name: {
+                    "runs": self._runs.get(agent_name, 0),
+                    "retained_kib": round(sum(size for size, _ in sites.values()) / 1024, 1),
+                    "sites": [
+                        {"site": site, "kib": round(size / 1024, 1), "allocations": count}
+                        for site, (size, count) in sorted(
+                            sites.items(), key=lambda item: item[1][0], reverse=True
+                        )[:top]
+                    ],
+                }
+                for agent_name, sites in sorted(self._sites.items())
+            }
+
+
+class SessionMetricsPlugin(BasePlugin):
+    """Samples session sizes after each turn and profiles agent runs on demand."""
+
+    def __init__(self, monitor: SessionSizeMonitor, profiler: AllocationProfiler) -> None:
+        super().__init__(name="session_metrics")
+        self.monitor = monitor
+        self.profiler = profiler
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[genai_types.Content]:
+        self.profiler.begin(callback_context.invocation_id, agent.name)
+        return None
+
+    async def after_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[genai_types.Content]:
+        self.profiler.end(callback_context.invocation_id, agent.name)
+        return None
+
+    async def on_run_error_callback(
+        self, *, invocation_context: InvocationContext, error: Exception
+    ) -> None:
+        self.profiler.end(invocation_context.invocation_id)
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self.profiler.end(invocation_context.invocation_id)
+        try:
+            self.monitor.record(invocation_context.session)
+        except Exception as exc:  # noqa: BLE001 - instrumentation must not fail a turn
+            logger.warning("[SESSION_SIZE] sampling failed: %s", exc)
+
+
+session_monitor = SessionSizeMonitor(
+    heap_every=config.session_heap_every, warn_bytes=config.session_warn_bytes
+)
+allocation_profiler = AllocationProfiler()
+if config.tracemalloc_frames > 0:
+    allocation_profiler.start(config.tracemalloc_frames)
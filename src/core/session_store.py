@@ -0,0 +1,495 @@
+"""
+Durable sessions: an append-only event log plus compact snapshots.
+
+Every event of a session is appended to `<session>.log` as a length-prefixed
+JSON record and is never rewritten. Every `snapshot_every` events, and after
+each context compaction, `<session>.snap` is replaced atomically with the
+session state and the post-compaction event window (the compaction summaries
+and the events after the latest one), together with the log offset it covers.
+
+Resuming a session loads the latest snapshot and replays only the log tail
+after that offset, read through a memory map. The in-memory copy of a
+session is trimmed to the same window, so long sessions stop growing in RAM.
+
+Learner-scoped (user:) and app-scoped (app:) state is shared by all of a
+learner's sessions, so it is not taken from any one session's snapshot or
+log: every commit that changes it rewrites the learner's `_user_state.json`
+(and the app's `_app_state.json`), and resuming a session restores it only
+from those records. Snapshots hold the session's own keys, and replayed log
+tails have their user:/app: deltas stripped, so resuming an older session
+never rolls the learner's state back.
+
+Residency can be bounded by a session count and/or an estimated byte budget.
+Past either limit the least recently used session is spilled: snapshotted
+and dropped from memory, together with the learner's user: state once their
+last resident session goes. The next get_session/append_event reloads it
+transparently.
+"""
+
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.session_store")
+
+_HEADER = struct.Struct(">I")
+_USER_STATE_FILE = "_user_state.json"
+_APP_STATE_FILE = "_app_state.json"
+_SCOPED_PREFIXES = (State.USER_PREFIX, State.APP_PREFIX)
+
+SessionKey = Tuple[str, str, str]
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+def _session_keys(state: Dict[str, Any]) -> Dict[str, Any]:
+    """`state` without the user:/app: keys, which have their own records."""
+    return {key: value for key, value in state.items() if not key.startswith(_SCOPED_PREFIXES)}
+
+
+def _write_json(path: Path, value: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(value), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def compaction_window(events: List[Event]) -> List[Event]:
+    """
+    The events the model can still see after compaction: every compaction
+    summary, plus the events newer than the latest compacted range.
+    """
+    compacted_until = None
+    for event in events:
+        compaction = event.actions.compaction if event.actions else None
+        if compaction is not None and compaction.end_timestamp is not None:
+            compacted_until = max(compacted_until or 0.0, compaction.end_timestamp)
+    if compacted_until is None:
+        return list(events)
+    return [
+        event
+        for event in events
+        if (event.actions and event.actions.compaction is not None)
+        or event.timestamp > compacted_until
+    ]
+
+
+class SessionEventLog:
+    """Append-only, length-prefixed event log with an atomic snapshot file."""
+
+    def __init__(self, directory: Path, session_id: str) -> None:
+        self.directory = directory
+        self.log_path = directory / f"{_safe_name(session_id)}.log"
+        self.snapshot_path = directory / f"{_safe_name(session_id)}.snap"
+        self._file: Optional[BinaryIO] = None
+        self.events_since_snapshot = 0
+
+    @property
+    def offset(self) -> int:
+        if self._file is not None:
+            return self._file.tell()
+        return self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    def append(self, event: Event) -> int:
+        """Append one event; returns the record's payload size in bytes."""
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.log_path, "ab")
+        payload = event.model_dump_json(exclude_none=True).encode("utf-8")
+        self._file.write(_HEADER.pack(len(payload)) + payload)
+        self._file.flush()
+        self.events_since_snapshot += 1
+        return len(payload)
+
+    def write_snapshot(self, state: Dict[str, Any], window: List[Event]) -> int:
+        """Replace the snapshot; returns its size in bytes."""
+        snapshot = {
+            "log_offset": self.offset,
+            "state": state,
+            "events": [event.model_dump(mode="json", exclude_none=True) for event in window],
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".snap.tmp")
+        payload = json.dumps(snapshot)
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.snapshot_path)
+        self.events_since_snapshot = 0
+        return len(payload)
+
+    def read_snapshot(self) -> Optional[Dict[str, Any]]:
+        if not self.snapshot_path.exists():
+            return None
+        return json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+
+    def read_events(self, offset: int = 0) -> Iterator[Event]:
+        """Events from byte `offset` on; a torn final record is ignored."""
+        size = self.log_path.stat().st_size if self.log_path.exists() else 0
+        if size <= offset:
+            return
+        with open(self.log_path, "rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as view:
+            position = offset
+            while position + _HEADER.size <= size:
+                (length,) = _HEADER.unpack_from(view, position)
+                start = position + _HEADER.size
+                if start + length > size:
+                    logger.warning("[SESSION_LOG] torn record at %s:%d", self.log_path, position)
+                    return
+                yield Event.model_validate_json(view[start:start + length])
+                position = start + length
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def delete(self) -> None:
+        self.close()
+        for path in (self.log_path, self.snapshot_path):
+            path.unlink(missing_ok=True)
+
+
+class PersistentSessionService(InMemorySessionService):
+    """
+    InMemorySessionService whose sessions survive restarts.
+
+    Sessions that are not in memory are resumed from disk on first access,
+    so a restarted CLI can continue a learner's lesson mid-way. With
+    `max_resident` and/or `max_resident_bytes` (estimated from the serialized
+    snapshot and event sizes), only the most recently used sessions stay in
+    memory; the rest are spilled and reloaded on their next turn.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        snapshot_every: int = 200,
+        max_resident: int = 0,
+        max_resident_bytes: int = 0,
+    ) -> None:
+        super().__init__()
+        self.root_dir = Path(root_dir)
+        self.snapshot_every = snapshot_every
+        self.max_resident = max_resident
+        self.max_resident_bytes = max_resident_bytes
+        self._logs: Dict[SessionKey, SessionEventLog] = {}
+        # Resident sessions in LRU order -> estimated bytes.
+        self._resident: "OrderedDict[SessionKey, int]" = OrderedDict()
+        self._resident_bytes = 0
+        self.hits = 0
+        self.reloads = 0
+        self.not_found = 0
+        self.evictions = 0
+        self.user_state_spills = 0
+        self._reload_s: Deque[float] = deque(maxlen=4096)
+
+    def _directory(self, app_name: str, user_id: str) -> Path:
+        return self.root_dir / _safe_name(app_name) / _safe_name(user_id)
+
+    def _log(self, app_name: str, user_id: str, session_id: str) -> SessionEventLog:
+        key = (app_name, user_id, session_id)
+        if key not in self._logs:
+            self._logs[key] = SessionEventLog(self._directory(app_name, user_id), session_id)
+        return self._logs[key]
+
+    def _storage(self, session: Session) -> Session:
+        return self.sessions[session.app_name][session.user_id][session.id]
+
+    def _is_resident(self, app_name: str, user_id: str, session_id: str) -> bool:
+        return session_id in self.sessions.get(app_name, {}).get(user_id, {})
+
+    def _snapshot(self, session: Session, log: SessionEventLog) -> int:
+        storage = self._storage(session)
+        storage.events = compaction_window(storage.events)
+        return log.write_snapshot(_session_keys(storage.state), storage.events)
+
+    # --- residency ----------------------------------------------------------
+
+    def _touch(self, key: SessionKey, size: Optional[int] = None, grow: int = 0) -> None:
+        """Mark a session most recently used, update its size, enforce the limits."""
+        old = self._resident.pop(key, 0)
+        new = size if size is not None else old + grow
+        self._resident[key] = new
+        self._resident_bytes += new - old
+        while len(self._resident) > 1 and (
+            (self.max_resident and len(self._resident) > self.max_resident)
+            or (self.max_resident_bytes and self._resident_bytes > self.max_resident_bytes)
+        ):
+            self._evict(next(iter(self._resident)))
+
+    def _evict(self, key: SessionKey) -> None:
+        """Spill one session: snapshot it if needed and drop it from memory."""
+        app_name, user_id, session_id = key
+        self._resident_bytes -= self._resident.pop(key)
+        user_sessions = self.sessions.get(app_name, {}).get(user_id, {})
+        log = self._logs.pop(key, None) or SessionEventLog(
+            self._directory(app_name, user_id), session_id
+        )
+        storage = user_sessions.get(session_id)
+        if storage is not None:
+            if log.events_since_snapshot or not log.snapshot_path.exists():
+                self._snapshot(storage, log)
+            del user_sessions[session_id]
+        log.close()
+        if not user_sessions:
+            self.sessions.get(app_name, {}).pop(user_id, None)
+            self._spill_user_state(app_name, user_id)
+        self.evictions += 1
+
+    def _spill_user_state(self, app_name: str, user_id: str) -> None:
+        """Drop a learner's user: state from memory; its record is already current."""
+        if self.user_state.get(app_name, {}).pop(user_id, None) is not None:
+            self.user_state_spills += 1
+
+    def _commit_scoped_state(self, app_name: str, user_id: str, delta: Dict[str, Any]) -> None:
+        """Rewrite the learner's (and app's) state record after a commit that changed it."""
+        if any(key.startswith(State.USER_PREFIX) for key in delta):
+            # Directory names are sanitized, so the record names its learner.
+            _write_json(
+                self._directory(app_name, user_id) / _USER_STATE_FILE,
+                {
+                    "user_id": user_id,
+                    "state": self.user_state.get(app_name, {}).get(user_id, {}),
+                },
+            )
+        if any(key.startswith(State.APP_PREFIX) for key in delta):
+            _write_json(
+                self.root_dir / _safe_name(app_name) / _APP_STATE_FILE,
+                self.app_state.get(app_name, {}),
+            )
+
+    def _load_scoped_state(self, app_name: str, user_id: str) -> None:
+        """Bring the learner's (and app's) state record into memory if it is not there."""
+        if user_id not in self.user_state.get(app_name, {}):
+            path = self._directory(app_name, user_id) / _USER_STATE_FILE
+            if path.exists():
+                self.user_state.setdefault(app_name, {})[user_id] = json.loads(
+                    path.read_text(encoding="utf-8")
+                )["state"]
+        if app_name not in self.app_state:
+            path = self.root_dir / _safe_name(app_name) / _APP_STATE_FILE
+            if path.exists():
+                self.app_state[app_name] = json.loads(path.read_text(encoding="utf-8"))
+
+    def iter_user_states(self, app_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(user_id, user: state without the prefix) of every learner with a record."""
+        resident = self.user_state.get(app_name, {})
+        for path in (self.root_dir / _safe_name(app_name)).glob(f"*/{_USER_STATE_FILE}"):
+            record = json.loads(path.read_text(encoding="utf-8"))
+            user_id = record["user_id"]
+            yield user_id, resident.get(user_id, record["state"])
+
+    def release_user(self, app_name: str, user_id: str) -> int:
+        """
+        Snapshot and drop all of a learner's resident sessions and their user:
+        state, e.g. before another process takes the learner over; everything
+        stays on disk. Returns the number of sessions released.
+        """
+        keys = [key for key in self._resident if key[:2] == (app_name, user_id)]
+        for key in keys:
+            self._evict(key)
+        return len(keys)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.reloads
+        reloads = sorted(self._reload_s)
+
+        def percentile(q: float) -> float:
+            if not reloads:
+                return 0.0
+            return round(reloads[min(len(reloads) - 1, int(q * len(reloads)))] * 1000, 3)
+
+        return {
+            "resident": len(self._resident),
+            "resident_bytes": self._resident_bytes,
+            "max_resident": self.max_resident,
+            "max_resident_bytes": self.max_resident_bytes,
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_found": self.not_found,
+            "evictions": self.evictions,
+            "user_state_spills": self.user_state_spills,
+            "reload_ms_p50": percentile(0.5),
+            "reload_ms_p95": percentile(0.95),
+            "reload_ms_max": round(reloads[-1] * 1000, 3) if reloads else 0.0,
+        }
+
+    # --- session service ----------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        self._load_scoped_state(app_name, user_id)
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        if state:
+            self._commit_scoped_state(app_name, user_id, state)
+        size = self._snapshot(session, self._log(app_name, user_id, session.id))
+        self._touch((app_name, user_id, session.id), size=size)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if not event.partial and not self._is_resident(
+            session.app_name, session.user_id, session.id
+        ):
+            # Spilled while the caller still held it (e.g. mid-turn).
+            await self.resume_session(
+                app_name=session.app_name, user_id=session.user_id, session_id=session.id
+            )
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        if event.actions is not None and event.actions.state_delta:
+            self._commit_scoped_state(
+                session.app_name, session.user_id, event.actions.state_delta
+            )
+        log = self._log(*key)
+        size = log.append(event)
+        compacted = event.actions is not None and event.actions.compaction is not None
+        if compacted or log.events_since_snapshot >= self.snapshot_every:
+            self._touch(key, size=self._snapshot(session, log))
+        else:
+            self._touch(key, grow=size)
+        return event
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        if self._is_resident(app_name, user_id, session_id):
+            self.hits += 1
+            self._touch((app_name, user_id, session_id))
+        elif await self.resume_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        ) is None:
+            self.not_found += 1
+            return None
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    async def resume_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> Optional[Session]:
+        """Load the latest snapshot and replay the log tail after it."""
+        start = time.perf_counter()
+        key = (app_name, user_id, session_id)
+        log = self._logs.get(key) or SessionEventLog(
+            self._directory(app_name, user_id), session_id
+        )
+        snapshot = log.read_snapshot()
+        if snapshot is None:
+            return None
+        self._logs[key] = log
+
+        # The learner's user: and app: state come from their own records,
+        # never from this session's (possibly older) snapshot or log.
+        self._load_scoped_state(app_name, user_id)
+        state = _session_keys(snapshot["state"])
+
+        # Bypass our own create/append so nothing is logged twice.
+        session = await super().create_session(
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+        storage = self._storage(session)
+        storage.events = [Event.model_validate(raw) for raw in snapshot["events"]]
+
+        replayed = 0
+        for event in log.read_events(snapshot["log_offset"]):
+            if event.actions is not None and event.actions.state_delta:
+                event.actions.state_delta = _session_keys(event.actions.state_delta)
+            await super().append_event(storage, event)
+            replayed += 1
+        log.events_since_snapshot = replayed
+        storage.events = compaction_window(storage.events)
+        size = log.snapshot_path.stat().st_size + log.offset - snapshot["log_offset"]
+        self._touch(key, size=size)
+        self.reloads += 1
+        self._reload_s.append(time.perf_counter() - start)
+        logger.debug(
+            "[SESSION_LOG] resumed session=%s window=%d replayed=%d",
+            session_id,
+            len(storage.events),
+            replayed,
+        )
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        """
+        Resident sessions plus, for one user, the spilled ones on disk (listed
+        by their snapshot file, without state).
+        """
+        response = await super().list_sessions(app_name=app_name, user_id=user_id)
+        if user_id is None:
+            return response
+        listed = {session.id for session in response.sessions}
+        directory = self._directory(app_name, user_id)
+        if directory.is_dir():
+            for path in directory.glob("*.snap"):
+                if path.stem not in listed:
+                    response.sessions.append(
+                        Session(
+                            id=path.stem,
+                            app_name=app_name,
+                            user_id=user_id,
+                            last_update_time=path.stat().st_mtime,
+                        )
+                    )
+        response.sessions.sort(key=lambda session: (session.last_update_time, session.id))
+        return response
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        if self._is_resident(app_name, user_id, session_id):
+            await super().delete_session(
+                app_name=app_name, user_id=user_id, session_id=session_id
+            )
+        self._resident_bytes -= self._resident.pop((app_name, user_id, session_id), 0)
+        log = self._logs.pop((app_name, user_id, session_id), None)
+        if log is None:
+            log = SessionEventLog(self._directory(app_name, user_id), session_id)
+        log.delete()
+
+    def close(self) -> None:
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
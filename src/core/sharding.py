@@ -0,0 +1,56 @@
+"""
+Consistent hashing of learners onto worker processes.
+
+Each worker owns many points ("virtual nodes") on a hash ring; a user_id maps
+to the first point clockwise from its own hash. Adding or removing a worker
+only moves the users between that worker's points and their predecessors,
+roughly 1/N of them, so most learners keep their `user:` state where it is.
+"""
+
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Maps keys to node names; stable under node additions and removals."""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64) -> None:
+        self.vnodes = vnodes
+        self._points: List[Tuple[int, str]] = []
+        self._nodes: Dict[str, None] = {}
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            return
+        self._nodes[node] = None
+        for replica in range(self.vnodes):
+            bisect.insort(self._points, (_hash(f"{node}#{replica}"), node))
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            return
+        del self._nodes[node]
+        self._points = [point for point in self._points if point[1] != node]
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("The hash ring has no nodes.")
+        index = bisect.bisect(self._points, (_hash(key), ""))
+        return self._points[index % len(self._points)][1]
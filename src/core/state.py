@@ -7,11 +7,25 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-from src.core.models import StudentProfile, StudentProgress, TopicStats
+from src.core.models import (
+    ExerciseRecord,
+    ExerciseTable,
+    StudentProfile,
+    StudentProgress,
+    TopicStats,
+)
+from src.core.review_scheduler import ReviewSchedule
 
 
 STATE_KEY_PROFILE = "user:student_profile"
 STATE_KEY_PROGRESS = "user:student_progress"
+STATE_KEY_PENDING_GRADING = "user:pending_grading"
+STATE_KEY_SEEN_EXERCISES = "user:seen_exercise_ids"
+STATE_KEY_REVIEW_SCHEDULE = "user:review_schedule"
+# Per-key write counters for the user-scoped values the tools update.
+STATE_KEY_VERSIONS = "user:state_versions"
+# Session-scoped: "Q1" refers to a question set in this conversation.
+STATE_KEY_EXERCISE_TABLE = "exercise_table"
 
 
 def load_profile(state: Dict[str, Any]) -> Optional[StudentProfile]:
@@ -75,3 +89,54 @@ def save_progress(progress: StudentProgress, state: Dict[str, Any]) -> None:
         "topics": topics_dict,
         "difficulty_history": list(progress.difficulty_history),
     }
+
+
+def load_review_schedule(state: Dict[str, Any]) -> ReviewSchedule:
+    """Load the learner's ReviewSchedule from state, or create an empty one."""
+    return ReviewSchedule.from_state(state.get(STATE_KEY_REVIEW_SCHEDULE))
+
+
+def save_review_schedule(schedule: ReviewSchedule, state: Dict[str, Any]) -> None:
+    """Persist the ReviewSchedule into the state."""
+    state[STATE_KEY_REVIEW_SCHEDULE] = schedule.to_state()
+
+
+def load_exercise_table(state: Dict[str, Any]) -> ExerciseTable:
+    """Load the session's ExerciseTable from state, or create an empty one."""
+    raw = state.get(STATE_KEY_EXERCISE_TABLE)
+    if not isinstance(raw, dict):
+        return ExerciseTable()
+
+    records = [
+        ExerciseRecord(
+            exercise_id=str(item.get("id", "")),
+            label=str(item.get("label", "")),
+            lesson=int(item.get("lesson", 0)),
+            topic=str(item.get("topic", "")),
+            difficulty=str(item.get("difficulty", "")),
+            question=str(item.get("question", "")),
+            hint=str(item.get("hint", "")),
+        )
+        for item in raw.get("records", [])
+        if isinstance(item, dict)
+    ]
+    return ExerciseTable(records=records, lessons=int(raw.get("lessons", 0)))
+
+
+def save_exercise_table(table: ExerciseTable, state: Dict[str, Any]) -> None:
+    """Persist the ExerciseTable into the state."""
+    state[STATE_KEY_EXERCISE_TABLE] = {
+        "lessons": table.lessons,
+        "records": [
+            {
+                "id": record.exercise_id,
+                "label": record.label,
+                "lesson": record.lesson,
+                "topic": record.topic,
+                "difficulty": record.difficulty,
+                "question": record.question,
+                "hint": record.hint,
+            }
+            for record in table.records
+        ],
+    }
@@ -0,0 +1,360 @@
+"""
+Offline stand-in for the Gemini backend.
+
+StubLlm answers every request locally, so the agent tree, the runner and the
+model-call policies in `src/core/llm.py` can be exercised without an API key.
+Latency (including prefill time per prompt token), connection setup, response
+content, injected failures, a server-side quota and server-side cached
+content can all be simulated. Like the real backend, text beyond
+`max_output_tokens` is cut off.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import itertools
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+
+# (request, agent_name) -> response
+StubResponder = Callable[[LlmRequest, str], LlmResponse]
+
+_default_responder: Optional[StubResponder] = None
+
+
+def set_default_responder(responder: Optional[StubResponder]) -> None:
+    """Install the responder used by stub models that do not set their own."""
+    global _default_responder
+    _default_responder = responder
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _config_text(config: Optional[genai_types.GenerateContentConfig]) -> List[str]:
+    chunks: List[str] = []
+    if config is None:
+        return chunks
+    if isinstance(config.system_instruction, str):
+        chunks.append(config.system_instruction)
+    for tool in config.tools or []:
+        if isinstance(tool, genai_types.Tool):
+            chunks.append(tool.model_dump_json(exclude_none=True))
+    return chunks
+
+
+def prefix_text(config: Optional[genai_types.GenerateContentConfig]) -> str:
+    """The static part of a request: system instruction + tool declarations."""
+    return "\n".join(_config_text(config))
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    """Concatenate all text in the request (instruction, tools and contents)."""
+    chunks = _config_text(llm_request.config)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chunks.append(part.text)
+            elif part.function_call or part.function_response:
+                chunks.append(str(part.function_call or part.function_response))
+    return "\n".join(chunks)
+
+
+def last_user_text(llm_request: LlmRequest) -> str:
+    """Return the text of the most recent user turn, if any."""
+    for content in reversed(llm_request.contents):
+        if content.role != "user":
+            continue
+        texts = [part.text for part in content.parts or [] if part.text]
+        if texts:
+            return "\n".join(texts)
+    return ""
+
+
+def text_response(text: str, llm_request: Optional[LlmRequest] = None) -> LlmResponse:
+    """Build a final text LlmResponse with estimated usage metadata."""
+    prompt_tokens = estimate_tokens(request_text(llm_request)) if llm_request else 0
+    response_tokens = estimate_tokens(text)
+    return LlmResponse(
+        content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+        usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=response_tokens,
+            total_token_count=prompt_tokens + response_tokens,
+        ),
+    )
+
+
+def echo_responder(llm_request: LlmRequest, agent_name: str) -> LlmResponse:
+    """Default behavior: a short, deterministic text reply."""
+    user_text = last_user_text(llm_request).strip().replace("\n", " ")
+    return text_response(
+        f"[{agent_name or 'stub'}] reply to: {user_text[:120]}",
+        llm_request,
+    )
+
+
+class SimulatedQuota:
+    """
+    Server-side quota emulation: a token bucket of requests that raises a
+    429 ClientError once exhausted, like the real API does.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate_per_s = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate_per_s)
+        self._available = self.capacity
+        self._clock = clock
+        self._last = clock()
+        self.accepted = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        now = self._clock()
+        self._available = min(
+            self.capacity, self._available + (now - self._last) * self.rate_per_s
+        )
+        self._last = now
+        if self._available < 1:
+            self.rejected += 1
+            raise genai_errors.ClientError(
+                429,
+                {
+                    "error": {
+                        "code": 429,
+                        "message": "Simulated quota exhausted.",
+                        "status": "RESOURCE_EXHAUSTED",
+                    }
+                },
+            )
+        self._available -= 1
+        self.accepted += 1
+
+
+class SimulatedConnections:
+    """
+    Connection setup emulation (client creation, TCP and TLS handshakes): the
+    first request to a model from an event loop pays `setup_s`, and requests
+    arriving meanwhile wait for that same connection, like a shared pool.
+    """
+
+    def __init__(self, setup_s: float = 0.0) -> None:
+        self.setup_s = setup_s
+        self._pools: Dict[Tuple[int, str], "asyncio.Future[None]"] = {}
+        self.opened = 0
+
+    async def acquire(self, model: str) -> None:
+        if self.setup_s <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        key = (id(loop), model)
+        pool = self._pools.get(key)
+        if pool is not None:
+            await asyncio.shield(pool)
+            return
+        pool = self._pools[key] = loop.create_future()
+        try:
+            await asyncio.sleep(self.setup_s)
+        except BaseException:
+            del self._pools[key]
+            pool.cancel()
+            raise
+        self.opened += 1
+        pool.set_result(None)
+
+
+def _client_error(code: int, status: str, message: str) -> genai_errors.ClientError:
+    return genai_errors.ClientError(
+        code, {"error": {"code": code, "message": message, "status": status}}
+    )
+
+
+def _cache_not_found() -> genai_errors.ClientError:
+    return _client_error(
+        403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)"
+    )
+
+
+class SimulatedCachedContent:
+    """
+    Server-side cached-content emulation: prefixes are stored with a TTL and
+    a minimum size, and referencing a missing or expired cache fails with a
+    403 ClientError, like the real API does.
+    """
+
+    def __init__(self, min_tokens: int = 0, clock: Callable[[], float] = time.time) -> None:
+        self.min_tokens = min_tokens
+        self._clock = clock
+        self._ids = itertools.count(1)
+        # name -> (prefix tokens, expire time)
+        self._entries: Dict[str, Tuple[int, float]] = {}
+
+    async def create(
+        self, model: str, config: genai_types.GenerateContentConfig, ttl_s: float
+    ) -> Tuple[str, int, float]:
+        tokens = estimate_tokens(prefix_text(config))
+        if tokens < self.min_tokens:
+            raise _client_error(
+                400,
+                "INVALID_ARGUMENT",
+                f"Cached content is too small. total_token_count={tokens}, "
+                f"min_total_token_count={self.min_tokens}",
+            )
+        name = f"cachedContents/stub-{next(self._ids)}"
+        expire_time = self._clock() + ttl_s
+        self._entries[name] = (tokens, expire_time)
+        return name, tokens, expire_time
+
+    async def refresh(self, name: str, ttl_s: float) -> float:
+        tokens = self.lookup(name)
+        expire_time = self._clock() + ttl_s
+        self._entries[name] = (tokens, expire_time)
+        return expire_time
+
+    async def delete(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+    def lookup(self, name: str) -> int:
+        """Token count of a live cache; raises like the API if it is gone."""
+        entry = self._entries.get(name)
+        if entry is None or entry[1] <= self._clock():
+            self._entries.pop(name, None)
+            raise _cache_not_found()
+        return entry[0]
+
+
+def _with_usage(
+    llm_response: LlmResponse, llm_request: LlmRequest, cached_tokens: int
+) -> LlmResponse:
+    """Ensure usage metadata is present and counts the cached prefix."""
+    usage = llm_response.usage_metadata
+    if usage is None:
+        parts = llm_response.content.parts if llm_response.content else None
+        response_tokens = sum(
+            estimate_tokens(part.text or str(part.function_call or "")) for part in parts or []
+        )
+        prompt_tokens = estimate_tokens(request_text(llm_request))
+        usage = genai_types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=response_tokens,
+            total_token_count=prompt_tokens + response_tokens,
+        )
+    if cached_tokens:
+        usage = usage.model_copy(
+            update={
+                "prompt_token_count": (usage.prompt_token_count or 0) + cached_tokens,
+                "cached_content_token_count": cached_tokens,
+                "total_token_count": (usage.total_token_count or 0) + cached_tokens,
+            }
+        )
+    return llm_response.model_copy(update={"usage_metadata": usage})
+
+
+def _capped(llm_response: LlmResponse, max_output_tokens: int) -> LlmResponse:
+    """Cut text off at `max_output_tokens`, as the backend does (MAX_TOKENS)."""
+    usage = llm_response.usage_metadata
+    output_tokens = usage.candidates_token_count or 0
+    if output_tokens <= max_output_tokens or llm_response.content is None:
+        return llm_response
+    budget = max_output_tokens * 4
+    parts = []
+    for part in llm_response.content.parts or []:
+        if part.text is not None:
+            part = part.model_copy(update={"text": part.text[:budget]})
+            budget -= len(part.text)
+        parts.append(part)
+    return llm_response.model_copy(
+        update={
+            "content": llm_response.content.model_copy(update={"parts": parts}),
+            "finish_reason": genai_types.FinishReason.MAX_TOKENS,
+            "usage_metadata": usage.model_copy(
+                update={
+                    "candidates_token_count": max_output_tokens,
+                    "total_token_count": (usage.total_token_count or 0)
+                    - output_tokens
+                    + max_output_tokens,
+                }
+            ),
+        }
+    )
+
+
+class StubLlm(BaseLlm):
+    """Local model that never leaves the process."""
+
+    agent_name: str = ""
+    latency_s: float = 0.0
+    latency_sampler: Optional[Callable[[], float]] = None
+    responder: Optional[StubResponder] = None
+    quota: Optional[SimulatedQuota] = None
+    # Fault injection: fraction of calls that fail with a 5xx ServerError.
+    failure_rate: float = 0.0
+    failure_code: int = 503
+    # Time to process the uncached prompt before the first token.
+    prefill_s_per_1k_tokens: float = 0.0
+    # Server-side store for requests that reference `config.cached_content`.
+    cached_contents: Optional[SimulatedCachedContent] = None
+    # Process-wide connection pools; the first call per model pays the setup.
+    connections: Optional[SimulatedConnections] = None
+    call_count: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.call_count += 1
+        if self.quota is not None:
+            self.quota.check()
+
+        cached_tokens = 0
+        cache_name = llm_request.config.cached_content if llm_request.config else None
+        if cache_name:
+            if self.cached_contents is None:
+                raise _cache_not_found()
+            cached_tokens = self.cached_contents.lookup(cache_name)
+
+        if self.connections is not None:
+            await self.connections.acquire(self.model)
+
+        delay = self.latency_sampler() if self.latency_sampler else self.latency_s
+        if self.prefill_s_per_1k_tokens:
+            uncached_tokens = estimate_tokens(request_text(llm_request))
+            delay += uncached_tokens / 1000 * self.prefill_s_per_1k_tokens
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise genai_errors.ServerError(
+                self.failure_code,
+                {
+                    "error": {
+                        "code": self.failure_code,
+                        "message": "Injected backend failure.",
+                        "status": "UNAVAILABLE",
+                    }
+                },
+            )
+
+        responder = self.responder or _default_responder or echo_responder
+        llm_response = _with_usage(
+            responder(llm_request, self.agent_name), llm_request, cached_tokens
+        )
+        max_output_tokens = llm_request.config.max_output_tokens if llm_request.config else None
+        if max_output_tokens:
+            llm_response = _capped(llm_response, max_output_tokens)
+        yield llm_response
@@ -3,27 +3,45 @@ Custom ADK tools that:
 - update the StudentProfile
 - record exercise results
 - choose the next exercise difficulty
+- schedule topic reviews and suggest what to review next
 
 The tools rely on the domain models, state helpers, and difficulty strategy.
+Topics are canonicalized per learner so that spelling variants of the same
+concept share one TopicStats entry.
+
+The tools are registered as coroutines (see `user_state.async_tool`): updates
+of a learner's state are serialized across their sessions and the work runs
+on a bounded thread pool instead of the event loop. TUTOR_ASYNC_TOOLS=false
+registers the plain functions.
 """
 
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict
 
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools.function_tool import FunctionTool
 
+from src.config import config
 from src.core.difficulty_strategy import AccuracyBasedDifficultyStrategy
 from src.core.models import StudentProfile
+from src.core.review_scheduler import review_index
 from src.core.state import (
+    STATE_KEY_PROFILE,
+    STATE_KEY_PROGRESS,
+    STATE_KEY_REVIEW_SCHEDULE,
     load_profile,
     load_progress,
+    load_review_schedule,
     save_profile,
     save_progress,
+    save_review_schedule,
 )
+from src.core.topic_index import topic_canonicalizer
+from src.core.user_state import async_tool
 
 
 logger = logging.getLogger("agentic_ai_tutor_with_gooleadk.tools")
@@ -75,9 +93,17 @@ def record_exercise_result(
     state = tool_context.state
     progress = load_progress(state)
 
+    topic = topic_canonicalizer.canonicalize(
+        tool_context.user_id, topic, progress.topics.keys()
+    )
     progress.record_result(topic=topic, difficulty=difficulty, was_correct=was_correct)
     save_progress(progress, state)
 
+    schedule = load_review_schedule(state)
+    review = schedule.record(topic, difficulty, was_correct)
+    save_review_schedule(schedule, state)
+    review_index.update(tool_context.user_id, topic, review.due)
+
     topic_accuracy = progress.topics[topic].accuracy
     logger.info(
         "Tool(record_exercise_result): topic=%s difficulty=%s correct=%s "
@@ -91,9 +117,11 @@ def record_exercise_result(
 
     return {
         "status": "success",
+        "topic": topic,
         "overall_accuracy": progress.overall_accuracy,
         "topic_accuracy": topic_accuracy,
         "total_attempts": progress.total_attempts,
+        "next_review_in_days": review.interval_days,
     }
 
 
@@ -107,6 +135,14 @@ def get_next_exercise_difficulty(
     state = tool_context.state
     progress = load_progress(state)
 
+    # Only match against known topics here; a topic is registered once a
+    # result is recorded for it.
+    known_topic = topic_canonicalizer.lookup(
+        tool_context.user_id, topic, progress.topics.keys()
+    )
+    if known_topic is not None:
+        topic = known_topic
+
     difficulty = _difficulty_strategy.choose_difficulty(topic, progress)
     reason = "Difficulty chosen by accuracy-based strategy."
 
@@ -124,7 +160,47 @@ def get_next_exercise_difficulty(
     }
 
 
+def suggest_review_topic(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Suggest the topic this learner should review next (spaced repetition).
+    """
+    schedule = load_review_schedule(tool_context.state)
+    review_index.sync(tool_context.user_id, schedule)
+
+    now = time.time()
+    next_due = schedule.next_due()
+    if next_due is None:
+        return {
+            "status": "success",
+            "topic": None,
+            "reason": "No exercises recorded yet, so nothing is scheduled for review.",
+        }
+
+    topic, item = next_due
+    due_topics = schedule.due(now)
+    logger.info(
+        "Tool(suggest_review_topic): topic=%s due_now=%d", topic, len(due_topics)
+    )
+
+    return {
+        "status": "success",
+        "topic": topic,
+        "is_due": item.due <= now,
+        "due_in_hours": round((item.due - now) / 3600, 1),
+        "due_topics": due_topics[:5],
+        "lapses": item.lapses,
+    }
+
+
+def _tool(func: Callable[..., Dict[str, Any]], *keys: str) -> FunctionTool:
+    """Register `func`, async with the `user:` keys it reads or writes when enabled."""
+    return FunctionTool(func=async_tool(func, keys) if config.async_tools else func)
+
+
 # FunctionTool wrappers for ADK registration
-update_student_profile_tool = FunctionTool(func=update_student_profile)
-record_exercise_result_tool = FunctionTool(func=record_exercise_result)
-get_next_exercise_difficulty_tool = FunctionTool(func=get_next_exercise_difficulty)
+update_student_profile_tool = _tool(update_student_profile, STATE_KEY_PROFILE)
+record_exercise_result_tool = _tool(
+    record_exercise_result, STATE_KEY_PROGRESS, STATE_KEY_REVIEW_SCHEDULE
+)
+get_next_exercise_difficulty_tool = _tool(get_next_exercise_difficulty, STATE_KEY_PROGRESS)
+suggest_review_topic_tool = _tool(suggest_review_topic, STATE_KEY_REVIEW_SCHEDULE)
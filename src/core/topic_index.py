@@ -0,0 +1,358 @@
+"""
+Canonicalization of free-text topic names.
+
+The LLM passes topics to the progress tools as free text, so the same concept
+shows up as "Q-learning", "q learning" or "Q-Learning basics". This module maps
+those variants onto a single key per learner using:
+  - normalization (case, punctuation, filler words, simple plurals)
+  - an alias table for common abbreviations
+  - a trigram index for fuzzy matching against the learner's existing topics
+"""
+
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+# Words that describe the *kind* of lesson rather than the topic itself.
+_FILLER_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "of",
+        "to",
+        "in",
+        "on",
+        "for",
+        "about",
+        "algorithm",
+        "basics",
+        "basic",
+        "intro",
+        "introduction",
+        "fundamentals",
+        "overview",
+        "concepts",
+        "concept",
+        "simple",
+        "simply",
+    }
+)
+
+# Normalized alias -> normalized canonical topic.
+DEFAULT_TOPIC_ALIASES: Dict[str, str] = {
+    "rl": "reinforcement learning",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nn": "neural network",
+    "nns": "neural network",
+    "llm": "large language model",
+    "llms": "large language model",
+    "dqn": "deep q network",
+    "q learn": "q learning",
+    "qlearning": "q learning",
+    "mdp": "markov decision process",
+    "mdps": "markov decision process",
+    "sgd": "stochastic gradient descent",
+    "backprop": "backpropagation",
+    "cnn": "convolutional neural network",
+    "rnn": "recurrent neural network",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _singularize(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=16384)
+def normalize_topic(topic: str) -> str:
+    """
+    Reduce a topic to a comparable form.
+
+    "Q-Learning basics" -> "q learning", "Gradients" -> "gradient".
+    Falls back to the plain lowercased form if only filler words remain.
+    """
+    text = unicodedata.normalize("NFKD", topic)
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    words = [w for w in _NON_ALNUM.split(text) if w]
+
+    kept = [_singularize(w) for w in words if w not in _FILLER_WORDS]
+    if not kept:
+        kept = words
+    return " ".join(kept)
+
+
+def canonical_topic_form(topic: str) -> str:
+    """Normalized, alias-resolved form of a topic, usable as a cache key."""
+    normalized = normalize_topic(topic)
+    return DEFAULT_TOPIC_ALIASES.get(normalized, normalized)
+
+
+# Request phrasing around the topic: "Explain Q-learning to me in simple terms".
+_REQUEST_PREFIX = re.compile(
+    r"^(?:(?:hi|hello|hey|please|can you|could you|i want to|i'd like to|"
+    r"help me|teach me|explain|learn|understand|tell me about|what is|what are|"
+    r"give me|an?|the|about|with|more on|how does|how do)\b[\s,]*)+",
+    re.IGNORECASE,
+)
+_REQUEST_SUFFIX = re.compile(
+    r"(?:\s+(?:to me|for me|please|in simple terms|simply|in detail|"
+    r"step by step|with examples?|works?))+[\s.?!]*$",
+    re.IGNORECASE,
+)
+# Follow-ups or personal messages that only make sense in their conversation.
+_CONTEXTUAL_WORDS = frozenset(
+    {
+        "it", "this", "that", "these", "those", "again", "step", "previous",
+        "above", "last", "i", "me", "my", "we", "our", "you", "your",
+    }
+)
+
+
+def topic_from_request(message: str) -> Optional[str]:
+    """
+    Extract the topic from a short, self-contained learning request.
+
+    Returns None for follow-ups that depend on earlier turns
+    ("explain step 2 again") or for messages that are too long to be a
+    plain topic request.
+    """
+    text = message.strip().rstrip(".?!")
+    text = _REQUEST_PREFIX.sub("", text)
+    text = _REQUEST_SUFFIX.sub("", text).strip(" .?!,")
+
+    words = normalize_topic(text).split() if text else []
+    if not words or len(words) > 8 or _CONTEXTUAL_WORDS.intersection(words):
+        return None
+    return text
+
+
+@lru_cache(maxsize=16384)
+def _trigrams(normalized: str) -> FrozenSet[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _words_compatible(query: List[str], candidate: List[str]) -> bool:
+    """
+    Fuzzy matches must line up word by word, so typos ("q lerning") match
+    but reordered or extended phrases ("attention actor learning") do not.
+    """
+    if len(query) != len(candidate):
+        return False
+    for left, right in zip(query, candidate):
+        if left == right:
+            continue
+        left_grams, right_grams = _trigrams(left), _trigrams(right)
+        shared = len(left_grams & right_grams)
+        if shared / (len(left_grams) + len(right_grams) - shared) < 0.4:
+            return False
+    return True
+
+
+class TopicIndex:
+    """
+    Index of one learner's known topics.
+
+    Exact normalized and alias matches are O(1); fuzzy matches only score the
+    topics that share at least one trigram with the query.
+    """
+
+    def __init__(
+        self,
+        topics: Iterable[str] = (),
+        aliases: Optional[Mapping[str, str]] = None,
+        min_similarity: float = 0.6,
+        cache_size: int = 1024,
+    ) -> None:
+        self.aliases: Mapping[str, str] = (
+            DEFAULT_TOPIC_ALIASES if aliases is None else aliases
+        )
+        self.min_similarity = min_similarity
+        self._by_normalized: Dict[str, str] = {}
+        self._keys: Set[str] = set()
+        self._postings: Dict[str, Set[str]] = {}
+        self._cache: "OrderedDict[str, Tuple[int, Optional[str]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._generation = 0
+
+        for topic in topics:
+            self.add(topic)
+
+    def __len__(self) -> int:
+        return len(self._by_normalized)
+
+    @property
+    def key_count(self) -> int:
+        """Number of distinct raw keys seen, including merged duplicates."""
+        return len(self._keys)
+
+    def __contains__(self, topic: str) -> bool:
+        return self._resolve_alias(normalize_topic(topic)) in self._by_normalized
+
+    def _resolve_alias(self, normalized: str) -> str:
+        return self.aliases.get(normalized, normalized)
+
+    def add(self, topic: str) -> None:
+        """Register an existing topic key (first spelling wins)."""
+        self._keys.add(topic)
+        normalized = self._resolve_alias(normalize_topic(topic))
+        if normalized in self._by_normalized:
+            return
+
+        self._by_normalized[normalized] = topic
+        for gram in _trigrams(normalized):
+            self._postings.setdefault(gram, set()).add(normalized)
+        self._generation += 1
+
+    def sync(self, topics: AbstractSet[str]) -> int:
+        """Register the keys in `topics` not seen yet; returns how many."""
+        # `<=` on a dict keys view checks membership without copying it.
+        if topics <= self._keys:
+            return 0
+        missing = topics - self._keys
+        for topic in missing:
+            self.add(topic)
+        return len(missing)
+
+    def lookup(self, topic: str) -> Optional[str]:
+        """Return the existing topic key that matches `topic`, if any."""
+        cached = self._cache.get(topic)
+        # Misses are only valid until the next topic is added.
+        if cached is not None and (
+            cached[1] is not None or cached[0] == self._generation
+        ):
+            self._cache.move_to_end(topic)
+            return cached[1]
+
+        result = self._lookup_uncached(topic)
+
+        self._cache[topic] = (self._generation, result)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _lookup_uncached(self, topic: str) -> Optional[str]:
+        normalized = self._resolve_alias(normalize_topic(topic))
+        exact = self._by_normalized.get(normalized)
+        if exact is not None or not normalized:
+            return exact
+
+        best = self._best_fuzzy_match(normalized)
+        return self._by_normalized[best] if best is not None else None
+
+    def _best_fuzzy_match(self, normalized: str) -> Optional[str]:
+        query_grams = _trigrams(normalized)
+        query_size = len(query_grams)
+        threshold = self.min_similarity
+
+        # Prefix filter: a candidate reaching `threshold` must share at least
+        # `min_overlap` trigrams, so it must contain one of the rarest
+        # `query_size - min_overlap + 1` query trigrams.
+        min_overlap = math.ceil(threshold * query_size)
+        rarest = sorted(query_grams, key=lambda g: len(self._postings.get(g, ())))
+        candidates: Set[str] = set()
+        for gram in rarest[: query_size - min_overlap + 1]:
+            candidates.update(self._postings.get(gram, ()))
+
+        query_words = normalized.split()
+        best: Optional[str] = None
+        best_score = threshold
+        for candidate in candidates:
+            candidate_grams = _trigrams(candidate)
+            if not (
+                threshold * query_size <= len(candidate_grams) <= query_size / threshold
+            ):
+                continue
+            shared = len(query_grams & candidate_grams)
+            score = shared / (query_size + len(candidate_grams) - shared)
+            if score >= best_score and _words_compatible(query_words, candidate.split()):
+                best, best_score = candidate, score
+        return best
+
+    def canonicalize(self, topic: str) -> str:
+        """
+        Map `topic` onto an existing key, or register it as a new one.
+
+        New topics keep the learner-facing spelling unless they are a known
+        alias, in which case the alias target becomes the key.
+        """
+        existing = self.lookup(topic)
+        if existing is not None:
+            return existing
+
+        normalized = normalize_topic(topic)
+        key = self.aliases.get(normalized) or topic.strip()
+        self.add(key)
+        return key
+
+
+class TopicCanonicalizer:
+    """
+    Keeps a bounded set of per-user TopicIndex objects so the tools do not
+    rebuild the index on every call. Thread-safe: async tools run on a pool.
+    """
+
+    def __init__(self, max_users: int = 1024, **index_kwargs) -> None:
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[str, TopicIndex]" = OrderedDict()
+        self._max_users = max_users
+        self._index_kwargs = index_kwargs
+
+    def index_for(self, user_id: str, known_topics: Iterable[str]) -> TopicIndex:
+        """
+        Return the user's index, synced with the topics stored in state.
+
+        The index can hold keys that state does not (a registration whose
+        event was never saved, another runner for the same user), so the
+        keys in state it has not seen are added rather than comparing counts.
+        """
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = TopicIndex(**self._index_kwargs)
+            self._indexes[user_id] = index
+            if len(self._indexes) > self._max_users:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(user_id)
+
+        # The tools pass `progress.topics.keys()`, already a set view.
+        if not isinstance(known_topics, AbstractSet):
+            known_topics = set(known_topics)
+        index.sync(known_topics)
+        return index
+
+    def canonicalize(
+        self,
+        user_id: str,
+        topic: str,
+        known_topics: Iterable[str],
+    ) -> str:
+        """Return the canonical topic key for this user."""
+        with self._lock:
+            return self.index_for(user_id, known_topics).canonicalize(topic)
+
+    def lookup(
+        self,
+        user_id: str,
+        topic: str,
+        known_topics: Iterable[str],
+    ) -> Optional[str]:
+        """Return the matching existing topic key without registering a new one."""
+        with self._lock:
+            return self.index_for(user_id, known_topics).lookup(topic)
+
+
+topic_canonicalizer = TopicCanonicalizer()
@@ -0,0 +1,446 @@
+"""
+On-demand per-turn CPU profiling.
+
+`profiled_run(runner, ...)` is a drop-in for `runner.run_async`. When
+`turn_profiler` selects a turn (its session was switched on, or the turn
+falls in the sampled fraction), the turn's CPU-side work is profiled and one
+report per turn is written under `<profile_dir>/<session_id>/`:
+
+  - cprofile:  deterministic; `<turn>-<invocation_id>.pstats` (pstats,
+               snakeviz)
+  - sampling:  a thread samples the event-loop thread's stack every few
+               milliseconds; `<turn>-<invocation_id>.collapsed` in
+               collapsed-stack format (flamegraph.pl, speedscope), each stack
+               rooted at the agent that was running
+
+plus `<turn>-<invocation_id>.json`: the invocation id, the agents that ran
+(from the callback context, via `TurnProfilerPlugin`) with their start
+offsets, and time per layer: model client, ADK plumbing (google.adk,
+pydantic), state encode/decode (src/core/state.py, src/core/models.py), our
+callbacks and tools (the rest of src/), lazy imports, waiting on I/O, and
+other. Time in builtins is charged to the layer of their callers.
+
+Tool bodies run on the `tutor-tool` pool (see `user_state.async_tool`), not
+on the event loop. During a profiled turn, the turn's own tool calls are
+profiled in their pool thread and merged into the report (cprofile), or
+their thread is sampled too, with its stacks tagged `thread:tool`. Their
+time then overlaps the loop's `io_wait`, so the layers can add up to more
+than the wall time.
+
+Python has one profiler hook per thread and every coroutine on the event
+loop shares it, so work of other sessions interleaved with the profiled turn
+is included. One turn is profiled at a time; turns selected while another is
+profiled run unprofiled and are counted as skipped. Profile at low
+concurrency for clean reports.
+"""
+
+
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, Optional, Set
+
+from google.genai import types as genai_types
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.plugins.base_plugin import BasePlugin
+
+from src.config import config
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.turn_profiler")
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+_LAYERS = (
+    ("import", ("<frozen importlib", "importlib/")),
+    ("state", ("src/core/state.py", "src/core/models.py")),
+    ("model", ("google/genai/", "httpx/", "httpcore/", "h2/", "ssl.py", "src/core/stub_llm.py")),
+    ("adk", ("google/adk/", "pydantic/", "pydantic_core/")),
+    ("app", ("src/",)),
+)
+_IO_WAIT = re.compile(r"<method '(poll|select|epoll)")
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+def layer_of(filename: str, function: str = "") -> str:
+    """The layer a function's own time is charged to."""
+    path = filename.replace("\\", "/")
+    if _IO_WAIT.match(function) or (path.endswith("selectors.py") and function == "select"):
+        return "io_wait"
+    for layer, markers in _LAYERS:
+        if any(marker in path for marker in markers):
+            return layer
+    return "other"
+
+
+def _short(filename: str) -> str:
+    path = filename.replace("\\", "/")
+    for marker in ("site-packages/", "/src/"):
+        if marker in path:
+            tail = path.split(marker, 1)[1]
+            return tail if marker == "site-packages/" else "src/" + tail
+    return path.rsplit("/", 1)[-1]
+
+
+class _StackSampler(threading.Thread):
+    """
+    Counts the event-loop thread's stacks, and those of the pool threads
+    running the turn's tools, prefixed with the running agent.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float, turn: "ProfiledTurn") -> None:
+        super().__init__(name="turn-profiler-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.turn = turn
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval_s):
+            frames = sys._current_frames()
+            agent = f"agent:{self.turn.current_agent or '-'}"
+            threads = [(self.thread_id, [agent])]
+            threads += [(ident, [agent, "thread:tool"]) for ident in tuple(self.turn.tool_threads)]
+            for thread_id, root in threads:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{_short(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(root + names[::-1])] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class ProfiledTurn:
+    """One profiled turn: the profiler, its tags and where its report goes."""
+
+    def __init__(self, user_id: str, session_id: str, number: int, mode: str) -> None:
+        self.user_id = user_id
+        self.session_id = session_id
+        self.number = number
+        self.mode = mode
+        self.invocation_id = ""
+        self.agents: List[Dict[str, Any]] = []
+        self._agent_stack: List[str] = []
+        self.started = time.perf_counter()
+        self.wall_s = 0.0
+        self.profile: Optional[cProfile.Profile] = None
+        self.sampler: Optional[_StackSampler] = None
+        # Tool bodies run on pool threads: their profiles (cprofile) or the
+        # threads running them right now (sampling).
+        self.tool_profiles: List[cProfile.Profile] = []
+        self.tool_threads: Set[int] = set()
+        self.tool_calls = 0
+        self._tool_lock = threading.Lock()
+
+    @property
+    def current_agent(self) -> str:
+        return self._agent_stack[-1] if self._agent_stack else ""
+
+    def agent_started(self, invocation_id: str, agent_name: str) -> None:
+        self.invocation_id = self.invocation_id or invocation_id
+        self._agent_stack.append(agent_name)
+        self.agents.append(
+            {
+                "agent": agent_name,
+                "invocation_id": invocation_id,
+                "start_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            }
+        )
+
+    def agent_finished(self, agent_name: str) -> None:
+        if agent_name in self._agent_stack:
+            # Agents that transfer control never finish; drop them as well.
+            del self._agent_stack[self._agent_stack.index(agent_name):]
+
+    def run_tool(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call a tool body on the current (pool) thread, profiled for this turn."""
+        with self._tool_lock:
+            self.tool_calls += 1
+        if self.mode == "sampling":
+            ident = threading.get_ident()
+            self.tool_threads.add(ident)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.tool_threads.discard(ident)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # One profiler per process (Python 3.12+): the turn's own sees it.
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._tool_lock:
+                self.tool_profiles.append(profile)
+
+
+class TurnProfiler:
+    """Selects turns to profile and writes their reports."""
+
+    def __init__(
+        self,
+        directory: str = "profiles",
+        sample_rate: float = 0.0,
+        sessions: Iterable[str] = (),
+        mode: str = "cprofile",
+        interval_ms: float = 2.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.sessions = set(sessions)
+        self.mode = mode if mode in PROFILE_MODES else "cprofile"
+        self.interval_s = interval_ms / 1000.0
+        self._lock = threading.Lock()
+        self._active: Optional[ProfiledTurn] = None
+        self._turns: Counter = Counter()
+        self.profiled = 0
+        self.skipped_busy = 0
+        self.last_report: Optional[Path] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sample_rate > 0 or self.sessions)
+
+    def enable_session(self, session_id: str) -> None:
+        self.sessions.add(session_id)
+
+    def disable_session(self, session_id: str) -> None:
+        self.sessions.discard(session_id)
+
+    def _selected(self, session_id: str) -> bool:
+        return session_id in self.sessions or (
+            self.sample_rate > 0 and random.random() < self.sample_rate
+        )
+
+    def begin(self, user_id: str, session_id: str) -> Optional[ProfiledTurn]:
+        """Start profiling this turn if it is selected and no other turn is."""
+        if not self.enabled or not self._selected(session_id):
+            return None
+        with self._lock:
+            if self._active is not None:
+                self.skipped_busy += 1
+                return None
+            self._turns[session_id] += 1
+            turn = ProfiledTurn(user_id, session_id, self._turns[session_id], self.mode)
+            self._active = turn
+        if self.mode == "sampling":
+            turn.sampler = _StackSampler(threading.get_ident(), self.interval_s, turn)
+            turn.sampler.start()
+        else:
+            turn.profile = cProfile.Profile()
+            try:
+                turn.profile.enable()
+            except ValueError:
+                # Another profiler owns the hook (e.g. the process runs under cProfile).
+                with self._lock:
+                    self._active = None
+                self.skipped_busy += 1
+                return None
+        turn.started = time.perf_counter()
+        return turn
+
+    def end(self, turn: ProfiledTurn) -> Optional[Path]:
+        """Stop profiling and write the turn's report; returns the summary path."""
+        if turn.profile is not None:
+            turn.profile.disable()
+        if turn.sampler is not None:
+            turn.sampler.stop()
+        turn.wall_s = time.perf_counter() - turn.started
+        with self._lock:
+            if self._active is turn:
+                self._active = None
+        try:
+            path = self._write(turn)
+        except OSError as exc:
+            logger.warning("[TURN_PROFILE] could not write report: %s", exc)
+            return None
+        self.profiled += 1
+        self.last_report = path
+        logger.info(
+            "[TURN_PROFILE] session=%s wall=%.1fms report=%s",
+            turn.session_id,
+            turn.wall_s * 1000,
+            path,
+        )
+        return path
+
+    def active_turn(self, session_id: str) -> Optional[ProfiledTurn]:
+        turn = self._active
+        return turn if turn is not None and turn.session_id == session_id else None
+
+    def _write(self, turn: ProfiledTurn) -> Path:
+        directory = self.directory / _safe_name(turn.session_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = directory / f"{turn.number:04d}-{_safe_name(turn.invocation_id or 'turn')}"
+        layers: Counter = Counter()
+        summary: Dict[str, Any] = {
+            "session_id": turn.session_id,
+            "user_id": turn.user_id,
+            "invocation_id": turn.invocation_id,
+            "turn": turn.number,
+            "mode": turn.mode,
+            "wall_ms": round(turn.wall_s * 1000, 2),
+            "agents": turn.agents,
+            "tool_calls": turn.tool_calls,
+        }
+
+        if turn.profile is not None:
+            stats = pstats.Stats(turn.profile)
+            for profile in turn.tool_profiles:
+                stats.add(profile)
+            stats.dump_stats(f"{stem}.pstats")
+            state_calls = 0.0
+            app_functions = []
+            for (filename, line, function), (_, calls, own, cumulative, callers) in stats.stats.items():
+                layer = layer_of(filename, function)
+                if filename == "~" and layer != "io_wait" and callers:
+                    # Builtins (isinstance, pydantic-core validators, ...) count
+                    # towards whoever called them.
+                    for caller, caller_stats in callers.items():
+                        layers[layer_of(caller[0], caller[2])] += caller_stats[2]
+                else:
+                    layers[layer] += own
+                if layer == "state":
+                    # Inclusive time of calls into state code from outside it.
+                    state_calls += sum(
+                        caller_stats[3]
+                        for caller, caller_stats in callers.items()
+                        if layer_of(caller[0], caller[2]) != "state"
+                    )
+                if layer in ("app", "state"):
+                    app_functions.append((cumulative, calls, f"{_short(filename)}:{line}({function})"))
+            summary["report"] = f"{stem.name}.pstats"
+            summary["state_calls_ms"] = round(state_calls * 1000, 3)
+            summary["top_app_functions"] = [
+                {"function": name, "calls": calls, "cumulative_ms": round(cumulative * 1000, 3)}
+                for cumulative, calls, name in sorted(app_functions, reverse=True)[:15]
+            ]
+            total = sum(layers.values())
+        else:
+            stacks = turn.sampler.stacks if turn.sampler is not None else Counter()
+            with open(f"{stem}.collapsed", "w", encoding="utf-8") as handle:
+                for stack, count in stacks.most_common():
+                    handle.write(f"{stack} {count}\n")
+            per_agent: Counter = Counter()
+            for stack, count in stacks.items():
+                agent, _, rest = stack.partition(";")
+                leaf = rest.rsplit(";", 1)[-1]
+                filename, _, function = leaf.rpartition(":")
+                layers[layer_of(filename, function)] += count * self.interval_s
+                per_agent[agent.removeprefix("agent:")] += count * self.interval_s
+            summary["report"] = f"{stem.name}.collapsed"
+            summary["samples"] = sum(stacks.values())
+            summary["agents_ms"] = {
+                agent: round(seconds * 1000, 2) for agent, seconds in per_agent.most_common()
+            }
+            total = sum(layers.values())
+
+        summary["layers_ms"] = {layer: round(seconds * 1000, 2) for layer, seconds in layers.most_common()}
+        summary["layers_share"] = {
+            layer: round(seconds / total, 4) if total else 0.0 for layer, seconds in layers.most_common()
+        }
+        summary_path = Path(f"{stem}.json")
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary_path
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "sessions": len(self.sessions),
+            "profiled": self.profiled,
+            "skipped_busy": self.skipped_busy,
+            "directory": str(self.directory),
+            "last_report": str(self.last_report) if self.last_report else None,
+        }
+
+
+class TurnProfilerPlugin(BasePlugin):
+    """Tags the profiled turn with its invocation id and the agents that ran."""
+
+    def __init__(self, profiler: TurnProfiler) -> None:
+        super().__init__(name="turn_profiler")
+        self.profiler = profiler
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[genai_types.Content]:
+        turn = self.profiler.active_turn(callback_context.session.id)
+        if turn is not None:
+            turn.agent_started(callback_context.invocation_id, agent.name)
+        return None
+
+    async def after_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[genai_types.Content]:
+        turn = self.profiler.active_turn(callback_context.session.id)
+        if turn is not None:
+            turn.agent_finished(agent.name)
+        return None
+
+    async def before_run_callback(
+        self, *, invocation_context: InvocationContext
+    ) -> Optional[genai_types.Content]:
+        turn = self.profiler.active_turn(invocation_context.session.id)
+        if turn is not None:
+            turn.invocation_id = invocation_context.invocation_id
+        return None
+
+
+async def profiled_run(
+    runner, *, user_id: str, session_id: str, new_message: genai_types.Content, **kwargs: Any
+) -> AsyncGenerator[Any, None]:
+    """`runner.run_async`, profiled when `turn_profiler` selects the turn."""
+    turn = turn_profiler.begin(user_id, session_id)
+    if turn is None:
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=new_message, **kwargs
+        ):
+            yield event
+        return
+
+    try:
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=new_message, **kwargs
+        ):
+            turn.invocation_id = turn.invocation_id or event.invocation_id
+            yield event
+    finally:
+        turn_profiler.end(turn)
+
+
+turn_profiler = TurnProfiler(
+    directory=config.profile_dir or "profiles",
+    sample_rate=config.profile_sample_rate,
+    sessions=config.profile_sessions,
+    mode=config.profile_mode,
+    interval_ms=config.profile_interval_ms,
+)
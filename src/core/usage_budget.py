@@ -0,0 +1,360 @@
+"""
+Per-learner token and cost metering with budget enforcement.
+
+`UsageBudgetPlugin` records the prompt and response tokens (and estimated
+cost) of every model response per user, session and agent, including the
+nested search agent, whose runs share the learner's user id. Each learner's
+rolling totals are kept in hourly buckets over `TUTOR_BUDGET_WINDOW_S` and
+persisted in `user:token_usage`, so they survive restarts and follow the
+learner across sessions.
+
+Budgets are checked before every model call:
+  - soft limit: cheaper mode, i.e. responses capped at
+    `TUTOR_BUDGET_SOFT_MAX_OUTPUT_TOKENS` and no search tool
+  - hard limit: the call is refused with a short message instead
+
+Responses refused here carry `custom_metadata={"budget": "hard"}`. Event
+compaction runs outside agent callbacks, so its summarizer calls are not
+metered per learner (they still show in `model_usage`).
+"""
+
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai import types as genai_types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+
+from src.config import config
+from src.core.llm import tier_policy
+from src.core.model_tiers import call_cost
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.usage_budget")
+
+STATE_KEY_TOKEN_USAGE = "user:token_usage"
+
+# Tools dropped from requests in cheaper mode.
+CHEAP_MODE_DROPPED_TOOLS = frozenset({"google_search_agent"})
+
+BUDGET_OK = "ok"
+BUDGET_SOFT = "soft"
+BUDGET_HARD = "hard"
+
+REFUSAL_TEXT = (
+    "You've reached your usage limit for now, so I can't continue this lesson. "
+    "Your progress is saved; please come back later."
+)
+
+
+@dataclass(frozen=True)
+class UsageBudget:
+    """Rolling per-learner limits; 0 disables a limit."""
+
+    soft_tokens: int = 0
+    hard_tokens: int = 0
+    soft_usd: float = 0.0
+    hard_usd: float = 0.0
+    soft_max_output_tokens: int = 256
+
+    def level(self, totals: Dict[str, float]) -> str:
+        tokens, cost = totals["tokens"], totals["cost_usd"]
+        if (self.hard_tokens and tokens >= self.hard_tokens) or (
+            self.hard_usd and cost >= self.hard_usd
+        ):
+            return BUDGET_HARD
+        if (self.soft_tokens and tokens >= self.soft_tokens) or (
+            self.soft_usd and cost >= self.soft_usd
+        ):
+            return BUDGET_SOFT
+        return BUDGET_OK
+
+
+class _UserUsage:
+    """Hourly buckets of one learner plus per-agent totals in this process."""
+
+    def __init__(self) -> None:
+        # [bucket_start, prompt_tokens, output_tokens, cost_usd, calls]
+        self.buckets: List[List[float]] = []
+        self.by_agent: Dict[str, List[float]] = {}
+        self.level = BUDGET_OK
+
+
+class UsageMeter:
+    """
+    Rolling token and cost totals per learner, per-session totals for up to
+    `max_sessions` recently active sessions, and per-agent totals.
+    """
+
+    def __init__(
+        self, window_s: float = 86400.0, bucket_s: float = 3600.0, max_sessions: int = 4096
+    ) -> None:
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._users: Dict[str, _UserUsage] = {}
+        self._sessions: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self.refusals = 0
+        self.cheap_calls = 0
+
+    def _prune(self, usage: _UserUsage, now: float) -> None:
+        horizon = now - self.window_s
+        while usage.buckets and usage.buckets[0][0] + self.bucket_s <= horizon:
+            usage.buckets.pop(0)
+
+    def seed(self, user_id: str, raw: Any) -> None:
+        """Load a learner's persisted buckets the first time they are seen here."""
+        with self._lock:
+            if user_id in self._users:
+                return
+            usage = self._users[user_id] = _UserUsage()
+            if isinstance(raw, dict):
+                usage.buckets = [
+                    [float(value) for value in bucket] for bucket in raw.get("buckets", [])
+                ]
+
+    def record(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_name: str,
+        prompt_tokens: int,
+        output_tokens: int,
+        cost_usd: float,
+        now: Optional[float] = None,
+    ) -> None:
+        now = time.time() if now is None else now
+        start = now - now % self.bucket_s
+        with self._lock:
+            usage = self._users.setdefault(user_id, _UserUsage())
+            self._prune(usage, now)
+            if not usage.buckets or usage.buckets[-1][0] != start:
+                usage.buckets.append([start, 0, 0, 0.0, 0])
+            bucket = usage.buckets[-1]
+            bucket[1] += prompt_tokens
+            bucket[2] += output_tokens
+            bucket[3] += cost_usd
+            bucket[4] += 1
+            agent = usage.by_agent.setdefault(agent_name or "unknown", [0, 0, 0.0, 0])
+            agent[0] += prompt_tokens
+            agent[1] += output_tokens
+            agent[2] += cost_usd
+            agent[3] += 1
+
+            key = (user_id, session_id)
+            session = self._sessions.pop(key, None) or [0, 0, 0.0, 0]
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            session[0] += prompt_tokens
+            session[1] += output_tokens
+            session[2] += cost_usd
+            session[3] += 1
+
+    def rolling(self, user_id: str, now: Optional[float] = None) -> Dict[str, float]:
+        """The learner's totals over the rolling window."""
+        now = time.time() if now is None else now
+        with self._lock:
+            usage = self._users.get(user_id)
+            if usage is not None:
+                self._prune(usage, now)
+            buckets = list(usage.buckets) if usage is not None else []
+        prompt = sum(bucket[1] for bucket in buckets)
+        output = sum(bucket[2] for bucket in buckets)
+        return {
+            "prompt_tokens": int(prompt),
+            "output_tokens": int(output),
+            "tokens": int(prompt + output),
+            "cost_usd": round(sum(bucket[3] for bucket in buckets), 6),
+            "calls": int(sum(bucket[4] for bucket in buckets)),
+        }
+
+    def update_level(self, user_id: str, level: str) -> Optional[str]:
+        """Remember the learner's budget level; returns the previous one if it changed."""
+        with self._lock:
+            usage = self._users.setdefault(user_id, _UserUsage())
+            previous, usage.level = usage.level, level
+        return previous if previous != level else None
+
+    def to_state(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            usage = self._users.get(user_id)
+            buckets = [list(bucket) for bucket in usage.buckets] if usage is not None else []
+        return {"bucket_s": self.bucket_s, "buckets": buckets}
+
+    def record_refusal(self) -> None:
+        with self._lock:
+            self.refusals += 1
+
+    def record_cheap_call(self) -> None:
+        with self._lock:
+            self.cheap_calls += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._sessions.clear()
+            self.refusals = 0
+            self.cheap_calls = 0
+
+    def user_usage(self, user_id: str) -> Dict[str, Any]:
+        """Rolling totals, budget level, and per-agent and per-session totals of one learner."""
+        rolling = self.rolling(user_id)
+        with self._lock:
+            usage = self._users.get(user_id) or _UserUsage()
+            by_agent = {name: list(values) for name, values in usage.by_agent.items()}
+            sessions = {
+                session_id: list(values)
+                for (user, session_id), values in self._sessions.items()
+                if user == user_id
+            }
+            level = usage.level
+        return {
+            "rolling": rolling,
+            "budget": level,
+            "by_agent": {name: _totals(values) for name, values in sorted(by_agent.items())},
+            "sessions": {session_id: _totals(values) for session_id, values in sessions.items()},
+        }
+
+    def metrics(self, top_users: int = 10) -> Dict[str, Any]:
+        """Learners by budget level, the heaviest learners and per-agent totals."""
+        with self._lock:
+            user_ids = list(self._users)
+            levels = [usage.level for usage in self._users.values()]
+            by_agent: Dict[str, List[float]] = {}
+            for usage in self._users.values():
+                for name, values in usage.by_agent.items():
+                    total = by_agent.setdefault(name, [0, 0, 0.0, 0])
+                    for index, value in enumerate(values):
+                        total[index] += value
+            refusals, cheap_calls = self.refusals, self.cheap_calls
+        rolling = {user_id: self.rolling(user_id) for user_id in user_ids}
+        heaviest = sorted(rolling.items(), key=lambda item: item[1]["tokens"], reverse=True)
+        return {
+            "users": len(user_ids),
+            "soft_limited": levels.count(BUDGET_SOFT),
+            "hard_limited": levels.count(BUDGET_HARD),
+            "cheap_calls": cheap_calls,
+            "refusals": refusals,
+            "top_users": dict(heaviest[:top_users]),
+            "by_agent": {name: _totals(values) for name, values in sorted(by_agent.items())},
+        }
+
+
+def _totals(values: List[float]) -> Dict[str, float]:
+    return {
+        "prompt_tokens": int(values[0]),
+        "output_tokens": int(values[1]),
+        "cost_usd": round(values[2], 6),
+        "calls": int(values[3]),
+    }
+
+
+def cheaper_request(llm_request: LlmRequest, max_output_tokens: int) -> None:
+    """Cap the response length and drop expensive tools, in place."""
+    request_config = llm_request.config
+    if request_config is not None:
+        current = request_config.max_output_tokens
+        request_config.max_output_tokens = min(current or max_output_tokens, max_output_tokens)
+        for tool in request_config.tools or []:
+            declarations = getattr(tool, "function_declarations", None)
+            if declarations:
+                tool.function_declarations = [
+                    declaration
+                    for declaration in declarations
+                    if declaration.name not in CHEAP_MODE_DROPPED_TOOLS
+                ]
+        if request_config.tools:
+            request_config.tools = [
+                tool
+                for tool in request_config.tools
+                if getattr(tool, "function_declarations", None) != []
+            ]
+    for name in CHEAP_MODE_DROPPED_TOOLS:
+        llm_request.tools_dict.pop(name, None)
+
+
+class UsageBudgetPlugin(BasePlugin):
+    """Meters model usage per learner and applies their budget to each call."""
+
+    def __init__(self, meter: UsageMeter, budget: UsageBudget) -> None:
+        super().__init__(name="usage_budget")
+        self.meter = meter
+        self.budget = budget
+
+    def _level(self, callback_context: CallbackContext) -> str:
+        user_id = callback_context.user_id
+        self.meter.seed(user_id, callback_context.state.get(STATE_KEY_TOKEN_USAGE))
+        level = self.budget.level(self.meter.rolling(user_id))
+        previous = self.meter.update_level(user_id, level)
+        if previous is not None:
+            logger.warning(
+                "[BUDGET] user=%s budget %s -> %s (%s)",
+                user_id,
+                previous,
+                level,
+                self.meter.rolling(user_id),
+            )
+        return level
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        level = self._level(callback_context)
+        if level == BUDGET_HARD:
+            self.meter.record_refusal()
+            return LlmResponse(
+                content=genai_types.Content(
+                    role="model", parts=[genai_types.Part(text=REFUSAL_TEXT)]
+                ),
+                custom_metadata={"budget": BUDGET_HARD},
+            )
+        if level == BUDGET_SOFT:
+            self.meter.record_cheap_call()
+            cheaper_request(llm_request, self.budget.soft_max_output_tokens)
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if llm_response.partial or usage is None or not usage.total_token_count:
+            return None
+        agent_name = callback_context.agent_name
+        prompt_tokens = usage.prompt_token_count or 0
+        output_tokens = usage.candidates_token_count or 0
+        model = llm_response.model_version or tier_policy.model_for(agent_name)
+        self.meter.record(
+            callback_context.user_id,
+            callback_context.session.id,
+            agent_name,
+            prompt_tokens,
+            output_tokens,
+            call_cost(
+                model, prompt_tokens, output_tokens, usage.cached_content_token_count or 0
+            ),
+        )
+        callback_context.state[STATE_KEY_TOKEN_USAGE] = self.meter.to_state(
+            callback_context.user_id
+        )
+        return None
+
+
+usage_meter = UsageMeter(window_s=config.budget_window_s)
+usage_budget = UsageBudget(
+    soft_tokens=config.budget_soft_tokens,
+    hard_tokens=config.budget_hard_tokens,
+    soft_usd=config.budget_soft_usd,
+    hard_usd=config.budget_hard_usd,
+    soft_max_output_tokens=config.budget_soft_max_output_tokens,
+)
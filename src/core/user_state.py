@@ -0,0 +1,227 @@
+"""
+Concurrency-safe updates of learner-scoped state from the tools.
+
+The tools read a `user:` value from the session, change it and write it back.
+Each session holds a copy of the learner's state taken when its turn started,
+and the write reaches the session service only when the tool's event is
+appended. Two sessions of the same learner running at once (or parallel
+function calls in one response) therefore each start from the same value and
+the last write wins: attempts recorded by the other are lost.
+
+`UserStateLedger` serializes those read-modify-write cycles per learner and
+keeps the latest written value of each key with a version number (a write
+counter, also stored in state under `user:state_versions`). Before a tool
+runs, the session's copy is replaced by the ledger's when the ledger's is
+newer; after it runs, every key it wrote gets the next version. Events can
+still be appended out of order, so `UserStatePlugin` checks each event's state
+delta just before it is appended (compare-and-swap on the version): a value
+older than the ledger's is replaced by the latest, and the stored value never
+goes back. Sessions are sharded by learner across worker processes, so one
+process-wide ledger sees all of a learner's writes.
+
+`async_tool(func, keys)` turns a synchronous tool into a coroutine that holds
+the learner's lock and runs the tool body on a bounded thread pool
+(TUTOR_TOOL_WORKERS), so state decoding/encoding and any storage I/O behind
+it do not block the event loop. When the turn is being profiled, the body is
+profiled on its pool thread as part of the turn (see `turn_profiler`).
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence, Tuple
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.tool_context import ToolContext
+
+from src.config import config
+from src.core.state import STATE_KEY_VERSIONS
+from src.core.turn_profiler import turn_profiler
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.user_state")
+
+
+class _UserEntry:
+    __slots__ = ("lock", "values")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        # key -> (version, value). Values are the dicts written by the state
+        # helpers, which always build new ones, so they are shared unchanged.
+        self.values: Dict[str, Tuple[int, Any]] = {}
+
+
+class UserStateLedger:
+    """Per-learner locks and the latest version of each `user:` value written."""
+
+    def __init__(self, max_users: int = 4096) -> None:
+        self.max_users = max_users
+        self._users: "OrderedDict[str, _UserEntry]" = OrderedDict()
+        self.transactions = 0
+        self.contended = 0
+        self.refreshed = 0
+        self.commits = 0
+        self.upgraded = 0
+        self.wait_s = 0.0
+
+    def _entry(self, user_id: str) -> _UserEntry:
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = _UserEntry()
+            self._evict()
+        else:
+            self._users.move_to_end(user_id)
+        return entry
+
+    def _evict(self) -> None:
+        # Learners with a tool running keep their entry (and its lock).
+        excess = len(self._users) - self.max_users
+        for user_id in [user for user, entry in self._users.items() if not entry.lock.locked()]:
+            if excess <= 0:
+                break
+            del self._users[user_id]
+            excess -= 1
+
+    def refresh(self, entry: _UserEntry, state: Any, keys: Sequence[str]) -> None:
+        """Replace the session's copy of `keys` where the ledger holds a newer one."""
+        versions = dict(state.get(STATE_KEY_VERSIONS) or {})
+        stale = False
+        for key in keys:
+            version, value = entry.values.get(key, (0, None))
+            if version > versions.get(key, 0):
+                state[key] = value
+                versions[key] = version
+                stale = True
+        if stale:
+            state[STATE_KEY_VERSIONS] = versions
+            self.refreshed += 1
+
+    def commit(self, entry: _UserEntry, state: Any, written: Sequence[str]) -> None:
+        """Give every key the tool wrote the next version."""
+        if not written:
+            return
+        versions = dict(state.get(STATE_KEY_VERSIONS) or {})
+        for key in written:
+            version = max(versions.get(key, 0), entry.values.get(key, (0, None))[0]) + 1
+            entry.values[key] = (version, state.get(key))
+            versions[key] = version
+        state[STATE_KEY_VERSIONS] = versions
+        self.commits += 1
+
+    def forget(self, user_id: str) -> None:
+        """Drop a learner's entry once another process owns them."""
+        entry = self._users.get(user_id)
+        if entry is not None and not entry.lock.locked():
+            del self._users[user_id]
+
+    def upgrade(self, user_id: str, delta: Dict[str, Any]) -> None:
+        """Bring an outgoing state delta's values up to the ledger's latest versions."""
+        entry = self._users.get(user_id)
+        if entry is None:
+            return
+        versions = dict(delta[STATE_KEY_VERSIONS])
+        stale = False
+        for key, (version, value) in entry.values.items():
+            if version > versions.get(key, 0):
+                delta[key] = value
+                versions[key] = version
+                stale = True
+        if stale:
+            delta[STATE_KEY_VERSIONS] = versions
+            self.upgraded += 1
+            logger.debug("[USER_STATE] upgraded a stale write for user=%s", user_id)
+
+    @asynccontextmanager
+    async def transaction(
+        self, tool_context: ToolContext, keys: Sequence[str]
+    ) -> AsyncIterator[None]:
+        """Hold the learner's lock with an up-to-date copy of `keys` in state."""
+        entry = self._entry(tool_context.user_id)
+        self.transactions += 1
+        if entry.lock.locked():
+            self.contended += 1
+        start = asyncio.get_running_loop().time()
+        async with entry.lock:
+            self.wait_s += asyncio.get_running_loop().time() - start
+            state = tool_context.state
+            self.refresh(entry, state, keys)
+            yield
+            delta = tool_context.actions.state_delta
+            self.commit(entry, state, [key for key in keys if key in delta])
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "transactions": self.transactions,
+            "contended": self.contended,
+            "refreshed_stale_copies": self.refreshed,
+            "commits": self.commits,
+            "stale_writes_upgraded": self.upgraded,
+            "lock_wait_s": round(self.wait_s, 3),
+        }
+
+
+user_state = UserStateLedger()
+
+
+class UserStatePlugin(BasePlugin):
+    """Keeps stale tool writes from overwriting newer learner state on append."""
+
+    def __init__(self, ledger: UserStateLedger) -> None:
+        super().__init__(name="user_state")
+        self.ledger = ledger
+
+    async def on_event_callback(
+        self, *, invocation_context: InvocationContext, event: Event
+    ) -> Optional[Event]:
+        delta = event.actions.state_delta
+        if STATE_KEY_VERSIONS in delta:
+            self.ledger.upgrade(invocation_context.user_id, delta)
+        return None
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def tool_executor() -> ThreadPoolExecutor:
+    """The bounded pool tool bodies run on (created on first use)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, config.tool_workers), thread_name_prefix="tutor-tool"
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(tool_executor(), functools.partial(func, *args, **kwargs))
+
+
+def async_tool(func: Callable[..., Dict[str, Any]], keys: Sequence[str]) -> Callable[..., Any]:
+    """
+    The coroutine variant of a synchronous tool that reads and writes the
+    `user:` state `keys`. Name, docstring and signature are kept, so the model
+    sees the same declaration.
+    """
+
+    @functools.wraps(func)
+    async def tool(*args: Any, tool_context: ToolContext, **kwargs: Any) -> Dict[str, Any]:
+        async with user_state.transaction(tool_context, keys):
+            turn = turn_profiler.active_turn(tool_context.session.id)
+            if turn is not None:
+                return await run_blocking(
+                    turn.run_tool, func, *args, tool_context=tool_context, **kwargs
+                )
+            return await run_blocking(func, *args, tool_context=tool_context, **kwargs)
+
+    return tool
@@ -0,0 +1,476 @@
+"""
+Multi-process serving: one runner per worker process, sessions sharded by user.
+
+A single process runs all CPU-side work (event handling, state encoding,
+compaction bookkeeping, tool-call parsing) on one core. ShardedSupervisor
+starts N worker processes, each with its own runner over the same App (built
+by `build_runner`, so TUTOR_SESSION_DIR persistence and the residency bounds
+apply per worker), and routes every turn by a consistent hash of `user_id`.
+A learner's sessions, and with them their `user:` state, therefore live on
+exactly one worker.
+
+With durable sessions all workers share one session directory, laid out per
+learner; a bounded deployment without TUTOR_SESSION_DIR gets a temporary one
+for the supervisor's lifetime. When workers are added or drained, the
+learners whose hash moved are migrated: their in-flight turns finish first
+(per-user locks), then the old worker snapshots their sessions and releases
+them from memory, and the new worker resumes them from the log and snapshot
+files on their next turn. In-memory sessions are exported from the old
+worker and replayed into the new one instead.
+
+Each worker has its own caches, exercise bank, rate limiter and circuit
+breaker; set GEMINI_REQUESTS_PER_MINUTE per worker accordingly.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import config
+from src.core.sharding import ConsistentHashRing
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.workers")
+
+
+@dataclass
+class TurnResult:
+    """Outcome of one learner turn, as reported by the worker that ran it."""
+
+    user_id: str
+    session_id: str
+    text: str = ""
+    author: str = ""
+    tool_calls: List[str] = field(default_factory=list)
+    latency_s: float = 0.0
+    worker: str = ""
+    error: Optional[str] = None
+
+
+# --- worker process ----------------------------------------------------------
+
+
+async def run_turn(runner, user_id: str, session_id: str, text: str) -> TurnResult:
+    """Run one learner turn and summarize the events it produced."""
+    from google.genai import types as genai_types
+
+    from src.core.turn_profiler import profiled_run
+
+    result = TurnResult(user_id=user_id, session_id=session_id)
+    start = time.perf_counter()
+    async for event in profiled_run(
+        runner,
+        user_id=user_id,
+        session_id=session_id,
+        new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+    ):
+        if event.author == "user" or event.content is None:
+            continue
+        for part in event.content.parts or []:
+            if part.function_call:
+                result.tool_calls.append(part.function_call.name)
+        texts = [part.text for part in event.content.parts or [] if part.text]
+        if texts:
+            result.text = "\n".join(texts)
+            result.author = event.author
+    result.latency_s = time.perf_counter() - start
+    return result
+
+
+async def _export_sessions(runner, user_ids: List[str]) -> List[Any]:
+    service = runner.session_service
+    exported = []
+    for user_id in user_ids:
+        listing = await service.list_sessions(app_name=runner.app_name, user_id=user_id)
+        for stub in listing.sessions:
+            session = await service.get_session(
+                app_name=runner.app_name, user_id=user_id, session_id=stub.id
+            )
+            if session is None:
+                continue
+            exported.append(session)
+            await service.delete_session(
+                app_name=runner.app_name, user_id=user_id, session_id=stub.id
+            )
+    return exported
+
+
+def _without_shared_state(event: Any) -> Any:
+    """A copy of `event` whose state delta keeps only the session's own keys."""
+    from google.adk.sessions.state import State
+
+    delta = event.actions.state_delta
+    shared = [key for key in delta if key.startswith((State.USER_PREFIX, State.APP_PREFIX))]
+    if not shared:
+        return event
+    kept = {key: value for key, value in delta.items() if key not in shared}
+    return event.model_copy(
+        update={"actions": event.actions.model_copy(update={"state_delta": kept})}
+    )
+
+
+async def _import_sessions(runner, sessions: List[Any]) -> int:
+    service = runner.session_service
+    for session in sessions:
+        # The merged state carries the latest user: and app: values (each
+        # exported session holds the same ones). Events are replayed so the
+        # compaction window and history are intact, but without their user:
+        # and app: writes: replaying those session by session would leave the
+        # last one imported, not the newest, in the learner's state.
+        imported = await service.create_session(
+            app_name=runner.app_name,
+            user_id=session.user_id,
+            session_id=session.id,
+            state=dict(session.state),
+        )
+        for event in session.events:
+            await service.append_event(imported, _without_shared_state(event))
+    return len(sessions)
+
+
+# Optional (function, args) run in each worker before it starts serving; must
+# be importable (module-level) so it can be sent to a spawned process.
+WorkerInitializer = Tuple[Callable[..., None], Tuple[Any, ...]]
+
+
+def _release_users(runner, user_ids: List[str]) -> int:
+    """Hand learners over through the shared session directory."""
+    from src.core.user_state import user_state
+
+    released = 0
+    for user_id in user_ids:
+        released += runner.session_service.release_user(runner.app_name, user_id)
+        user_state.forget(user_id)
+    return released
+
+
+async def _serve(
+    conn: Connection,
+    worker_id: str,
+    initializer: Optional[WorkerInitializer],
+    session_dir: str,
+) -> None:
+    from src.app_factory import app, build_runner
+    from src.core.prewarm import prepare, readiness
+
+    if initializer is not None:
+        function, args = initializer
+        function(*args)
+
+    runner = build_runner(app, session_dir=session_dir or None)
+    # Requests queue up in the pipe until the worker is warm.
+    await prepare(app, runner)
+    loop = asyncio.get_running_loop()
+    requests: "asyncio.Queue[Optional[Tuple[int, str, Any]]]" = asyncio.Queue()
+    turns = 0
+
+    def read_requests() -> None:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                message = None
+            loop.call_soon_threadsafe(requests.put_nowait, message)
+            if message is None or message[1] == "shutdown":
+                return
+
+    threading.Thread(target=read_requests, daemon=True).start()
+
+    async def handle(request_id: int, op: str, payload: Any) -> None:
+        nonlocal turns
+        try:
+            if op == "create_session":
+                session = await runner.session_service.create_session(
+                    app_name=runner.app_name, user_id=payload
+                )
+                reply: Any = session.id
+            elif op == "run":
+                reply = await run_turn(runner, *payload)
+                reply.worker = worker_id
+                turns += 1
+            elif op == "export":
+                reply = await _export_sessions(runner, payload)
+            elif op == "import":
+                reply = await _import_sessions(runner, payload)
+            elif op == "release":
+                reply = _release_users(runner, payload)
+            elif op == "state":
+                user_id, session_id = payload
+                session = await runner.session_service.get_session(
+                    app_name=runner.app_name, user_id=user_id, session_id=session_id
+                )
+                reply = dict(session.state) if session is not None else None
+            elif op == "stats":
+                reply = {"worker": worker_id, "turns": turns}
+            elif op == "health":
+                reply = {"worker": worker_id, **readiness.health()}
+            else:
+                raise ValueError(f"Unknown worker op: {op}")
+            conn.send((request_id, reply, None))
+        except Exception as exc:  # noqa: BLE001 - reported back to the supervisor
+            conn.send((request_id, None, f"{type(exc).__name__}: {exc}"))
+
+    tasks = set()
+    while True:
+        message = await requests.get()
+        if message is None or message[1] == "shutdown":
+            break
+        task = loop.create_task(handle(*message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if message is not None:
+        conn.send((message[0], "bye", None))
+
+
+def _worker_main(
+    conn: Connection,
+    worker_id: str,
+    initializer: Optional[WorkerInitializer],
+    session_dir: str,
+) -> None:
+    logging.disable(logging.CRITICAL)
+    asyncio.run(_serve(conn, worker_id, initializer, session_dir))
+
+
+# --- supervisor ----------------------------------------------------------------
+
+
+class WorkerError(RuntimeError):
+    """A worker process failed to handle a request."""
+
+
+class WorkerHandle:
+    """Supervisor-side end of one worker process."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        context: multiprocessing.context.BaseContext,
+        initializer: Optional[WorkerInitializer] = None,
+        session_dir: str = "",
+    ) -> None:
+        self.worker_id = worker_id
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, worker_id, initializer, session_dir),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self._loop = asyncio.get_running_loop()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                request_id, reply, error = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, request_id, reply, error)
+        self._loop.call_soon_threadsafe(self._fail_all)
+
+    def _resolve(self, request_id: int, reply: Any, error: Optional[str]) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(WorkerError(f"{self.worker_id}: {error}"))
+        else:
+            future.set_result(reply)
+
+    def _fail_all(self) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(WorkerError(f"{self.worker_id} exited."))
+        self._pending.clear()
+
+    async def call(self, op: str, payload: Any = None) -> Any:
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        with self._send_lock:
+            self._conn.send((request_id, op, payload))
+        return await future
+
+    async def stop(self) -> None:
+        """Let in-flight requests finish, then exit the process."""
+        if self.process.is_alive():
+            try:
+                await self.call("shutdown")
+            except WorkerError:
+                pass
+        await asyncio.to_thread(self.process.join, 10)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+
+
+class ShardedSupervisor:
+    """
+    Routes learner turns to worker processes by consistent hash of user_id.
+
+    Turns for the same user run one at a time, in order; different users run
+    concurrently across (and within) workers.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        vnodes: int = 64,
+        initializer: Optional[WorkerInitializer] = None,
+    ) -> None:
+        self._initial_workers = workers
+        self._initializer = initializer
+        self._ring = ConsistentHashRing(vnodes=vnodes)
+        self._workers: Dict[str, WorkerHandle] = {}
+        self._owner: Dict[str, str] = {}
+        self._user_locks: Dict[str, asyncio.Lock] = {}
+        self._next_worker = itertools.count()
+        self._context = multiprocessing.get_context("spawn")
+        self.migrated_users = 0
+        # One directory for every worker, so a migrated learner's files are
+        # already where the new worker looks for them.
+        bounded = config.session_max_resident or config.session_max_resident_bytes
+        self.session_dir = config.session_dir or (
+            tempfile.mkdtemp(prefix="tutor-sessions-") if bounded else ""
+        )
+
+    async def start(self) -> "ShardedSupervisor":
+        for _ in range(self._initial_workers):
+            self._ring.add(self._spawn().worker_id)
+        # Importing the App takes a while; make sure every worker is up.
+        await asyncio.gather(*(worker.call("stats") for worker in self._workers.values()))
+        return self
+
+    async def __aenter__(self) -> "ShardedSupervisor":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def worker_ids(self) -> List[str]:
+        return list(self._workers)
+
+    def _spawn(self) -> WorkerHandle:
+        worker_id = f"worker-{next(self._next_worker)}"
+        worker = WorkerHandle(worker_id, self._context, self._initializer, self.session_dir)
+        self._workers[worker_id] = worker
+        return worker
+
+    def _lock_for(self, user_id: str) -> asyncio.Lock:
+        return self._user_locks.setdefault(user_id, asyncio.Lock())
+
+    def worker_for(self, user_id: str) -> str:
+        return self._owner.get(user_id) or self._ring.node_for(user_id)
+
+    async def create_session(self, user_id: str) -> str:
+        async with self._lock_for(user_id):
+            worker_id = self.worker_for(user_id)
+            session_id = await self._workers[worker_id].call("create_session", user_id)
+            self._owner[user_id] = worker_id
+            return session_id
+
+    async def run_turn(self, user_id: str, session_id: str, text: str) -> TurnResult:
+        async with self._lock_for(user_id):
+            worker_id = self.worker_for(user_id)
+            self._owner[user_id] = worker_id
+            try:
+                return await self._workers[worker_id].call(
+                    "run", (user_id, session_id, text)
+                )
+            except WorkerError as exc:
+                return TurnResult(
+                    user_id=user_id, session_id=session_id, worker=worker_id, error=str(exc)
+                )
+
+    async def get_state(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """Merged session state (including user: keys) from the owning worker."""
+        async with self._lock_for(user_id):
+            worker = self._workers[self.worker_for(user_id)]
+            return await worker.call("state", (user_id, session_id))
+
+    async def _rebalance(self) -> None:
+        """Move every learner whose ring position changed to its new worker."""
+        moves: Dict[Tuple[str, str], List[str]] = {}
+        for user_id, owner in self._owner.items():
+            target = self._ring.node_for(user_id)
+            if target != owner:
+                moves.setdefault((owner, target), []).append(user_id)
+
+        async def migrate(source: str, target: str, user_ids: List[str]) -> None:
+            locks = [self._lock_for(user_id) for user_id in user_ids]
+            # Wait for each learner's in-flight turn; new turns queue behind us.
+            for lock in locks:
+                await lock.acquire()
+            try:
+                if self.session_dir:
+                    await self._workers[source].call("release", user_ids)
+                else:
+                    sessions = await self._workers[source].call("export", user_ids)
+                    await self._workers[target].call("import", sessions)
+                for user_id in user_ids:
+                    self._owner[user_id] = target
+                self.migrated_users += len(user_ids)
+            finally:
+                for lock in locks:
+                    lock.release()
+
+        await asyncio.gather(
+            *(migrate(source, target, users) for (source, target), users in moves.items())
+        )
+        logger.info(
+            "[WORKERS] rebalanced: %d users moved across %d worker pairs",
+            sum(len(users) for users in moves.values()),
+            len(moves),
+        )
+
+    async def add_worker(self) -> str:
+        """Start a worker, then hand it the learners that now hash to it."""
+        worker = self._spawn()
+        await worker.call("stats")
+        self._ring.add(worker.worker_id)
+        await self._rebalance()
+        return worker.worker_id
+
+    async def drain_worker(self, worker_id: str) -> None:
+        """Move a worker's learners elsewhere, then stop it gracefully."""
+        if len(self._ring) <= 1:
+            raise ValueError("Cannot drain the last worker.")
+        self._ring.remove(worker_id)
+        await self._rebalance()
+        await self._workers.pop(worker_id).stop()
+
+    async def stats(self) -> List[Dict[str, Any]]:
+        return list(
+            await asyncio.gather(*(worker.call("stats") for worker in self._workers.values()))
+        )
+
+    async def health(self) -> List[Dict[str, Any]]:
+        """Each worker's readiness report."""
+        return list(
+            await asyncio.gather(*(worker.call("health") for worker in self._workers.values()))
+        )
+
+    async def close(self) -> None:
+        """Graceful shutdown: in-flight turns finish before workers exit."""
+        await asyncio.gather(*(worker.stop() for worker in self._workers.values()))
+        self._workers.clear()
@@ -10,15 +10,21 @@ You can create it by:
   2) Use the web UI to chat with your tutor
   3) Add the session to an eval set from the Eval tab
   4) Save the evalset as ai_tutor_basic.evalset.json (it will be written to src/)
+
+This is a single run; for repeated runs of several evalsets in parallel with
+aggregated statistics, use `src/evaluation/multi_run.py`.
 """
 
 
 import asyncio
 from pathlib import Path
-import json
 import warnings
 
 from google.adk.evaluation.agent_evaluator import AgentEvaluator
+from google.adk.evaluation.eval_config import EvalConfig
+from google.adk.evaluation.local_eval_sets_manager import load_eval_set_from_file
+
+from src.evaluation.multi_run import DEFAULT_CRITERIA
 
 
 # Global: ignore all UserWarnings (including [EXPERIMENTAL])
@@ -50,12 +56,8 @@ async def run_adk_eval() -> None:
 
     print(f"Running evalset: {eval_path}\n")
 
-    eval_config = {
-    "criteria": {
-        "tool_trajectory_avg_score": 0.6,  # Perfect tool usage required
-        "response_match_score": 0.5,  # 50% text similarity threshold
-        }
-    }
+    # tool_trajectory_avg_score 0.6, response_match_score 0.5 (text similarity)
+    eval_config = EvalConfig(criteria=dict(DEFAULT_CRITERIA))
 
     # eval_config = {
     #     "criteria": {
@@ -69,12 +71,11 @@ async def run_adk_eval() -> None:
     #     }
     # }
 
-    with open("src/test_config.json", "w") as f:
-        json.dump(eval_config, f, indent=2)
-
-    await AgentEvaluator.evaluate(
+    # The config is passed in memory rather than written next to the evalset.
+    await AgentEvaluator.evaluate_eval_set(
         agent_module="src.agent",
-        eval_dataset_file_path_or_dir=str(eval_path),
+        eval_set=load_eval_set_from_file(str(eval_path), "ai_tutor_basic"),
+        eval_config=eval_config,
         num_runs=1,
     )
 
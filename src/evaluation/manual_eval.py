@@ -1,20 +1,24 @@
 """
 Simple manual evaluation harness for the AI Tutor Agent using InMemoryRunner.
 
-This does not depend on ADK evalset files; it just sends fixed prompts and
-checks that the responses satisfy simple heuristic criteria.
+This does not depend on ADK evalset files; it sends the prompts of the
+smoke-test cases in `cases/tutor_smoke.jsonl` through one session and checks
+the responses with the suite engine (`src/evaluation/suite.py`).
 """
 
 
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import List, Sequence
+from pathlib import Path
 
 from google.adk.runners import InMemoryRunner
 from google.genai import types as genai_types
 
 from src.app_factory import app
+from src.evaluation.suite import Response, load_cases
+
+
+SMOKE_CASES = Path(__file__).resolve().parent / "cases" / "tutor_smoke.jsonl"
 
 
 # Silence noisy SDK logs for evaluation
@@ -22,33 +26,6 @@ logging.getLogger("google_adk").setLevel(logging.ERROR)
 logging.getLogger("google_genai.types").setLevel(logging.ERROR)
 
 
-@dataclass
-class SimpleTestCase:
-    """Minimal test case representation for manual evaluation."""
-    name: str
-    user_query: str
-    must_contain_any: Sequence[str] | None = None
-    must_contain_all: Sequence[str] | None = None
-    min_length: int = 0  # optional sanity check
-
-
-def _passes_heuristics(tc: SimpleTestCase, text: str) -> bool:
-    text_lower = text.lower()
-
-    if tc.min_length and len(text.strip()) < tc.min_length:
-        return False
-
-    if tc.must_contain_any:
-        if not any(k.lower() in text_lower for k in tc.must_contain_any):
-            return False
-
-    if tc.must_contain_all:
-        if not all(k.lower() in text_lower for k in tc.must_contain_all):
-            return False
-
-    return True
-
-
 async def run_manual_tests() -> None:
     """Run a few simple tests using InMemoryRunner directly."""
     runner = InMemoryRunner(app=app)
@@ -61,38 +38,18 @@ async def run_manual_tests() -> None:
     )
     session_id = session.id
 
-    test_cases: List[SimpleTestCase] = [
-        # 1) Tutor should profile a new learner (ask about background/experience/goals)
-        SimpleTestCase(
-            name="profiling_new_learner",
-            user_query="Hi, I want to learn machine learning but I'm a beginner.",
-            must_contain_any=[
-                "background",
-                "experience",
-                "programming",
-                "math",
-                "goals",
-            ],
-            min_length=50,
-        ),
-        # 2) Tutor should be able to explain a specific RL topic
-        SimpleTestCase(
-            name="explains_rl_topic",
-            user_query="Explain Q-learning to me in simple terms.",
-            must_contain_any=["q-learning"],
-            min_length=60,
-        ),
-    ]
+    test_cases = load_cases([SMOKE_CASES])
 
     print("=== Manual Behavior Checks (InMemoryRunner) ===")
 
     for tc in test_cases:
         user_message = genai_types.Content(
             role="user",
-            parts=[genai_types.Part(text=tc.user_query)],
+            parts=[genai_types.Part(text=tc.query)],
         )
 
         final_text = ""
+        tool_calls = []
         async for event in runner.run_async(
             user_id=user_id,
             session_id=session_id,
@@ -103,6 +60,7 @@ async def run_manual_tests() -> None:
 
             if event.content:
                 parts = getattr(event.content, "parts", None) or []
+                tool_calls.extend(p.function_call.name for p in parts if p.function_call)
                 texts = [
                     getattr(p, "text", "")
                     for p in parts
@@ -111,14 +69,15 @@ async def run_manual_tests() -> None:
                 if texts:
                     final_text = "\n".join(texts)
 
-        passed = _passes_heuristics(tc, final_text)
+        failures = tc.check(Response(text=final_text, tool_calls=tool_calls))
+        passed = not failures
         status = "PASS" if passed else "FAIL"
 
         if passed:
             details = "Response satisfied heuristic criteria."
         else:
             details = (
-                "Response did not satisfy heuristic criteria. Got:\n"
+                f"Response did not satisfy heuristic criteria ({'; '.join(failures)}). Got:\n"
                 f"{final_text}"
             )
 
@@ -0,0 +1,461 @@
+"""
+Repeated, parallel ADK evaluation with aggregated statistics.
+
+Runs every case of every evalset N times, as independent jobs bounded by one
+concurrency limit, through ADK's LocalEvalService against the tutor App.
+Each evalset uses the `test_config.json` next to it if there is one (the
+AgentEvaluator convention), else the default criteria; configs are kept in
+memory, so nothing is written to the working directory and parallel runs
+cannot see each other's config.
+
+Inference results can be recorded per (evalset, case, run) and replayed
+later, so scoring works offline and re-scoring with new criteria does not
+re-run the agent. With `TUTOR_USE_STUB_MODEL=true` inference itself is
+offline too (judge-model metrics still need the API).
+
+All runs share one process, so each (case, run) gets its own learner: its own
+user id (see `run_user_id`) and its own session service, otherwise later runs
+would start from the `user:` profile, progress and review schedule an
+earlier one left behind. Live inference also turns off the response caches,
+their shared in-flight calls and the exercise bank: otherwise later runs
+would replay the first run's explanations, searches and questions and the
+spread across runs would shrink to nothing. Evalsets are identified by
+their file path (see `eval_set_key`), in the report and under the recording
+directory, so two files with the same name do not collide.
+
+Per evalset and metric, the per-run mean score is aggregated across runs
+into mean, variance and a 95% confidence interval (Student's t), plus the
+fraction of runs in which each case passed. The exit status is non-zero if
+a criterion's mean misses its threshold or a case could not be run.
+
+    uv run python -m src.evaluation.multi_run src/ai_tutor_basic.evalset.json --runs 5
+    uv run python -m src.evaluation.multi_run evalsets/*.evalset.json --runs 10 \\
+        --concurrency 8 --record recordings/
+    uv run python -m src.evaluation.multi_run evalsets/*.evalset.json --runs 10 \\
+        --replay recordings/
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import statistics
+import sys
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# ADK's evaluation modules are marked experimental and warn on import.
+warnings.filterwarnings("ignore", category=UserWarning)
+
+from google.adk.evaluation.agent_evaluator import AgentEvaluator  # noqa: E402
+from google.adk.evaluation.base_eval_service import (  # noqa: E402
+    EvaluateConfig,
+    EvaluateRequest,
+    InferenceConfig,
+    InferenceRequest,
+    InferenceResult,
+    InferenceStatus,
+)
+from google.adk.evaluation.eval_case import EvalCase, SessionInput  # noqa: E402
+from google.adk.evaluation.eval_config import (  # noqa: E402
+    EvalConfig,
+    get_eval_metrics_from_config,
+)
+from google.adk.evaluation.eval_set import EvalSet  # noqa: E402
+from google.adk.evaluation.evaluator import EvalStatus  # noqa: E402
+from google.adk.evaluation.in_memory_eval_sets_manager import (  # noqa: E402
+    InMemoryEvalSetsManager,
+)
+from google.adk.evaluation.local_eval_service import LocalEvalService  # noqa: E402
+from google.adk.evaluation.local_eval_sets_manager import (  # noqa: E402
+    load_eval_set_from_file,
+)
+from google.adk.evaluation.metric_evaluator_registry import (  # noqa: E402
+    DEFAULT_METRIC_EVALUATOR_REGISTRY,
+    register_custom_metrics_from_config,
+)
+
+
+logger = logging.getLogger("agentic_ai_tutor_with_googleadk.multi_run")
+
+DEFAULT_CRITERIA: Dict[str, float] = {
+    "tool_trajectory_avg_score": 0.6,
+    "response_match_score": 0.5,
+}
+
+# Two-sided 95% Student's t critical values by degrees of freedom; 1.96 above.
+_T_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def t_critical_95(df: int) -> float:
+    return _T_95[df - 1] if 1 <= df <= len(_T_95) else 1.96
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Mean, sample variance/stdev and the 95% CI of the mean."""
+    n = len(values)
+    mean = statistics.fmean(values) if values else 0.0
+    variance = statistics.variance(values) if n > 1 else 0.0
+    half_width = t_critical_95(n - 1) * math.sqrt(variance / n) if n > 1 else 0.0
+    return {
+        "n": n,
+        "mean": round(mean, 4),
+        "variance": round(variance, 6),
+        "stdev": round(math.sqrt(variance), 4),
+        "ci95_low": round(mean - half_width, 4),
+        "ci95_high": round(mean + half_width, 4),
+    }
+
+
+@dataclass
+class EvalSetJob:
+    """One evalset file with its criteria."""
+
+    path: Path
+    eval_set: EvalSet
+    eval_config: EvalConfig
+
+    @property
+    def key(self) -> str:
+        """Identifies the evalset in services, recordings and the report."""
+        return eval_set_key(self.path)
+
+
+@dataclass
+class CaseRun:
+    """Scores of one eval case in one run."""
+
+    eval_set_id: str
+    eval_id: str
+    run: int
+    passed: bool
+    scores: Dict[str, Optional[float]] = field(default_factory=dict)
+    thresholds: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def eval_set_key(path: Path) -> str:
+    """
+    The evalset file's path without its `.evalset.json` suffix, relative to the
+    working directory when it is inside it, so that evalsets with the same
+    file name (or the same `eval_set_id`) in different directories stay apart.
+    """
+    resolved = path.resolve()
+    try:
+        relative = resolved.relative_to(Path.cwd())
+    except ValueError:
+        relative = resolved.relative_to(resolved.anchor)
+    return relative.with_name(relative.name.split(".")[0]).as_posix()
+
+
+def run_user_id(eval_set_id: str, eval_id: str, run: int) -> str:
+    """The learner one eval case runs as in one run."""
+    return f"{eval_set_id}:{eval_id}-run{run}"
+
+
+def _case_for_run(eval_case: EvalCase, app_name: str, user_id: str) -> EvalCase:
+    session_input = eval_case.session_input or SessionInput(app_name=app_name, user_id=user_id)
+    return eval_case.model_copy(
+        update={"session_input": session_input.model_copy(update={"user_id": user_id})}
+    )
+
+
+def load_jobs(paths: Sequence[Path]) -> List[EvalSetJob]:
+    jobs = []
+    for path in paths:
+        eval_set = load_eval_set_from_file(str(path), eval_set_key(path))
+        config_path = path.parent / "test_config.json"
+        eval_config = (
+            AgentEvaluator.find_config_for_test_file(str(path))
+            if config_path.exists()
+            else EvalConfig(criteria=dict(DEFAULT_CRITERIA))
+        )
+        jobs.append(EvalSetJob(path=path, eval_set=eval_set, eval_config=eval_config))
+    return jobs
+
+
+def _recording_path(directory: Path, eval_set_id: str, eval_id: str, run: int) -> Path:
+    return directory / eval_set_id / f"{eval_id}.run{run}.json"
+
+
+class MultiRunEvaluator:
+    """
+    Runs (evalset, case, run) jobs concurrently, at most `concurrency` at a
+    time, recording or replaying inference results when a directory is set.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        concurrency: int = 4,
+        record_dir: Optional[Path] = None,
+        replay_dir: Optional[Path] = None,
+    ) -> None:
+        self.app = app
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        self._services: Dict[Tuple[str, int], LocalEvalService] = {}
+
+    def _service(self, job: EvalSetJob, run: int) -> LocalEvalService:
+        """
+        One service (and so one session service) per evalset and run, whose
+        cases each run as their own learner.
+        """
+        eval_set_id = job.key
+        if (eval_set_id, run) not in self._services:
+            manager = InMemoryEvalSetsManager()
+            manager.create_eval_set(app_name=self.app.name, eval_set_id=eval_set_id)
+            for eval_case in job.eval_set.eval_cases:
+                user_id = run_user_id(eval_set_id, eval_case.eval_id, run)
+                manager.add_eval_case(
+                    app_name=self.app.name,
+                    eval_set_id=eval_set_id,
+                    eval_case=_case_for_run(eval_case, self.app.name, user_id),
+                )
+            self._services[(eval_set_id, run)] = LocalEvalService(
+                root_agent=self.app.root_agent,
+                eval_sets_manager=manager,
+                metric_evaluator_registry=register_custom_metrics_from_config(
+                    job.eval_config, DEFAULT_METRIC_EVALUATOR_REGISTRY.fork()
+                ),
+                app=self.app,
+            )
+        return self._services[(eval_set_id, run)]
+
+    async def _inference(
+        self, service: LocalEvalService, eval_set_id: str, eval_id: str, run: int
+    ) -> InferenceResult:
+        if self.replay_dir is not None:
+            path = _recording_path(self.replay_dir, eval_set_id, eval_id, run)
+            if not path.exists():
+                return InferenceResult(
+                    app_name=self.app.name,
+                    eval_set_id=eval_set_id,
+                    eval_case_id=eval_id,
+                    status=InferenceStatus.FAILURE,
+                    error_message=f"no recording at {path}",
+                )
+            return InferenceResult.model_validate_json(path.read_text(encoding="utf-8"))
+
+        request = InferenceRequest(
+            app_name=self.app.name,
+            eval_set_id=eval_set_id,
+            eval_case_ids=[eval_id],
+            inference_config=InferenceConfig(parallelism=1),
+        )
+        results = [result async for result in service.perform_inference(request)]
+        result = results[0]
+        if self.record_dir is not None and result.status == InferenceStatus.SUCCESS:
+            path = _recording_path(self.record_dir, eval_set_id, eval_id, run)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(result.model_dump_json(exclude_none=True), encoding="utf-8")
+        return result
+
+    async def _run_case(self, job: EvalSetJob, eval_id: str, run: int) -> CaseRun:
+        eval_set_id = job.key
+        async with self.semaphore:
+            service = self._service(job, run)
+            inference = await self._inference(service, eval_set_id, eval_id, run)
+            if inference.status != InferenceStatus.SUCCESS:
+                return CaseRun(
+                    eval_set_id, eval_id, run, passed=False, error=inference.error_message
+                )
+            request = EvaluateRequest(
+                inference_results=[inference],
+                evaluate_config=EvaluateConfig(
+                    eval_metrics=get_eval_metrics_from_config(job.eval_config), parallelism=1
+                ),
+            )
+            results = [result async for result in service.evaluate(request)]
+
+        case_result = results[0]
+        return CaseRun(
+            eval_set_id,
+            eval_id,
+            run,
+            passed=case_result.final_eval_status == EvalStatus.PASSED,
+            scores={
+                metric.metric_name: metric.score
+                for metric in case_result.overall_eval_metric_results
+            },
+            thresholds={
+                metric.metric_name: metric.threshold
+                for metric in case_result.overall_eval_metric_results
+                if metric.threshold is not None
+            },
+        )
+
+    async def evaluate(self, jobs: Sequence[EvalSetJob], runs: int) -> List[CaseRun]:
+        tasks = [
+            self._run_case(job, eval_case.eval_id, run)
+            for job in jobs
+            for run in range(runs)
+            for eval_case in job.eval_set.eval_cases
+        ]
+        return list(await asyncio.gather(*tasks))
+
+
+def aggregate(case_runs: Sequence[CaseRun], runs: int) -> Dict[str, Any]:
+    """
+    {eval_set_id: {"metrics": {metric: summary of per-run means},
+                   "cases": {eval_id: {"pass_rate", "errors"}}}}
+
+    Metrics with a threshold (the configured criteria) also report it and
+    whether the mean across runs meets it.
+    """
+    report: Dict[str, Any] = {}
+    grouped: Dict[str, List[CaseRun]] = {}
+    for case_run in case_runs:
+        grouped.setdefault(case_run.eval_set_id, []).append(case_run)
+
+    for eval_set_id, results in sorted(grouped.items()):
+        per_run: Dict[Tuple[str, int], List[float]] = {}
+        thresholds: Dict[str, float] = {}
+        cases: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            for metric, score in result.scores.items():
+                if score is not None:
+                    per_run.setdefault((metric, result.run), []).append(score)
+            thresholds.update(result.thresholds)
+            entry = cases.setdefault(result.eval_id, {"passed": 0, "errors": 0})
+            entry["passed"] += result.passed
+            entry["errors"] += result.error is not None
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for metric in sorted({metric for metric, _ in per_run}):
+            stats: Dict[str, Any] = summarize(
+                [
+                    statistics.fmean(per_run[(metric, run)])
+                    for run in range(runs)
+                    if (metric, run) in per_run
+                ]
+            )
+            if metric in thresholds:
+                stats["threshold"] = thresholds[metric]
+                stats["passed"] = stats["mean"] >= thresholds[metric]
+            metrics[metric] = stats
+        report[eval_set_id] = {
+            "metrics": metrics,
+            "cases": {
+                eval_id: {
+                    "pass_rate": round(entry["passed"] / runs, 4),
+                    "errors": entry["errors"],
+                }
+                for eval_id, entry in sorted(cases.items())
+            },
+        }
+    return report
+
+
+def disable_shared_caches() -> None:
+    """
+    Turn off the process-wide explanation and search caches, their shared
+    in-flight calls and the exercise bank (draws and refills), so no run is
+    answered with another run's output.
+    """
+    from src.core.banked_exercises import exercise_bank, exercise_refiller
+    from src.core.cached_responses import (
+        explanation_cache,
+        explanation_flights,
+        search_cache,
+        search_flights,
+    )
+
+    for shared in (explanation_cache, explanation_flights, search_cache, search_flights):
+        shared.enabled = False
+    exercise_bank.enabled = False
+    exercise_refiller.min_stock = 0
+
+
+async def run_multi_eval(
+    paths: Sequence[Path],
+    runs: int,
+    concurrency: int,
+    record_dir: Optional[Path] = None,
+    replay_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    from src.app_factory import app
+
+    if replay_dir is None:
+        disable_shared_caches()
+    jobs = load_jobs(paths)
+    evaluator = MultiRunEvaluator(app, concurrency, record_dir, replay_dir)
+    start = time.perf_counter()
+    case_runs = await evaluator.evaluate(jobs, runs)
+    return {
+        "runs": runs,
+        "case_runs": len(case_runs),
+        "seconds": round(time.perf_counter() - start, 2),
+        "evalsets": aggregate(case_runs, runs),
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"=== ADK evaluation: {report['runs']} runs, {report['case_runs']} case runs "
+        f"in {report['seconds']}s ==="
+    )
+    for eval_set_id, entry in report["evalsets"].items():
+        print(f"--- {eval_set_id} ---")
+        for metric, stats in entry["metrics"].items():
+            gate = ""
+            if "threshold" in stats:
+                gate = f" {'PASS' if stats['passed'] else 'FAIL'} (>= {stats['threshold']})"
+            print(
+                f"    {metric:<28} mean={stats['mean']:.3f} stdev={stats['stdev']:.3f} "
+                f"95% CI=[{stats['ci95_low']:.3f}, {stats['ci95_high']:.3f}] "
+                f"n={stats['n']}{gate}"
+            )
+        for eval_id, case in entry["cases"].items():
+            errors = f" errors={case['errors']}" if case["errors"] else ""
+            print(f"    {eval_id:<28} pass_rate={case['pass_rate']:.0%}{errors}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("evalsets", nargs="+", type=Path, help="*.evalset.json files.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--record", type=Path, default=None, help="Save inference results here.")
+    parser.add_argument(
+        "--replay", type=Path, default=None, help="Score recorded inference results from here."
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report here.")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    logging.getLogger("google_adk").setLevel(logging.ERROR)
+    report = asyncio.run(
+        run_multi_eval(args.evalsets, args.runs, args.concurrency, args.record, args.replay)
+    )
+    _print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    failed = any(
+        case["errors"] for entry in report["evalsets"].values() for case in entry["cases"].values()
+    ) or any(
+        not stats.get("passed", True)
+        for entry in report["evalsets"].values()
+        for stats in entry["metrics"].values()
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+File-based regression suites for the tutor's responses.
+
+Cases are loaded from JSON / JSONL files, one object per case:
+
+    {"name": "explains_q_learning",
+     "query": "Explain Q-learning to me in simple terms.",
+     "must_contain_any": ["q-learning", "q learning"],
+     "must_contain_all": ["reward"],
+     "must_not_contain": ["I cannot help"],
+     "regex": ["\\bQ\\(s, ?a\\)"],
+     "min_length": 60, "max_length": 4000,
+     "tool_trajectory": ["transfer_to_agent", "explain_topic"],
+     "trajectory_match": "in_order"}
+
+Each case's keywords (any/all/none together) go into one case-insensitive
+matcher shared by cases with the same keywords. A long keyword list is
+compiled once, when the case is loaded, into an Aho-Corasick automaton (with
+the optional pyahocorasick package) or else into one regex, so checking a
+response is one scan regardless of how many keywords the case lists.
+Responses are either produced live by the App or replayed from a JSONL file
+(`name` or `message`, `text`, `tool_calls`), e.g. the output of
+`python -m src.cli.main --batch`, and scored in bulk.
+
+    uv run python -m src.evaluation.suite src/evaluation/cases/*.jsonl \\
+        --responses recorded.jsonl
+    TUTOR_USE_STUB_MODEL=true uv run python -m src.evaluation.suite \\
+        src/evaluation/cases/tutor_smoke.jsonl
+"""
+
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+try:
+    # Optional dependency: pyahocorasick (C Aho-Corasick automaton)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+TRAJECTORY_MATCHES = ("exact", "in_order", "any_order")
+
+
+# Below this many keywords, one C-level substring search per keyword is as
+# fast as one pass of a compiled matcher.
+AUTOMATON_MIN_KEYWORDS = 64
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    The keywords as one alternation shaped like their trie (shared prefixes
+    written once), so a match attempt follows a single branch per character.
+    Longer keywords are preferred where one is a prefix of another.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + pattern(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        alternation = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{alternation})?"
+        return alternation
+
+    return pattern(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds which of a set of lowercase keywords occur in a lowercased text,
+    as substrings, with one pass however many keywords there are: an
+    Aho-Corasick automaton with pyahocorasick, else one regex that looks
+    ahead for the longest keyword at every position (a keyword that is a
+    prefix of a found one is found too).
+    """
+
+    def __init__(self, keywords: FrozenSet[str]) -> None:
+        self.keywords = keywords
+        self.automaton = None
+        self.pattern: Optional[Pattern[str]] = None
+        self._prefixes: Dict[str, FrozenSet[str]] = {}
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                self.automaton.add_word(keyword, keyword)
+            self.automaton.make_automaton()
+            return
+
+        self.pattern = re.compile(f"(?=({_trie_pattern(keywords)}))")
+        for keyword in keywords:
+            prefixes = frozenset(
+                keyword[:end] for end in range(1, len(keyword)) if keyword[:end] in keywords
+            )
+            if prefixes:
+                self._prefixes[keyword] = prefixes
+
+    def found(self, text_lower: str) -> FrozenSet[str]:
+        if self.automaton is not None:
+            return frozenset(keyword for _, keyword in self.automaton.iter(text_lower))
+        matched = {match.group(1) for match in self.pattern.finditer(text_lower)}
+        for keyword in list(matched):
+            matched.update(self._prefixes.get(keyword, ()))
+        return frozenset(matched)
+
+
+@lru_cache(maxsize=4096)
+def _matcher(keywords: FrozenSet[str]) -> KeywordMatcher:
+    # Suites often repeat the same keyword lists across cases.
+    return KeywordMatcher(keywords)
+
+
+@lru_cache(maxsize=4096)
+def _regex(pattern: str) -> Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass
+class Response:
+    """What the tutor answered to one case."""
+
+    text: str = ""
+    tool_calls: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EvalCase:
+    """One regression case and its assertions."""
+
+    name: str
+    query: str = ""
+    must_contain_any: Sequence[str] = ()
+    must_contain_all: Sequence[str] = ()
+    must_not_contain: Sequence[str] = ()
+    regex: Sequence[str] = ()
+    not_regex: Sequence[str] = ()
+    min_length: int = 0
+    max_length: int = 0
+    tool_trajectory: Optional[Sequence[str]] = None
+    trajectory_match: str = "in_order"
+
+    def __post_init__(self) -> None:
+        if self.trajectory_match not in TRAJECTORY_MATCHES:
+            raise ValueError(
+                f"Case {self.name!r}: trajectory_match must be one of {TRAJECTORY_MATCHES}"
+            )
+        # Short keyword lists are separate (short-circuiting) substring scans.
+        # Long ones get one matcher over every keyword of the case, and the
+        # any/all/none checks become set operations on what it finds.
+        self._any = frozenset(k.lower() for k in self.must_contain_any if k)
+        self._all = frozenset(k.lower() for k in self.must_contain_all if k)
+        self._none = frozenset(k.lower() for k in self.must_not_contain if k)
+        self._keywords: Optional[KeywordMatcher] = None
+        if len(self._any) + len(self._all) + len(self._none) >= AUTOMATON_MIN_KEYWORDS:
+            self._keywords = _matcher(self._any | self._all | self._none)
+        self._regex = [_regex(pattern) for pattern in self.regex]
+        self._not_regex = [_regex(pattern) for pattern in self.not_regex]
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "EvalCase":
+        known = set(cls.__dataclass_fields__)
+        unknown = set(raw) - known
+        if unknown:
+            raise ValueError(f"Unknown case fields: {sorted(unknown)}")
+        if "name" not in raw:
+            raise ValueError("Case is missing 'name'")
+        return cls(**raw)
+
+    def check(self, response: Response) -> List[str]:
+        """The assertions this response fails (empty if it passes)."""
+        failures: List[str] = []
+        text = response.text
+        length = len(text.strip())
+        if self.min_length and length < self.min_length:
+            failures.append(f"length {length} < {self.min_length}")
+        if self.max_length and length > self.max_length:
+            failures.append(f"length {length} > {self.max_length}")
+
+        if self._any or self._all or self._none:
+            text_lower = text.lower()
+            if self._keywords is not None:
+                found = self._keywords.found(text_lower)
+                hit_any = bool(self._any & found)
+                missing = self._all - found
+                forbidden = self._none & found
+            else:
+                hit_any = any(k in text_lower for k in self._any)
+                missing = frozenset(k for k in self._all if k not in text_lower)
+                forbidden = frozenset(k for k in self._none if k in text_lower)
+            if self._any and not hit_any:
+                failures.append(f"none of {sorted(self._any)}")
+            if missing:
+                failures.append(f"missing {sorted(missing)}")
+            if forbidden:
+                failures.append(f"contains {sorted(forbidden)}")
+
+        for pattern in self._regex:
+            if pattern.search(text) is None:
+                failures.append(f"no match for /{pattern.pattern}/")
+        for pattern in self._not_regex:
+            if pattern.search(text) is not None:
+                failures.append(f"matches /{pattern.pattern}/")
+
+        if self.tool_trajectory is not None:
+            failure = _check_trajectory(
+                list(self.tool_trajectory), response.tool_calls, self.trajectory_match
+            )
+            if failure:
+                failures.append(failure)
+        return failures
+
+
+def _check_trajectory(expected: List[str], actual: List[str], mode: str) -> Optional[str]:
+    if mode == "exact":
+        ok = actual == expected
+    elif mode == "in_order":
+        calls = iter(actual)
+        ok = all(name in calls for name in expected)
+    else:
+        remaining = list(actual)
+        ok = True
+        for name in expected:
+            if name not in remaining:
+                ok = False
+                break
+            remaining.remove(name)
+    if ok:
+        return None
+    return f"tool trajectory {actual} does not match {expected} ({mode})"
+
+
+def load_cases(paths: Sequence[Path]) -> List[EvalCase]:
+    """Cases from JSON (a list, or {"cases": [...]}) and JSONL files."""
+    cases: List[EvalCase] = []
+    names = set()
+    for path in paths:
+        for where, raw in _read_records(path):
+            try:
+                case = EvalCase.from_dict(raw)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{where}: {exc}") from exc
+            if case.name in names:
+                raise ValueError(f"{where}: duplicate case name {case.name!r}")
+            names.add(case.name)
+            cases.append(case)
+    return cases
+
+
+def _read_records(path: Path) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield f"{path}:{line_number}", json.loads(line)
+            return
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("cases", [])
+    for index, raw in enumerate(data):
+        yield f"{path}[{index}]", raw
+
+
+def load_responses(path: Path, cases: Sequence[EvalCase]) -> Dict[str, Response]:
+    """
+    Recorded responses by case name. Records are matched on `name`, or on
+    `message` against the case query (batch CLI output).
+    """
+    by_query = {case.query: case.name for case in cases if case.query}
+    responses: Dict[str, Response] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            name = record.get("name") or by_query.get(record.get("message", ""))
+            if name:
+                responses[name] = Response(
+                    text=record.get("text", ""), tool_calls=list(record.get("tool_calls", []))
+                )
+    return responses
+
+
+@dataclass
+class CaseResult:
+    name: str
+    passed: bool
+    failures: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SuiteResult:
+    results: List[CaseResult]
+    missing: List[str]
+    seconds: float
+
+    @property
+    def passed(self) -> int:
+        return sum(result.passed for result in self.results)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.passed
+
+    def summary(self) -> Dict[str, Any]:
+        scored = len(self.results)
+        return {
+            "cases": scored + len(self.missing),
+            "scored": scored,
+            "passed": self.passed,
+            "failed": self.failed,
+            "missing_responses": len(self.missing),
+            "pass_rate": round(self.passed / scored, 4) if scored else 0.0,
+            "cases_per_s": round(scored / self.seconds, 1) if self.seconds else 0.0,
+        }
+
+
+def score(cases: Sequence[EvalCase], responses: Dict[str, Response]) -> SuiteResult:
+    """Check every case that has a response."""
+    start = time.perf_counter()
+    results: List[CaseResult] = []
+    missing: List[str] = []
+    for case in cases:
+        response = responses.get(case.name)
+        if response is None:
+            missing.append(case.name)
+            continue
+        failures = case.check(response)
+        results.append(CaseResult(case.name, not failures, failures))
+    return SuiteResult(results, missing, time.perf_counter() - start)
+
+
+async def collect_responses(
+    cases: Sequence[EvalCase], concurrency: int = 8
+) -> Dict[str, Response]:
+    """Run each case's query as the first turn of its own session."""
+    from src.app_factory import app, build_runner
+    from src.core.workers import run_turn
+
+    runner = build_runner(app)
+    semaphore = asyncio.Semaphore(concurrency)
+    responses: Dict[str, Response] = {}
+
+    async def run(index: int, case: EvalCase) -> None:
+        async with semaphore:
+            user_id = f"eval_user_{index}"
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=user_id
+            )
+            result = await run_turn(runner, user_id, session.id, case.query)
+            responses[case.name] = Response(text=result.text, tool_calls=result.tool_calls)
+
+    await asyncio.gather(*(run(index, case) for index, case in enumerate(cases) if case.query))
+    return responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("cases", nargs="+", type=Path, help="Case files (.json/.jsonl).")
+    parser.add_argument(
+        "--responses",
+        type=Path,
+        default=None,
+        help="Score recorded responses (JSONL) instead of running the tutor.",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--show", type=int, default=20, help="Failures to print.")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    if args.responses:
+        responses = load_responses(args.responses, cases)
+    else:
+        responses = asyncio.run(collect_responses(cases, args.concurrency))
+    result = score(cases, responses)
+
+    print("=== Evaluation suite ===")
+    for case_result in [r for r in result.results if not r.passed][: args.show]:
+        print(f"[FAIL] {case_result.name}: {'; '.join(case_result.failures)}")
+    print(json.dumps(result.summary()))
+    sys.exit(1 if result.failed or result.missing else 0)
+
+
+if __name__ == "__main__":
+    main()
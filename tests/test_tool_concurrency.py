@@ -0,0 +1,27 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.benchmarks.tool_concurrency import _run_configuration
+
+
+def test_async_tools_lose_no_updates_under_concurrency():
+    # Several sessions per learner grading at once, against a slow state store.
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        result = pool.submit(
+            _run_configuration,
+            async_tools=True,
+            users=3,
+            sessions=6,
+            lessons=2,
+            answers=3,
+            store_ms=5.0,
+            latency_ms=5.0,
+            workers=4,
+            seed=7,
+        ).result()
+
+    assert sum(result["graded"].values()) > 0
+    assert result["ledger"]["contended"] > 0
+    assert result["recorded"] == result["graded"]
@@ -0,0 +1,11 @@
+from src.core.topic_index import TopicCanonicalizer
+
+
+def test_stored_topics_are_indexed_when_the_index_holds_others():
+    canonicalizer = TopicCanonicalizer()
+    # Registered in the index but never saved to state.
+    assert canonicalizer.canonicalize("u", "gradient descent", {}.keys()) == "gradient descent"
+
+    stored = {"backpropagation": {}}.keys()
+    assert canonicalizer.lookup("u", "backpropagation", stored) == "backpropagation"
+    assert canonicalizer.canonicalize("u", "Backpropagation!", stored) == "backpropagation"
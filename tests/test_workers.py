@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+from src.core.workers import _export_sessions, _import_sessions
+
+
+APP = "tutor"
+USER = "learner-1"
+
+
+def _runner() -> SimpleNamespace:
+    return SimpleNamespace(app_name=APP, session_service=InMemorySessionService())
+
+
+async def _append(runner, session_id: str, delta: dict) -> None:
+    service = runner.session_service
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=session_id)
+    await service.append_event(
+        session,
+        Event(invocation_id="inv", author="tutor", actions=EventActions(state_delta=delta)),
+    )
+
+
+def test_migration_keeps_the_newest_user_state():
+    async def scenario():
+        source, target = _runner(), _runner()
+        for session_id in ("s1", "s2"):
+            await source.session_service.create_session(
+                app_name=APP, user_id=USER, session_id=session_id
+            )
+        await _append(source, "s2", {"user:n": 1})
+        await _append(source, "s1", {"user:n": 2, "lesson": "a"})
+        await _append(source, "s2", {"lesson": "b"})
+
+        exported = await _export_sessions(source, [USER])
+        assert await _import_sessions(target, exported) == 2
+
+        states = {}
+        for session_id, events in (("s1", 1), ("s2", 2)):
+            session = await target.session_service.get_session(
+                app_name=APP, user_id=USER, session_id=session_id
+            )
+            assert len(session.events) == events
+            states[session_id] = session.state
+        return states
+
+    states = asyncio.run(scenario())
+    assert states["s1"]["user:n"] == 2
+    assert states["s2"]["user:n"] == 2
+    assert states["s1"]["lesson"] == "a"
+    assert states["s2"]["lesson"] == "b"